@@ -14,3 +14,8 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_asgi_application()
+
+# Load the model in the pre-fork master so workers share it (see gunicorn.conf.py)
+if os.getenv('PRELOAD_MODELS') == '1':
+    from resume_api.preload import preload_shared_state
+    preload_shared_state()
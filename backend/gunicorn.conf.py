@@ -0,0 +1,48 @@
+"""
+Gunicorn settings for running the API with a shared, pre-loaded model.
+
+The application (and with it the BERT model and analyzer structures) is loaded
+once in the master process, then forked into the workers, which share those
+pages copy-on-write instead of each loading their own ~440 MB copy.
+
+    gunicorn -c gunicorn.conf.py backend.wsgi
+
+To serve the async endpoint (/api/resume/analyze/async/) without tying up a
+thread per request, run the ASGI application on uvicorn workers instead:
+
+    gunicorn -c gunicorn.conf.py -k uvicorn.workers.UvicornWorker backend.asgi
+
+With EMBEDDING_BACKEND=onnx, export the graph first so the workers only load it:
+
+    python manage.py export_onnx_model
+"""
+import os
+import multiprocessing
+
+# Load the app in the master before forking, see backend/wsgi.py
+os.environ.setdefault("PRELOAD_MODELS", "1")
+preload_app = True
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+
+
+def post_fork(server, worker):
+    from resume_api import embeddings
+    from resume_api.preload import process_memory
+
+    # Split the cores between workers instead of letting every worker use them all
+    if not embeddings.NUM_THREADS:
+        embeddings.set_num_threads(max(1, multiprocessing.cpu_count() // workers))
+    # Inference is safe from here on, so check (and switch to) an int8 or ONNX backend now
+    embeddings.verify_backend()
+
+    server.log.info("Worker %s memory: %s", worker.pid, process_memory())
+
+
+def when_ready(server):
+    from resume_api.preload import process_memory
+
+    server.log.info("Master memory after preload: %s", process_memory())
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Resume, JobDescription, ResumeAnalysis
+from .models import Resume, JobDescription, ResumeAnalysis, TermStatistic, AnalysisJob, AnalysisResult, DocumentFeatureSet
 
 @admin.register(Resume)
 class ResumeAdmin(admin.ModelAdmin):
@@ -18,3 +18,28 @@ class ResumeAnalysisAdmin(admin.ModelAdmin):
     list_display = ('resume', 'job_description', 'match_score', 'created_at')
     list_filter = ('created_at', 'match_score')
     search_fields = ('resume__title', 'job_description__title', 'user__username')
+
+@admin.register(TermStatistic)
+class TermStatisticAdmin(admin.ModelAdmin):
+    list_display = ('term', 'document_frequency')
+    search_fields = ('term',)
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'status', 'attempts', 'worker_id', 'created_at', 'finished_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('id', 'user__username', 'resume_file_name')
+    exclude = ('resume_content', 'job_desc_content')
+
+@admin.register(AnalysisResult)
+class AnalysisResultAdmin(admin.ModelAdmin):
+    list_display = ('cache_key', 'version', 'hits', 'created_at', 'last_used_at')
+    list_filter = ('version',)
+    search_fields = ('cache_key', 'resume_hash', 'job_desc_hash')
+
+@admin.register(DocumentFeatureSet)
+class DocumentFeatureSetAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'version', 'embedding_version', 'updated_at')
+    list_filter = ('version', 'embedding_version')
+    search_fields = ('content_hash',)
+    exclude = ('embedding',)
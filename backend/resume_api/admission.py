@@ -0,0 +1,267 @@
+import os
+import math
+import asyncio
+import time
+import threading
+
+# Files whose extraction goes through Azure OCR
+OCR_FILE_TYPES = {'pdf', 'jpg', 'jpeg', 'png', 'bmp', 'gif'}
+
+
+class Overloaded(Exception):
+    """Raised when a pool can neither run nor queue a request."""
+
+    def __init__(self, pool, retry_after):
+        """
+        Args:
+            pool (str): Name of the full pool
+            retry_after (int): Seconds the client should wait before retrying
+        """
+        super().__init__(f"Analysis capacity exhausted ({pool}), retry in {retry_after}s")
+        self.pool = pool
+        self.retry_after = retry_after
+
+
+class Slot:
+    """A place taken in an AdmissionPool; use it as a context manager or release it once done."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.admitted_at = time.monotonic()
+        self._released = False
+
+    def release(self):
+        """Give the place back; further calls do nothing."""
+        if not self._released:
+            self._released = True
+            self.pool._release(self.admitted_at)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class ReleasingIterator:
+    """
+    Iterate over a response stream, holding its slot until the stream ends or
+    is closed. The server closes it even if the client leaves before the
+    first chunk, which a generator's finally block would not see.
+    """
+
+    def __init__(self, iterable, slot):
+        self._iterator = iter(iterable)
+        self.slot = slot
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._iterator)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        try:
+            if hasattr(self._iterator, "close"):
+                self._iterator.close()
+        finally:
+            self.slot.release()
+
+
+class AdmissionPool:
+    """
+    Bounded concurrency with a short bounded queue in front of it.
+
+    Up to `limit` requests run at once and up to `queue_size` more wait, each
+    for at most `queue_timeout_ms`. Anything beyond that is rejected at once,
+    so under a spike the server keeps its throughput instead of slowing every
+    request down, and clients get a fast answer they can retry.
+    """
+
+    def __init__(self, name, limit, queue_size, queue_timeout_ms):
+        self.name = name
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout_ms / 1000
+        self._condition = threading.Condition()
+        self._active = 0
+        self._queued = 0
+        self._max_queued = 0
+        self._admitted = 0
+        self._rejected = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        # Moving average of how long a request holds its slot, for Retry-After
+        self._service_time = 1.0
+
+    def retry_after(self):
+        """Seconds until a slot is likely free: the queue ahead drained at the current service rate."""
+        return max(1, math.ceil(self._service_time * (self._queued + 1) / self.limit))
+
+    def acquire(self):
+        """
+        Take a slot, waiting in the queue if all are busy.
+
+        Returns:
+            Slot: The slot, to release once the request is done
+
+        Raises:
+            Overloaded: If the queue is full or the wait timed out
+        """
+        start = time.monotonic()
+        with self._condition:
+            if self._active >= self.limit:
+                if self._queued >= self.queue_size:
+                    self._rejected += 1
+                    raise Overloaded(self.name, self.retry_after())
+                self._queued += 1
+                self._max_queued = max(self._max_queued, self._queued)
+                try:
+                    admitted = self._condition.wait_for(
+                        lambda: self._active < self.limit, timeout=self.queue_timeout)
+                finally:
+                    self._queued -= 1
+                if not admitted:
+                    self._rejected += 1
+                    raise Overloaded(self.name, self.retry_after())
+            self._active += 1
+            self._admitted += 1
+            waited = time.monotonic() - start
+            self._wait_total += waited
+            self._wait_max = max(self._wait_max, waited)
+        return Slot(self)
+
+    async def acquire_async(self):
+        """
+        Take a slot like acquire, waiting in a thread so the event loop is not blocked.
+        
+        If the awaiting task is cancelled (e.g. the client disconnected) while
+        it waits in the queue, the thread keeps waiting; a slot it takes after
+        that is released at once instead of being held by nobody.
+        
+        Returns:
+            Slot: The slot, to release once the request is done
+        
+        Raises:
+            Overloaded: If the queue is full or the wait timed out
+        """
+        acquiring = asyncio.ensure_future(asyncio.to_thread(self.acquire))
+        try:
+            return await asyncio.shield(acquiring)
+        except asyncio.CancelledError:
+            acquiring.add_done_callback(_release_abandoned)
+            raise
+
+    def _release(self, admitted_at):
+        with self._condition:
+            self._active -= 1
+            self._service_time = 0.8 * self._service_time + 0.2 * (time.monotonic() - admitted_at)
+            self._condition.notify()
+
+    def metrics(self):
+        with self._condition:
+            return {
+                "limit": self.limit,
+                "queueSize": self.queue_size,
+                "active": self._active,
+                "queued": self._queued,
+                "maxQueued": self._max_queued,
+                "admitted": self._admitted,
+                "rejected": self._rejected,
+                "waitMsAvg": round(self._wait_total * 1000 / self._admitted, 1) if self._admitted else 0.0,
+                "waitMsMax": round(self._wait_max * 1000, 1),
+                "serviceMsAvg": round(self._service_time * 1000, 1),
+            }
+
+
+def _release_abandoned(acquiring):
+    if not acquiring.cancelled() and acquiring.exception() is None:
+        acquiring.result().release()
+
+
+def _pool_from_env(name, limit, queue_size, queue_timeout_ms):
+    prefix = f"ADMISSION_{name.upper()}"
+    return AdmissionPool(
+        name,
+        limit=int(os.getenv(f"{prefix}_LIMIT", str(limit))),
+        queue_size=int(os.getenv(f"{prefix}_QUEUE", str(queue_size))),
+        queue_timeout_ms=int(os.getenv(f"{prefix}_QUEUE_TIMEOUT_MS", str(queue_timeout_ms))),
+    )
+
+
+# Expensive paths get their own, smaller pools so a burst of scanned PDFs or
+# semantic matches cannot starve the cheap lexical analyses. Limits are per process.
+POOLS = {
+    "ocr": _pool_from_env("ocr", limit=4, queue_size=8, queue_timeout_ms=2000),
+    "semantic": _pool_from_env("semantic", limit=4, queue_size=8, queue_timeout_ms=2000),
+    "cheap": _pool_from_env("cheap", limit=16, queue_size=32, queue_timeout_ms=2000),
+    # Batch matches extract and score hundreds of documents each, on their own executor
+    "batch": _pool_from_env("batch", limit=2, queue_size=4, queue_timeout_ms=2000),
+}
+
+
+def classify(file_names, profile):
+    """
+    Pick the pool of an analysis by its most expensive path.
+
+    Args:
+        file_names (list): Names of the uploaded files
+        profile (MatchProfile): The matching profile
+
+    Returns:
+        str: 'ocr', 'semantic' or 'cheap'; batches go to 'batch' through admit_batch
+    """
+    if any(name.split('.')[-1].lower() in OCR_FILE_TYPES for name in file_names):
+        return "ocr"
+    if profile.semantic:
+        return "semantic"
+    return "cheap"
+
+
+def get_pool(name):
+    return POOLS[name]
+
+
+def admit(file_names, profile):
+    """
+    Take a slot in the pool of an analysis, waiting briefly if it is busy.
+
+    Args:
+        file_names (list): Names of the uploaded files
+        profile (MatchProfile): The matching profile
+
+    Returns:
+        Slot: The slot, to release once the analysis is done
+
+    Raises:
+        Overloaded: If the pool is saturated
+    """
+    return get_pool(classify(file_names, profile)).acquire()
+
+
+def admit_batch():
+    """
+    Take a slot in the batch pool, which batch matches use whatever their files,
+    so a few large batches cannot take the slots of single analyses.
+
+    Returns:
+        Slot: The slot, to release once the batch is done
+
+    Raises:
+        Overloaded: If the pool is saturated
+    """
+    return get_pool("batch").acquire()
+
+
+async def admit_async(file_names, profile):
+    """Take a slot like admit without blocking the event loop; see AdmissionPool.acquire_async."""
+    return await get_pool(classify(file_names, profile)).acquire_async()
+
+
+def metrics():
+    """Metrics of every pool, by pool name."""
+    return {name: pool.metrics() for name, pool in POOLS.items()}
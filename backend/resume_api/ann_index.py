@@ -0,0 +1,242 @@
+import json
+import threading
+
+import numpy as np
+
+
+def _normalize(vectors):
+    """L2-normalise rows so a dot product is a cosine similarity."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors.reshape(1, -1)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def _kmeans(vectors, n_clusters, iterations=10, seed=0):
+    """
+    Spherical k-means over normalised vectors.
+
+    Returns:
+        numpy.ndarray: Normalised centroids of shape (n_clusters, dim)
+    """
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), n_clusters, replace=False)].copy()
+
+    for _ in range(iterations):
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        for cluster in range(n_clusters):
+            members = vectors[assignments == cluster]
+            if len(members):
+                centroids[cluster] = members.sum(axis=0)
+            else:
+                # Re-seed empty clusters so every list gets used
+                centroids[cluster] = vectors[rng.integers(len(vectors))]
+        centroids = _normalize(centroids)
+
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file approximate nearest-neighbour index for cosine similarity.
+
+    Vectors are assigned to the nearest of n_lists k-means centroids. A query
+    only scans the n_probe lists whose centroids are closest to it, so search
+    cost grows with n_probe * (N / n_lists) instead of N. Until enough vectors
+    have been added to train the centroids, the index falls back to an exact scan.
+    """
+
+    def __init__(self, n_lists=None, n_probe=8, min_train_size=256):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.min_train_size = min_train_size
+        self.labels = []
+        self.centroids = None
+        self.metadata = {}          # Saved with the index, e.g. which model produced the vectors
+
+        self._lock = threading.Lock()
+        self._vectors = []          # All normalised vectors, used for training and exact search
+        self._list_vectors = []     # Per-list vector blocks
+        self._list_ids = []         # Per-list label ids
+        self._pending = []          # Per-list vectors added since the blocks were last rebuilt
+
+    def __len__(self):
+        return len(self.labels)
+
+    @property
+    def is_trained(self):
+        return self.centroids is not None
+
+    def train(self):
+        """Cluster the vectors added so far and build the inverted lists."""
+        with self._lock:
+            self._train()
+
+    def _train(self):
+        # Called with the lock held
+        vectors = np.vstack(self._vectors) if self._vectors else np.zeros((0, 0), dtype=np.float32)
+        if len(vectors) == 0:
+            return
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = min(n_lists, len(vectors))
+        self.centroids = _kmeans(vectors, n_lists)
+        self._vectors = [vectors]
+
+        assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+        ids = np.arange(len(vectors))
+        self._list_vectors = [vectors[assignments == i] for i in range(n_lists)]
+        self._list_ids = [ids[assignments == i] for i in range(n_lists)]
+        self._pending = [[] for _ in range(n_lists)]
+
+    def add(self, labels, vectors):
+        """
+        Add labelled vectors to the index. Once min_train_size vectors have
+        been added the centroids are trained; later vectors are assigned to
+        the nearest existing list.
+
+        Args:
+            labels (list): One label per vector
+            vectors (numpy.ndarray): Array of shape (len(labels), dim)
+        """
+        vectors = _normalize(vectors)
+        with self._lock:
+            start = len(self.labels)
+            self.labels.extend(labels)
+            self._vectors.append(vectors)
+
+            if self.is_trained:
+                assignments = np.argmax(vectors @ self.centroids.T, axis=1)
+                for offset, list_id in enumerate(assignments):
+                    self._pending[list_id].append((start + offset, vectors[offset]))
+            elif len(self.labels) >= self.min_train_size:
+                # Under the same lock, so concurrent adds cannot both train
+                self._train()
+
+    def _flush(self, list_ids):
+        """Merge vectors added since the last search into the probed lists."""
+        for list_id in list_ids:
+            pending = self._pending[list_id]
+            if not pending:
+                continue
+            self._list_ids[list_id] = np.concatenate([self._list_ids[list_id], [pid for pid, _ in pending]])
+            self._list_vectors[list_id] = np.vstack([self._list_vectors[list_id]] + [vec for _, vec in pending])
+            self._pending[list_id] = []
+
+    def search(self, vector, k=10, n_probe=None):
+        """
+        Find the approximate k nearest labels to a vector.
+
+        Args:
+            vector (numpy.ndarray): Query vector
+            k (int): Number of results
+            n_probe (int, optional): Number of lists to scan. Defaults to the index setting.
+
+        Returns:
+            list: (label, cosine similarity) tuples, best first
+        """
+        if not self.labels:
+            return []
+        if not self.is_trained:
+            return self.exact_search(vector, k)
+
+        query = _normalize(vector)[0]
+        n_probe = min(n_probe or self.n_probe, len(self.centroids))
+        probed = np.argpartition(-(self.centroids @ query), n_probe - 1)[:n_probe]
+
+        with self._lock:
+            self._flush(probed)
+            blocks = [(self._list_ids[i], self._list_vectors[i]) for i in probed]
+
+        candidate_ids = []
+        candidate_scores = []
+        for ids, block in blocks:
+            if len(ids) == 0:
+                continue
+            scores = block @ query
+            if len(scores) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                ids, scores = ids[top], scores[top]
+            candidate_ids.append(ids)
+            candidate_scores.append(scores)
+
+        if not candidate_ids:
+            return []
+        ids = np.concatenate(candidate_ids)
+        scores = np.concatenate(candidate_scores)
+        order = np.argsort(-scores)[:k]
+        return [(self.labels[ids[i]], float(scores[i])) for i in order]
+
+    def exact_search(self, vector, k=10):
+        """
+        Find the exact k nearest labels with a full scan, used as the recall baseline.
+
+        Args:
+            vector (numpy.ndarray): Query vector
+            k (int): Number of results
+
+        Returns:
+            list: (label, cosine similarity) tuples, best first
+        """
+        if not self.labels:
+            return []
+        with self._lock:
+            if len(self._vectors) > 1:
+                self._vectors = [np.vstack(self._vectors)]
+            vectors = self._vectors[0]
+
+        scores = vectors @ _normalize(vector)[0]
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(self.labels[i], float(scores[i])) for i in top]
+
+    def save(self, path):
+        """
+        Persist the index to a .npz file.
+
+        Args:
+            path (str): Destination file path
+        """
+        with self._lock:
+            vectors = np.vstack(self._vectors) if self._vectors else np.zeros((0, 0), dtype=np.float32)
+            np.savez(
+                path,
+                vectors=vectors,
+                centroids=self.centroids if self.is_trained else np.zeros((0, 0), dtype=np.float32),
+                labels=np.array(json.dumps(self.labels)),
+                settings=np.array([self.n_lists or 0, self.n_probe, self.min_train_size]),
+                metadata=np.array(json.dumps(self.metadata)),
+            )
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load an index saved with save().
+
+        Args:
+            path (str): Path to the .npz file
+
+        Returns:
+            IVFIndex: The restored index
+        """
+        data = np.load(path, allow_pickle=False)
+        n_lists, n_probe, min_train_size = (int(value) for value in data["settings"])
+        index = cls(n_lists=n_lists or None, n_probe=n_probe, min_train_size=min_train_size)
+        labels = json.loads(str(data["labels"]))
+        vectors = data["vectors"]
+        index.labels = labels
+        index._vectors = [vectors] if len(vectors) else []
+        # Indexes saved before metadata was recorded have none
+        index.metadata = json.loads(str(data["metadata"])) if "metadata" in data.files else {}
+
+        centroids = data["centroids"]
+        if centroids.size:
+            index.centroids = centroids
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            ids = np.arange(len(vectors))
+            index._list_vectors = [vectors[assignments == i] for i in range(len(centroids))]
+            index._list_ids = [ids[assignments == i] for i in range(len(centroids))]
+            index._pending = [[] for _ in range(len(centroids))]
+        return index
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ResumeApiConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'resume_api'
+
+    def ready(self):
+        # Keep the TF-IDF corpus statistics in step with stored documents
+        from . import signals  # noqa: F401
@@ -1,12 +1,18 @@
 import os
+import asyncio
 from dotenv import load_dotenv
 from azure.core.credentials import AzureKeyCredential
 from azure.ai.textanalytics import TextAnalyticsClient
+from azure.ai.textanalytics.aio import TextAnalyticsClient as AsyncTextAnalyticsClient
 import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
-from transformers import AutoTokenizer, AutoModel
-import torch
-import re
+
+from . import embeddings
+from . import fuzzy_matching
+from . import feature_cache
+from .pipeline import get_batch_executor
+from .lexicon import get_lexicon
+from .loop_resources import get_loop_resource
 
 # Load environment variables
 load_dotenv()
@@ -15,15 +21,6 @@ load_dotenv()
 key = os.getenv("AZURE_LANGUAGE_KEY")
 endpoint = os.getenv("AZURE_LANGUAGE_ENDPOINT")
 
-# Load BERT model for text similarity
-try:
-    tokenizer = AutoTokenizer.from_pretrained("bert-base-uncased")
-    model = AutoModel.from_pretrained("bert-base-uncased")
-except Exception as e:
-    print(f"Error loading BERT model: {str(e)}")
-    tokenizer = None
-    model = None
-
 # Initialize Azure Language Text Analytics client
 def get_text_analytics_client():
     """
@@ -37,13 +34,20 @@ def get_text_analytics_client():
         print(f"Error initializing Text Analytics client: {str(e)}")
         return None
 
+def _timeout_options(timeout):
+    """Per-call transport timeouts for the Azure SDK, without retries that would overrun them."""
+    if timeout is None:
+        return {}
+    return {"connection_timeout": timeout, "read_timeout": timeout, "retry_total": 0}
+
 # Extract key phrases from text
-def extract_key_phrases(text):
+def extract_key_phrases(text, timeout=None):
     """
     Extract key phrases from the provided text using Azure Language service.
     
     Args:
         text (str): The text to analyze
+        timeout (float, optional): Seconds to wait for the service
         
     Returns:
         list: A list of extracted key phrases
@@ -53,7 +57,7 @@ def extract_key_phrases(text):
         return []
     
     try:
-        response = client.extract_key_phrases([text])[0]
+        response = client.extract_key_phrases([text], **_timeout_options(timeout))[0]
         
         if not response.is_error:
             return response.key_phrases
@@ -64,28 +68,57 @@ def extract_key_phrases(text):
         print(f"Error calling key phrase extraction: {str(e)}")
         return []
 
+# Documents per request accepted by the key phrase API
+KEY_PHRASE_BATCH_SIZE = 10
+
+def extract_key_phrases_batch(texts, timeout=None):
+    """
+    Extract key phrases from many texts, sending up to KEY_PHRASE_BATCH_SIZE
+    documents per request; the requests themselves run concurrently.
+    
+    Args:
+        texts (list): The texts to analyze
+        timeout (float, optional): Seconds to wait for the service
+        
+    Returns:
+        list: One list of key phrases per text, empty where extraction failed
+    """
+    client = get_text_analytics_client()
+    if not client:
+        return [[] for _ in texts]
+    
+    def extract_chunk(chunk):
+        try:
+            responses = client.extract_key_phrases(chunk, **_timeout_options(timeout))
+            return [[] if response.is_error else response.key_phrases for response in responses]
+        except Exception as e:
+            print(f"Error calling key phrase extraction: {str(e)}")
+            return [[] for _ in chunk]
+    
+    chunks = [texts[i:i + KEY_PHRASE_BATCH_SIZE] for i in range(0, len(texts), KEY_PHRASE_BATCH_SIZE)]
+    # Not the stage pool: batches of hundreds of documents would queue ahead of single analyses
+    return [key_phrases for chunk_result in get_batch_executor().map(extract_chunk, chunks)
+            for key_phrases in chunk_result]
+
 # Analyze sentiment of text
-def analyze_sentiment(text):
+def analyze_sentiment(text, timeout=None):
     """
     Analyze the sentiment of the provided text using Azure Language service.
     
     Args:
         text (str): The text to analyze
+        timeout (float, optional): Seconds to wait for the service
         
     Returns:
-        dict: A dictionary containing sentiment value
+        dict: A dictionary containing sentiment value, or None if the call failed
     """
     client = get_text_analytics_client()
-    default_result = {
-        "sentiment": "neutral"
-    }
-    
     if not client:
         print("No client available for sentiment analysis")
-        return default_result
+        return None
     
     try:
-        response = client.analyze_sentiment([text])[0]
+        response = client.analyze_sentiment([text], **_timeout_options(timeout))[0]
         
         if not response.is_error:
             # Format the response with only sentiment value
@@ -96,10 +129,81 @@ def analyze_sentiment(text):
             return result
         else:
             print(f"Error analyzing sentiment: {response.error}")
-            return default_result
+            return None
+    except Exception as e:
+        print(f"Error calling sentiment analysis: {str(e)}")
+        return None
+
+async def get_async_text_analytics_client():
+    """
+    Get the non-blocking Azure Text Analytics client of the running event loop,
+    creating it on first use. Every call on that loop shares it, and with it
+    its connection pool, so callers must not close it; it is closed when the
+    loop shuts down.
+    """
+    try:
+        return await get_loop_resource(
+            "Text Analytics client",
+            lambda: AsyncTextAnalyticsClient(endpoint=endpoint, credential=AzureKeyCredential(key))
+        )
+    except Exception as e:
+        print(f"Error initializing async Text Analytics client: {str(e)}")
+        return None
+
+async def extract_key_phrases_async(text, timeout=None):
+    """
+    Extract key phrases without blocking the event loop; see extract_key_phrases.
+    
+    Args:
+        text (str): The text to analyze
+        timeout (float, optional): Seconds to wait for the service
+        
+    Returns:
+        list: A list of extracted key phrases
+    """
+    client = await get_async_text_analytics_client()
+    if not client:
+        return []
+    
+    try:
+        response = (await client.extract_key_phrases([text], **_timeout_options(timeout)))[0]
+        
+        if not response.is_error:
+            return response.key_phrases
+        else:
+            print(f"Error extracting key phrases: {response.error}")
+            return []
+    except Exception as e:
+        print(f"Error calling key phrase extraction: {str(e)}")
+        return []
+
+async def analyze_sentiment_async(text, timeout=None):
+    """
+    Analyze sentiment without blocking the event loop; see analyze_sentiment.
+    
+    Args:
+        text (str): The text to analyze
+        timeout (float, optional): Seconds to wait for the service
+        
+    Returns:
+        dict: A dictionary containing sentiment value, or None if the call failed
+    """
+    client = await get_async_text_analytics_client()
+    if not client:
+        print("No client available for sentiment analysis")
+        return None
+    
+    try:
+        response = (await client.analyze_sentiment([text], **_timeout_options(timeout)))[0]
+        
+        if not response.is_error:
+            return {"sentiment": response.sentiment}
+        else:
+            print(f"Error analyzing sentiment: {response.error}")
+            return None
     except Exception as e:
         print(f"Error calling sentiment analysis: {str(e)}")
-        return default_result
+        return None
 
 # Detect language of text
 def detect_language(text):
@@ -131,7 +235,7 @@ def detect_language(text):
 # Get BERT embeddings for text
 def get_bert_embedding(text):
     """
-    Get BERT embeddings for a text string using the pre-trained BERT model.
+    Get BERT embeddings for a text string using the configured embedding backend.
     
     Args:
         text (str): Text to embed
@@ -139,28 +243,81 @@ def get_bert_embedding(text):
     Returns:
         numpy.ndarray: BERT embedding vector
     """
-    if tokenizer is None or model is None:
+    if embeddings.backend is None:
         # Fallback to simple character-based embedding if BERT is not available
         return np.array([ord(c) for c in text[:20].ljust(20)])
     
     try:
-        # Tokenize and prepare for BERT
-        inputs = tokenizer(text, return_tensors="pt", padding=True, truncation=True, max_length=128)
-        
-        # Get BERT embeddings
-        with torch.no_grad():
-            outputs = model(**inputs)
-        
-        # Use the [CLS] token embedding as the sentence embedding
-        embeddings = outputs.last_hidden_state[:, 0, :].numpy()
-        return embeddings[0]  # Return the first (and only) embedding
+        return _embed_cached([text])[0]
     except Exception as e:
         print(f"Error getting BERT embedding: {str(e)}")
         # Fallback to simple character-based embedding
         return np.array([ord(c) for c in text[:20].ljust(20)])
 
+# Get BERT embeddings for several texts at once
+def get_bert_embeddings(texts):
+    """
+    Get BERT embeddings for a list of texts in batched forward passes.
+    
+    Args:
+        texts (list): Texts to embed
+        
+    Returns:
+        numpy.ndarray: Array with one embedding vector per text
+    """
+    texts = list(texts)
+    if embeddings.backend is not None and texts:
+        try:
+            return _embed_cached(texts)
+        except Exception as e:
+            print(f"Error getting BERT embeddings: {str(e)}")
+    
+    return np.array([get_bert_embedding(text) for text in texts])
+
+def _embed_cached(texts):
+    """Embed texts with the backend, embedding only those missing from the embedding cache."""
+    vectors = [feature_cache.get_embedding(text, "term") for text in texts]
+    missing = list(dict.fromkeys(text for text, vector in zip(texts, vectors) if vector is None))
+    if missing:
+        # Embed with the configured backend (fp32, int8 or onnx) through the batching worker
+        computed = dict(zip(missing, embeddings.embed_texts(missing)))
+        for text, vector in computed.items():
+            feature_cache.put_embedding(text, "term", vector)
+        vectors = [computed[text] if vector is None else vector for text, vector in zip(texts, vectors)]
+    return np.array(vectors)
+
+# Get a whole-document BERT embedding for long text
+def get_long_text_embedding(text, pooling=None):
+    """
+    Embed a long text by splitting it into overlapping token windows, embedding
+    all windows in one batched pass and pooling the results.
+    
+    Args:
+        text (str): Text to embed
+        pooling (str, optional): mean or max. Defaults to EMBEDDING_LONG_TEXT_POOLING.
+        
+    Returns:
+        numpy.ndarray: Pooled BERT embedding vector
+    """
+    if embeddings.backend is None:
+        return np.array([ord(c) for c in text[:20].ljust(20)])
+    
+    pooling = pooling or embeddings.LONG_TEXT_POOLING
+    cached = feature_cache.get_embedding(text, f"long-{pooling}")
+    if cached is not None:
+        return cached
+    
+    try:
+        window_embeddings = embeddings.embed_windows(text)
+        vector = embeddings.pool_embeddings(window_embeddings, pooling)
+        feature_cache.put_embedding(text, f"long-{pooling}", vector)
+        return vector
+    except Exception as e:
+        print(f"Error getting long text embedding: {str(e)}")
+        return np.array([ord(c) for c in text[:20].ljust(20)])
+
 # Calculate contextual semantic similarity between texts using BERT
-def calculate_text_similarity(text1, text2, is_tech_skill=False):
+def calculate_text_similarity(text1, text2, is_tech_skill=False, long_text=False):
     """
     Calculate the semantic similarity between two texts using BERT embeddings.
     
@@ -168,27 +325,20 @@ def calculate_text_similarity(text1, text2, is_tech_skill=False):
         text1 (str): First text
         text2 (str): Second text
         is_tech_skill (bool): Whether this is a technical skill comparison that needs special handling
+        long_text (bool): Embed the whole of each text with sliding windows instead of
+            truncating to the first 128 tokens
         
     Returns:
         float: Similarity score between 0 and 1
     """
-    # For technical skills, implement special handling
-    if is_tech_skill:
-        # Normalize technical terms for better comparison
-        text1_norm = _normalize_tech_term(text1)
-        text2_norm = _normalize_tech_term(text2)
-        
-        # Check for acronym matches (e.g., "CSS" and "Cascading Style Sheets")
-        if _is_acronym_match(text1_norm, text2_norm):
-            return 1.0
-            
-        # Check for common tech term variations
-        if _are_tech_variants(text1_norm, text2_norm):
-            return 0.9
+    # For technical skills, aliases and acronyms of the same term are a full match
+    if is_tech_skill and _is_same_tech_term(text1, text2):
+        return 1.0
     
     # Get BERT embeddings for both texts
-    embedding1 = get_bert_embedding(text1)
-    embedding2 = get_bert_embedding(text2)
+    embed = get_long_text_embedding if long_text else get_bert_embedding
+    embedding1 = embed(text1)
+    embedding2 = embed(text2)
     
     # Calculate cosine similarity
     embedding1_reshaped = embedding1.reshape(1, -1)
@@ -198,7 +348,7 @@ def calculate_text_similarity(text1, text2, is_tech_skill=False):
     # Boost similarity scores for technology terms with partial matches
     if is_tech_skill:
         # Apply a boost factor for partial string matches in technical skills
-        partial_match_score = _calculate_partial_match_score(text1, text2)
+        partial_match_score = fuzzy_matching.partial_match_score(text1, text2)
         # Weighted combination of BERT similarity and partial match
         similarity = 0.7 * similarity + 0.3 * partial_match_score
     
@@ -207,28 +357,59 @@ def calculate_text_similarity(text1, text2, is_tech_skill=False):
     
     return similarity
 
-def _normalize_tech_term(term):
+# Calculate similarities between every pair of texts in two lists
+def calculate_similarity_matrix(texts1, texts2, is_tech_skill=False, score_cutoff=None):
     """
-    Normalize a technical term by removing common prefixes/suffixes and standardizing format.
+    Calculate the similarity between every pair of texts from two lists, with
+    one batched embedding call and one fuzzy-matching call for the whole matrix.
+    Each cell equals calculate_text_similarity for that pair.
+    
+    Args:
+        texts1 (list): Row texts, e.g. job skills
+        texts2 (list): Column texts, e.g. resume skills
+        is_tech_skill (bool): Whether this is a technical skill comparison that needs special handling
+        score_cutoff (float, optional): Edit similarities below this count as 0 in the partial-match component
+        
+    Returns:
+        numpy.ndarray: Similarity scores between 0 and 1, of shape (len(texts1), len(texts2))
     """
-    # Convert to lowercase for consistent comparison
-    normalized = term.lower()
+    texts1 = list(texts1)
+    texts2 = list(texts2)
+    if not texts1 or not texts2:
+        return np.zeros((len(texts1), len(texts2)))
     
-    # Remove common prefixes that don't affect the core meaning
-    prefixes = ['ms ', 'microsoft ', 'google ', 'apache ', 'aws ', 'azure ', 'ibm ']
-    for prefix in prefixes:
-        if normalized.startswith(prefix):
-            normalized = normalized[len(prefix):]
+    # Embed both lists in one batch and compare every pair
+    all_embeddings = get_bert_embeddings(texts1 + texts2)
+    similarity = cosine_similarity(all_embeddings[:len(texts1)], all_embeddings[len(texts1):])
+    
+    if is_tech_skill:
+        partial_scores = fuzzy_matching.partial_match_matrix(texts1, texts2, score_cutoff=score_cutoff)
+        similarity = 0.7 * similarity + 0.3 * partial_scores
+        for i, text1 in enumerate(texts1):
+            for j, text2 in enumerate(texts2):
+                if _is_same_tech_term(text1, text2):
+                    similarity[i, j] = 1.0
+    
+    return np.clip(similarity, 0.0, 1.0)
+
+def _is_same_tech_term(text1, text2):
+    """
+    Check whether two technical terms are aliases, variants or acronyms of each other.
+    """
+    skill_index = get_lexicon().canonical_skills
+    skill_id1 = skill_index.canonical_id(text1)
+    skill_id2 = skill_index.canonical_id(text2)
     
-    # Remove version numbers and common suffixes
-    normalized = re.sub(r'\s+\d+(\.\d+)*', '', normalized)  # Remove version numbers
-    normalized = re.sub(r'\s+(framework|library|language|platform)$', '', normalized)  # Remove common tech suffixes
+    # Aliases, acronyms and variants of the same known skill (e.g. "k8s" and "Kubernetes")
+    if skill_id1 is not None and skill_id1 == skill_id2:
+        return True
     
-    # Remove special characters and extra spaces
-    normalized = re.sub(r'[^\w\s]', '', normalized)
-    normalized = re.sub(r'\s+', ' ', normalized).strip()
+    # Check for acronym matches when a term is outside the vocabulary; two known
+    # skills with different IDs are different even if they normalize alike ("C#", "C++")
+    if skill_id1 is None or skill_id2 is None:
+        return _is_acronym_match(skill_index.normalize(text1), skill_index.normalize(text2))
     
-    return normalized
+    return False
 
 def _is_acronym_match(term1, term2):
     """
@@ -249,141 +430,3 @@ def _is_acronym_match(term1, term2):
         return term2 == acronym.lower()
     
     return False
-
-def _are_tech_variants(term1, term2):
-    """
-    Check for common technology name variations.
-    """
-    # Technology name variants mapping
-    tech_variants = {
-        'javascript': ['js'],
-        'typescript': ['ts'],
-        'python': ['py'],
-        'react': ['reactjs', 'react.js'],
-        'node': ['nodejs', 'node.js'],
-        'angular': ['angularjs', 'angular.js'],
-        'vue': ['vuejs', 'vue.js'],
-        'dotnet': ['dot net', '.net', 'net framework'],
-        'csharp': ['c#', 'c sharp'],
-        'cplusplus': ['c++', 'cpp'],
-        'objective-c': ['objective c', 'objectivec'],
-        'machine learning': ['ml'],
-        'artificial intelligence': ['ai'],
-        'natural language processing': ['nlp'],
-        'kubernetes': ['k8s'],
-        'database': ['db'],
-    }
-    
-    # Normalize both terms further
-    t1 = term1.replace('-', '').replace('.', '').replace(' ', '')
-    t2 = term2.replace('-', '').replace('.', '').replace(' ', '')
-    
-    # Check direct mapping first
-    for base, variants in tech_variants.items():
-        base_norm = base.replace('-', '').replace('.', '').replace(' ', '')
-        
-        # If term1 is the base or a variant
-        if t1 == base_norm or t1 in [v.replace('-', '').replace('.', '').replace(' ', '') for v in variants]:
-            # Check if term2 is also the base or a variant
-            if t2 == base_norm or t2 in [v.replace('-', '').replace('.', '').replace(' ', '') for v in variants]:
-                return True
-    
-    return False
-
-def _calculate_partial_match_score(text1, text2):
-    """
-    Calculate a score based on partial string matching, useful for technical terms.
-    """
-    # Convert to lowercase for comparison
-    s1 = text1.lower()
-    s2 = text2.lower()
-    
-    # If either string is a substring of the other, assign a high score
-    if s1 in s2 or s2 in s1:
-        return 0.85
-    
-    # Calculate Levenshtein (edit) distance
-    try:
-        import Levenshtein
-        max_len = max(len(s1), len(s2))
-        if max_len == 0:
-            return 0
-        edit_distance = Levenshtein.distance(s1, s2)
-        return 1.0 - (edit_distance / max_len)
-    except ImportError:
-        # Fallback if Levenshtein library is not available
-        # Use SequenceMatcher from difflib (built-in)
-        from difflib import SequenceMatcher
-        return SequenceMatcher(None, s1, s2).ratio()
-
-# Analyze text quality including passive voice detection
-def analyze_text_quality(text):
-    """
-    Analyze text quality aspects like passive vs active voice using Azure Language services.
-    
-    Args:
-        text (str): The text to analyze
-        
-    Returns:
-        dict: Analysis results including passive voice ratio and examples
-    """
-    client = get_text_analytics_client()
-    if not client:
-        return {"passive_voice_ratio": 0, "passive_examples": []}
-    
-    try:
-        # First, split text into sentences for analysis
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-        
-        # Initialize counters and result containers
-        total_sentences = len(sentences)
-        passive_sentences = 0
-        passive_examples = []
-        
-        # Common passive voice indicators
-        passive_indicators = [
-            r'\b(?:am|is|are|was|were|be|being|been)\s+\w+ed\b',
-            r'\b(?:has|have|had)\s+been\s+\w+ed\b',
-            r'\b(?:will|shall|should|would|could|might|must)\s+be\s+\w+ed\b'
-        ]
-        
-        for sentence in sentences:
-            # Skip very short sentences
-            if len(sentence.split()) < 3:
-                total_sentences -= 1
-                continue
-                
-            # Check for passive voice patterns
-            is_passive = any(re.search(pattern, sentence, re.IGNORECASE) for pattern in passive_indicators)
-            
-            if is_passive:
-                passive_sentences += 1
-                
-                # Generate an active voice alternative if possible
-                if len(passive_examples) < 3:  # Limit examples to avoid large result
-                    # Find the passive part of the sentence
-                    for pattern in passive_indicators:
-                        match = re.search(pattern, sentence, re.IGNORECASE)
-                        if match:
-                            passive_part = match.group(0)
-                            
-                            # Simple conversion of common passive phrases (very basic)
-                            active_suggestion = sentence.replace(passive_part, "actively did")
-                            
-                            passive_examples.append({
-                                "original": sentence,
-                                "suggestion": active_suggestion
-                            })
-                            break
-        
-        # Calculate passive voice ratio
-        passive_ratio = passive_sentences / total_sentences if total_sentences > 0 else 0
-        
-        return {
-            "passive_voice_ratio": passive_ratio,
-            "passive_examples": passive_examples
-        }
-        
-    except Exception as e:
-        print(f"Error analyzing text quality: {str(e)}")
-        return {"passive_voice_ratio": 0, "passive_examples": []} 
\ No newline at end of file
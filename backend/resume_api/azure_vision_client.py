@@ -2,11 +2,20 @@ import os
 import time
 import io
 import tempfile
+import asyncio
 from dotenv import load_dotenv
 from azure.cognitiveservices.vision.computervision import ComputerVisionClient
 from azure.cognitiveservices.vision.computervision.models import OperationStatusCodes
 from msrest.authentication import CognitiveServicesCredentials
 
+from .loop_resources import get_loop_resource
+
+try:
+    import aiohttp
+except ImportError:
+    # Only the async extraction functions need it
+    aiohttp = None
+
 # Load environment variables
 load_dotenv()
 
@@ -14,6 +23,25 @@ load_dotenv()
 key = os.getenv("AZURE_VISION_KEY")
 endpoint = os.getenv("AZURE_VISION_ENDPOINT")
 
+# Returned when the read operation does not finish within the caller's timeout
+OCR_TIMEOUT_ERROR = "Error: Text extraction timed out"
+
+# Read API used by the async functions, which call the REST endpoint directly
+READ_API_PATH = "/vision/v3.2/read/analyze"
+
+async def _get_session():
+    """
+    Get the aiohttp session of the running event loop, shared so its connections
+    are reused, and closed when the loop shuts down.
+    """
+    return await get_loop_resource("vision session", aiohttp.ClientSession)
+
+def _request_timeout(deadline):
+    """Time left until the deadline for one request, as the session is shared."""
+    if deadline is None:
+        return aiohttp.ClientTimeout(total=None)
+    return aiohttp.ClientTimeout(total=max(0.001, deadline - time.monotonic()))
+
 def get_vision_client():
     """
     Creates and returns an instance of the Azure Computer Vision client.
@@ -26,12 +54,13 @@ def get_vision_client():
         print(f"Error initializing Computer Vision client: {str(e)}")
         return None
 
-def extract_text_from_image(image_data):
+def extract_text_from_image(image_data, timeout=None):
     """
     Extract text from an image using Azure Computer Vision's OCR.
     
     Args:
         image_data (bytes): The binary image data
+        timeout (float, optional): Seconds to wait for the result before giving up
         
     Returns:
         str: Extracted text from the image
@@ -40,6 +69,8 @@ def extract_text_from_image(image_data):
     if not client:
         return "Error: Could not initialize Computer Vision client"
     
+    deadline = None if timeout is None else time.monotonic() + timeout
+    
     try:
         # Call the API for text recognition (OCR)
         read_response = client.read_in_stream(io.BytesIO(image_data), raw=True)
@@ -59,6 +90,8 @@ def extract_text_from_image(image_data):
             read_result = client.get_read_result(operation_id)
             if read_result.status not in [OperationStatusCodes.running, OperationStatusCodes.not_started]:
                 break
+            if deadline is not None and time.monotonic() + retry_delay > deadline:
+                return OCR_TIMEOUT_ERROR
             time.sleep(retry_delay)
             retry_count += 1
         
@@ -74,12 +107,13 @@ def extract_text_from_image(image_data):
     except Exception as e:
         return f"Error extracting text: {str(e)}"
 
-def extract_text_from_pdf(pdf_data):
+def extract_text_from_pdf(pdf_data, timeout=None):
     """
     Extract text from a PDF file using Azure Computer Vision.
     
     Args:
         pdf_data (bytes): The binary PDF data
+        timeout (float, optional): Seconds to wait for the result before giving up
         
     Returns:
         str: Extracted text from the PDF
@@ -99,7 +133,7 @@ def extract_text_from_pdf(pdf_data):
             pdf_content = pdf_file.read()
         
         # Call the same method used for images
-        extracted_text = extract_text_from_image(pdf_content)
+        extracted_text = extract_text_from_image(pdf_content, timeout=timeout)
         
         # Clean up temporary file
         try:
@@ -109,4 +143,82 @@ def extract_text_from_pdf(pdf_data):
         
         return extracted_text
     except Exception as e:
-        return f"Error extracting text from PDF: {str(e)}" 
\ No newline at end of file
+        return f"Error extracting text from PDF: {str(e)}" 
+
+async def extract_text_from_image_async(image_data, timeout=None):
+    """
+    Extract text from an image without blocking the event loop; see extract_text_from_image.
+    
+    The Computer Vision SDK has no async client, so this calls the Read REST
+    API with aiohttp and polls the operation with asyncio.sleep.
+    
+    Args:
+        image_data (bytes): The binary image data
+        timeout (float, optional): Seconds to wait for the result before giving up
+        
+    Returns:
+        str: Extracted text from the image
+    """
+    if aiohttp is None:
+        return "Error: aiohttp is required for async text extraction"
+    if not key or not endpoint:
+        return "Error: Could not initialize Computer Vision client"
+    
+    deadline = None if timeout is None else time.monotonic() + timeout
+    headers = {"Ocp-Apim-Subscription-Key": key}
+    
+    try:
+        session = await _get_session()
+        # Start the read operation; its URL comes back in Operation-Location
+        async with session.post(
+            endpoint.rstrip("/") + READ_API_PATH, data=image_data,
+            headers={**headers, "Content-Type": "application/octet-stream"},
+            timeout=_request_timeout(deadline)
+        ) as response:
+            response.raise_for_status()
+            operation_location = response.headers["Operation-Location"]
+        
+        # Wait for the operation to complete
+        max_retry = 10
+        retry_delay = 1  # seconds
+        retry_count = 0
+        
+        while True:
+            async with session.get(operation_location, headers=headers,
+                                   timeout=_request_timeout(deadline)) as response:
+                response.raise_for_status()
+                read_result = await response.json()
+            if read_result["status"] not in ("running", "notStarted") or retry_count >= max_retry:
+                break
+            if deadline is not None and time.monotonic() + retry_delay > deadline:
+                return OCR_TIMEOUT_ERROR
+            await asyncio.sleep(retry_delay)
+            retry_count += 1
+        
+        # Check the result
+        if read_result["status"] == "succeeded":
+            text = ""
+            for page in read_result["analyzeResult"]["readResults"]:
+                for line in page["lines"]:
+                    text += line["text"] + "\n"
+            return text
+        else:
+            return f"Error extracting text: Operation did not succeed, status: {read_result['status']}"
+    except asyncio.TimeoutError:
+        return OCR_TIMEOUT_ERROR
+    except Exception as e:
+        return f"Error extracting text: {str(e)}"
+
+async def extract_text_from_pdf_async(pdf_data, timeout=None):
+    """
+    Extract text from a PDF file without blocking the event loop.
+    
+    Args:
+        pdf_data (bytes): The binary PDF data
+        timeout (float, optional): Seconds to wait for the result before giving up
+        
+    Returns:
+        str: Extracted text from the PDF
+    """
+    # The Read API accepts PDF bytes as they are
+    return await extract_text_from_image_async(pdf_data, timeout=timeout)
@@ -0,0 +1,103 @@
+import os
+import time
+import threading
+
+# Budget applied when a request does not set one; 0 means no deadline
+DEFAULT_BUDGET_MS = int(os.getenv("ANALYSIS_BUDGET_MS", "0"))
+
+# Time a stage needs to be worth starting. With less time left the stage is
+# degraded: skipped or replaced by a cheaper local alternative.
+STAGE_COST_MS = {
+    "ocr": int(os.getenv("BUDGET_OCR_MS", "4000")),
+    "keyPhrases": int(os.getenv("BUDGET_KEY_PHRASES_MS", "800")),
+    "sentiment": int(os.getenv("BUDGET_SENTIMENT_MS", "800")),
+    "semanticMatching": int(os.getenv("BUDGET_SEMANTIC_MATCHING_MS", "500")),
+    "contentSemantics": int(os.getenv("BUDGET_CONTENT_SEMANTICS_MS", "300")),
+}
+
+
+def parse_budget(value):
+    """
+    Parse a budget given as a header or request parameter.
+
+    Args:
+        value (str): Milliseconds, or None/empty for the default budget
+
+    Returns:
+        int: The budget in milliseconds, or None for no deadline
+
+    Raises:
+        ValueError: If the value is not a positive whole number
+    """
+    if value in (None, ""):
+        return DEFAULT_BUDGET_MS or None
+    try:
+        budget_ms = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid analysis budget '{value}': expected milliseconds")
+    if budget_ms <= 0:
+        raise ValueError(f"Invalid analysis budget '{value}': must be greater than 0")
+    return budget_ms
+
+
+class Deadline:
+    """
+    Time budget of one analysis request.
+
+    Stages ask allows(stage) before expensive work; when the remaining time is
+    below the stage's cost the stage is recorded as degraded and the caller
+    takes its cheaper path. A Deadline without a budget allows everything.
+    Safe to share between the threads of one request.
+    """
+
+    def __init__(self, budget_ms=None):
+        """
+        Args:
+            budget_ms (int, optional): Time budget in milliseconds; None for no deadline
+        """
+        self.budget_ms = budget_ms
+        self.started_at = time.monotonic()
+        self._degraded = []
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self):
+        return (time.monotonic() - self.started_at) * 1000
+
+    def remaining_ms(self):
+        """Milliseconds left, or None if there is no deadline."""
+        if self.budget_ms is None:
+            return None
+        return max(0.0, self.budget_ms - self.elapsed_ms())
+
+    def remaining_seconds(self):
+        """Seconds left, for use as a network timeout, or None if there is no deadline."""
+        remaining = self.remaining_ms()
+        return None if remaining is None else remaining / 1000
+
+    def allows(self, stage):
+        """
+        Check whether enough time is left to run a stage in full.
+
+        Args:
+            stage (str): A key of STAGE_COST_MS
+
+        Returns:
+            bool: True to run the stage, False if it was degraded
+        """
+        remaining = self.remaining_ms()
+        if remaining is None or remaining >= STAGE_COST_MS.get(stage, 0):
+            return True
+        self.degrade(stage)
+        return False
+
+    def degrade(self, stage):
+        """Record that a stage ran in degraded mode."""
+        with self._lock:
+            if stage not in self._degraded:
+                self._degraded.append(stage)
+
+    @property
+    def degraded_stages(self):
+        """Degraded stages in the order they were degraded."""
+        with self._lock:
+            return list(self._degraded)
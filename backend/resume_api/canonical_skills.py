@@ -0,0 +1,162 @@
+import re
+from collections import Counter
+from types import MappingProxyType
+
+_VERSION = re.compile(r'\s+\d+(\.\d+)*')
+_GENERIC_SUFFIX = re.compile(r'\s+(framework|library|language|platform)$')
+_PUNCTUATION = re.compile(r'[^\w\s]')
+_SPACES = re.compile(r'\s+')
+# Generated acronyms shorter than this are only used when they are vocabulary skills
+MIN_ACRONYM_LENGTH = 3
+
+
+def squash(term):
+    """Drop hyphens, dots and spaces so 'react.js' and 'reactjs' compare equal."""
+    return term.replace('-', '').replace('.', '').replace(' ', '')
+
+
+def strip_vendor_prefix(term, vendor_prefixes):
+    """Remove vendor prefixes such as 'ms ' or 'google ' from a lower-cased term."""
+    for prefix in vendor_prefixes:
+        if term.startswith(prefix):
+            term = term[len(prefix):]
+    return term
+
+
+def normalize_term(term, vendor_prefixes):
+    """
+    Normalize a technical term: lower-case it, remove vendor prefixes,
+    version numbers, generic suffixes and punctuation.
+
+    Args:
+        term (str): The term to normalize
+        vendor_prefixes (tuple): Prefixes that do not change the meaning
+
+    Returns:
+        str: The normalized term
+    """
+    normalized = strip_vendor_prefix(term.lower(), vendor_prefixes)
+    normalized = _VERSION.sub('', normalized)
+    normalized = _GENERIC_SUFFIX.sub('', normalized)
+    normalized = _PUNCTUATION.sub('', normalized)
+    return _SPACES.sub(' ', normalized).strip()
+
+
+class CanonicalSkillIndex:
+    """
+    Maps every known spelling of a skill to one canonical skill ID.
+
+    Built once from the lexicon: vocabulary skills, variant groups
+    ('k8s' -> kubernetes, 'c#' -> csharp), vendor-prefixed forms
+    ('microsoft azure' -> azure) and acronyms of multi-word skills
+    ('nlp' -> natural language processing). Lookups are a few dict probes,
+    so whole documents can be reduced to ID sets and compared with set
+    operations before any semantic scoring.
+    """
+
+    def __init__(self, tech_skills, tech_variants, vendor_prefixes):
+        """
+        Args:
+            tech_skills (Mapping): Category -> skills
+            tech_variants (Mapping): Base name -> list of variant spellings
+            vendor_prefixes (tuple): Prefixes that do not change the meaning
+        """
+        self.vendor_prefixes = tuple(vendor_prefixes)
+        aliases = {}
+
+        # Variant groups share the ID of their base name
+        for base, variants in tech_variants.items():
+            for term in [base] + list(variants):
+                aliases.setdefault(squash(term.lower()), squash(base.lower()))
+
+        skills = [skill.lower() for category_skills in tech_skills.values() for skill in category_skills]
+        for skill in skills:
+            aliases.setdefault(squash(skill), squash(skill))
+
+        # 'microsoft azure' is azure, but 'google cloud' stays itself since 'cloud' is not a skill
+        for skill in skills:
+            stripped = squash(strip_vendor_prefix(skill, self.vendor_prefixes))
+            if stripped != squash(skill) and stripped in aliases:
+                self._merge(aliases, aliases[squash(skill)], aliases[stripped])
+
+        # Acronyms of multi-word skills: merge with a vocabulary skill of the same
+        # spelling ('ml', 'cv'), otherwise add them only when unambiguous and long
+        # enough not to collide with ordinary words ('as', 'do')
+        acronyms = {}
+        for skill in skills:
+            words = normalize_term(skill, ()).split()
+            if len(words) > 1:
+                acronyms.setdefault(''.join(word[0] for word in words), []).append(skill)
+        counts = Counter({acronym: len(set(aliases[squash(skill)] for skill in owners))
+                          for acronym, owners in acronyms.items()})
+        for acronym, owners in acronyms.items():
+            if counts[acronym] != 1:
+                continue
+            owner_id = aliases[squash(owners[0])]
+            if acronym in aliases:
+                self._merge(aliases, aliases[acronym], owner_id)
+            elif len(acronym) >= MIN_ACRONYM_LENGTH:
+                aliases[acronym] = owner_id
+
+        self.aliases = MappingProxyType(aliases)
+
+    @staticmethod
+    def _merge(aliases, old_id, new_id):
+        if old_id == new_id:
+            return
+        for key, skill_id in aliases.items():
+            if skill_id == old_id:
+                aliases[key] = new_id
+
+    def normalize(self, term):
+        """
+        Normalize a term with this lexicon's vendor prefixes.
+
+        Args:
+            term (str): The term to normalize
+
+        Returns:
+            str: The normalized term
+        """
+        return normalize_term(term, self.vendor_prefixes)
+
+    def canonical_id(self, term):
+        """
+        Get the canonical skill ID of a term.
+
+        Args:
+            term (str): Any spelling, e.g. 'MS SQL Server 2019', 'k8s' or 'C#'
+
+        Returns:
+            str: The canonical ID, or None if the term is not a known skill
+        """
+        lower = term.lower().strip()
+        # Try the literal spelling first so 'c#' and 'c++' are not reduced to 'c'
+        skill_id = self.aliases.get(squash(lower))
+        if skill_id is None:
+            skill_id = self.aliases.get(squash(self.normalize(lower)))
+        return skill_id
+
+    def canonical_ids(self, terms):
+        """
+        Reduce terms to the set of canonical IDs of the known skills among them.
+
+        Args:
+            terms (list): Skill terms
+
+        Returns:
+            set: Canonical skill IDs
+        """
+        ids = {self.canonical_id(term) for term in terms}
+        ids.discard(None)
+        return ids
+
+    def same_skill(self, term1, term2):
+        """
+        Check whether two terms are spellings of the same known skill.
+
+        Returns:
+            bool: True if both map to the same canonical ID
+        """
+        skill_id = self.canonical_id(term1)
+        return skill_id is not None and skill_id == self.canonical_id(term2)
@@ -0,0 +1,143 @@
+import re
+import unicodedata
+
+from .lexicon import get_lexicon
+from .sections import segment_sections
+
+# Characters PDF/OCR extraction leaves behind that carry no text
+_INVISIBLE_CHARACTERS = dict.fromkeys(map(ord, '\u00ad\u200b\u200c\u200d\u2060\ufeff'))
+# Typographic punctuation mapped to the ASCII forms the analysis patterns expect
+_PUNCTUATION = str.maketrans({
+    '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+    '\u2010': '-', '\u2011': '-', '\u2012': '-', '\u2013': '-', '\u2014': '-', '\u2212': '-',
+})
+# A word broken across two lines with a hyphen, e.g. "develop-\nment"
+_LINE_BREAK_HYPHENATION = re.compile(r'(\w)-[ \t]*\n[ \t]*([a-z])')
+_HORIZONTAL_SPACE = re.compile(r'[^\S\n]+')
+_WORD = re.compile(r'\b\w+\b')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+
+
+def clean_text(text):
+    """
+    Normalize extracted text: Unicode compatibility forms (which also expands
+    ligatures such as 'ﬁ'), invisible characters, typographic punctuation,
+    words hyphenated across line breaks and runs of spaces.
+
+    Args:
+        text (str): Raw extracted text
+
+    Returns:
+        str: The cleaned text, with line breaks preserved
+    """
+    text = unicodedata.normalize('NFKC', text)
+    text = text.translate(_INVISIBLE_CHARACTERS).translate(_PUNCTUATION)
+    text = _LINE_BREAK_HYPHENATION.sub(r'\1\2', text)
+    return _HORIZONTAL_SPACE.sub(' ', text)
+
+
+def _lower_same_length(text):
+    """Lower-case text without changing its length, so offsets stay valid."""
+    lower = text.lower()
+    if len(lower) == len(text):
+        return lower
+    # A few characters (e.g. 'İ') lower-case to two code points; leave those alone
+    return ''.join(char.lower() if len(char.lower()) == 1 else char for char in text)
+
+
+class ParsedDocument:
+    """
+    Parse-once representation of a resume or job description.
+
+    Holds the cleaned text, its lower-cased form, the token array and set,
+    and sentence and section offsets, so analysis stages share one parse instead of
+    re-deriving them from the raw string. Offsets index into both text and lower.
+    """
+
+    def __init__(self, raw_text, sections=None):
+        """
+        Args:
+            raw_text (str): The extracted text
+            sections (dict, optional): Section offsets already known, e.g. stored
+                with precomputed features; found on first use otherwise
+        """
+        self.raw_text = raw_text
+        self.text = clean_text(raw_text)
+        self.lower = _lower_same_length(self.text)
+        self.tokens = tuple(_WORD.findall(self.lower))
+        self.token_set = frozenset(self.tokens)
+        self.sentence_spans = self._split_sentences()
+        self._sections = sections
+
+    @classmethod
+    def of(cls, value):
+        """
+        Get a ParsedDocument for a value that may already be one.
+
+        Args:
+            value (str or ParsedDocument): Text or an existing document
+
+        Returns:
+            ParsedDocument: The parsed document
+        """
+        return value if isinstance(value, cls) else cls(value)
+
+    def __len__(self):
+        return len(self.text)
+
+    def _split_sentences(self):
+        spans = []
+        start = 0
+        for match in _SENTENCE_BREAK.finditer(self.text):
+            spans.append((start, match.start()))
+            start = match.end()
+        spans.append((start, len(self.text)))
+        return tuple(spans)
+
+    @property
+    def sentences(self):
+        """The text of each sentence, in order."""
+        return [self.text[start:end] for start, end in self.sentence_spans]
+
+    @property
+    def sections(self):
+        """
+        Offsets of every section body, found with one pass over the lines.
+
+        Returns:
+            dict: Section name -> (start, end) offsets
+        """
+        if self._sections is None:
+            self._sections = segment_sections(self.text, get_lexicon().section_aliases)
+        return self._sections
+
+    def section_span(self, section_names):
+        """
+        Find the offsets of a section's body, trying each heading name in turn.
+
+        Args:
+            section_names (list): Possible headings of the section
+
+        Returns:
+            tuple: (start, end) offsets, or None if no heading was found
+        """
+        section_aliases = get_lexicon().section_aliases
+        for section_name in section_names:
+            name = section_name.lower()
+            span = self.sections.get(section_aliases.get(name, name))
+            if span is not None:
+                return span
+        return None
+
+    def section(self, section_names):
+        """
+        Get the text of a section.
+
+        Args:
+            section_names (list): Possible headings of the section
+
+        Returns:
+            str: The section text, or empty string if not found
+        """
+        span = self.section_span(section_names)
+        return self.text[span[0]:span[1]].strip() if span else ""
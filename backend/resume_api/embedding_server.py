@@ -0,0 +1,128 @@
+import os
+import json
+import socket
+import struct
+import socketserver
+
+import numpy as np
+
+# Every message is a 4-byte big-endian header length, a JSON header and an
+# optional binary payload whose size is given in the header.
+_LENGTH = struct.Struct("!I")
+
+
+def _recv_exactly(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Embedding socket closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock, header, payload=b""):
+    """
+    Send a JSON header and an optional binary payload over a socket.
+
+    Args:
+        sock (socket.socket): Connected socket
+        header (dict): JSON-serialisable header
+        payload (bytes): Raw payload bytes
+    """
+    header = dict(header, payload_size=len(payload))
+    encoded = json.dumps(header).encode("utf-8")
+    sock.sendall(_LENGTH.pack(len(encoded)) + encoded + payload)
+
+
+def recv_message(sock):
+    """
+    Receive a message sent with send_message.
+
+    Args:
+        sock (socket.socket): Connected socket
+
+    Returns:
+        tuple: (header dict, payload bytes)
+    """
+    (header_size,) = _LENGTH.unpack(_recv_exactly(sock, _LENGTH.size))
+    header = json.loads(_recv_exactly(sock, header_size).decode("utf-8"))
+    payload = _recv_exactly(sock, header["payload_size"]) if header["payload_size"] else b""
+    return header, payload
+
+
+class RemoteEmbeddingBackend:
+    """
+    Embedding backend that forwards requests to a local embedding sidecar
+    over a Unix socket, so web workers never load the model themselves.
+    """
+    name = "remote"
+
+    def __init__(self, socket_path, timeout=30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def _request(self, header):
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            send_message(sock, header)
+            response, payload = recv_message(sock)
+
+        if "error" in response:
+            raise RuntimeError(f"Embedding server error: {response['error']}")
+        return np.frombuffer(payload, dtype=np.float32).reshape(response["shape"])
+
+    def embed(self, texts, max_length=None):
+        header = {"op": "embed", "texts": list(texts)}
+        if max_length:
+            header["max_length"] = max_length
+        return self._request(header)
+
+    def embed_windows(self, text, max_length=None, overlap=None, max_windows=None):
+        header = {"op": "embed_windows", "text": text}
+        for name, value in (("max_length", max_length), ("overlap", overlap), ("max_windows", max_windows)):
+            if value is not None:
+                header[name] = value
+        return self._request(header)
+
+
+class _EmbeddingRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        try:
+            header, _ = recv_message(self.request)
+        except (ConnectionError, ValueError):
+            return
+
+        try:
+            options = {name: header[name] for name in ("max_length", "overlap", "max_windows") if name in header}
+            if header.get("op") == "embed_windows" and self.server.worker is not None and not options:
+                vectors = self.server.worker.embed_windows(header["text"])
+            elif header.get("op") == "embed_windows":
+                vectors = self.server.backend.embed_windows(header["text"], **options)
+            elif self.server.worker is not None and not options:
+                vectors = self.server.worker.embed(header["texts"])
+            else:
+                vectors = self.server.backend.embed(header["texts"], **options)
+            vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+            send_message(self.request, {"shape": list(vectors.shape)}, vectors.tobytes())
+        except Exception as e:
+            print(f"Embedding server error: {str(e)}")
+            send_message(self.request, {"error": str(e)})
+
+
+class EmbeddingServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    Threaded Unix-socket server that embeds text for any number of web workers
+    with a single copy of the model. Concurrent requests are coalesced by the
+    batching worker when one is given.
+    """
+    daemon_threads = True
+
+    def __init__(self, socket_path, backend, worker=None):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        self.backend = backend
+        self.worker = worker
+        super().__init__(socket_path, _EmbeddingRequestHandler)
@@ -0,0 +1,481 @@
+import os
+import time
+import inspect
+import threading
+import numpy as np
+from dotenv import load_dotenv
+import torch
+from transformers import AutoTokenizer, AutoModel
+
+from .inference_worker import InferenceWorker
+
+# Load environment variables
+load_dotenv()
+
+# Embedding model settings
+MODEL_NAME = os.getenv("EMBEDDING_MODEL_NAME", "bert-base-uncased")
+BACKEND_NAME = os.getenv("EMBEDDING_BACKEND", "fp32").lower()  # fp32, int8, onnx or remote
+NUM_THREADS = int(os.getenv("EMBEDDING_NUM_THREADS", "0"))  # 0 keeps the torch/onnxruntime default
+PARITY_TOLERANCE = float(os.getenv("EMBEDDING_PARITY_TOLERANCE", "0.05"))
+ONNX_MODEL_PATH = os.getenv(
+    "EMBEDDING_ONNX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ml_models", "embedding.onnx")
+)
+WINDOW_OVERLAP = int(os.getenv("EMBEDDING_WINDOW_OVERLAP", "32"))  # Tokens shared by neighbouring windows
+MAX_WINDOWS = int(os.getenv("EMBEDDING_MAX_WINDOWS", "32"))  # Upper bound on windows per document
+LONG_TEXT_POOLING = os.getenv("EMBEDDING_LONG_TEXT_POOLING", "mean").lower()  # mean or max
+BATCHING_ENABLED = os.getenv("EMBEDDING_BATCHING", "1") == "1"  # Share one batching worker across threads
+MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "32"))
+MAX_WAIT_MS = float(os.getenv("EMBEDDING_MAX_WAIT_MS", "2"))  # Extra wait for stragglers before running a batch
+SOCKET_PATH = os.getenv("EMBEDDING_SOCKET_PATH", "/tmp/resume-embeddings.sock")  # Sidecar socket for the remote backend
+# Set in the pre-fork master (see gunicorn.conf.py), where no inference may run
+PRELOADING = os.getenv("PRELOAD_MODELS") == "1"
+MAX_LENGTH = 128
+
+# Sentence pairs used to compare a faster backend against the fp32 model
+PARITY_PAIRS = [
+    ("python", "python programming"),
+    ("javascript", "typescript"),
+    ("machine learning", "deep learning"),
+    ("project management", "leadership"),
+    ("react", "angular"),
+    ("sql server", "postgresql"),
+    ("Led a team of five engineers to deliver a cloud migration.",
+     "achieved improved increased decreased launched created managed led"),
+    ("Increased sales by 20% through targeted campaigns.",
+     "achievements accomplishments results impact outcomes success metrics"),
+    ("Responsible for maintaining internal documentation.",
+     "Developed REST APIs in Django and deployed them on AWS."),
+    ("communication", "teamwork"),
+]
+
+
+def set_num_threads(num_threads):
+    """
+    Limit the number of intra-op threads torch uses for inference.
+
+    Args:
+        num_threads (int): Thread count, 0 or less keeps the current setting
+    """
+    if num_threads and num_threads > 0:
+        torch.set_num_threads(num_threads)
+
+
+class EmbeddingBackend:
+    """
+    Base class for embedding backends. Subclasses run the model on tokenized
+    inputs and return the [CLS] token embedding of each sequence.
+    """
+    name = None
+    tensor_type = "pt"
+
+    def __init__(self, tokenizer):
+        self.tokenizer = tokenizer
+
+    def _forward(self, inputs):
+        raise NotImplementedError
+
+    def embed(self, texts, max_length=MAX_LENGTH):
+        """
+        Embed a batch of texts in a single forward pass.
+
+        Args:
+            texts (list): Texts to embed
+            max_length (int): Maximum number of tokens per text
+
+        Returns:
+            numpy.ndarray: Array of shape (len(texts), hidden_size)
+        """
+        inputs = self.tokenizer(list(texts), return_tensors=self.tensor_type, padding=True,
+                                truncation=True, max_length=max_length)
+        return self._forward(dict(inputs))
+
+    def embed_windows(self, text, max_length=MAX_LENGTH, overlap=WINDOW_OVERLAP,
+                      max_windows=MAX_WINDOWS):
+        """
+        Split a long text into overlapping token windows and embed all of
+        them in a single batched forward pass.
+
+        Args:
+            text (str): Text to embed
+            max_length (int): Tokens per window, including special tokens
+            overlap (int): Tokens shared by neighbouring windows
+            max_windows (int): Maximum number of windows to embed
+
+        Returns:
+            numpy.ndarray: Array of shape (num_windows, hidden_size)
+        """
+        inputs = self.tokenizer(text, return_tensors=self.tensor_type, padding=True,
+                                truncation=True, max_length=max_length, stride=overlap,
+                                return_overflowing_tokens=True)
+        inputs = dict(inputs)
+        inputs.pop("overflow_to_sample_mapping", None)
+        if max_windows:
+            inputs = {name: value[:max_windows] for name, value in inputs.items()}
+        return self._forward(inputs)
+
+
+class TorchEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds text with the fp32 PyTorch BERT model using the [CLS] token.
+    """
+    name = "fp32"
+
+    def __init__(self, tokenizer, model):
+        super().__init__(tokenizer)
+        self.model = model
+        self.model.eval()
+
+    def _forward(self, inputs):
+        with torch.no_grad():
+            outputs = self.model(**inputs)
+        return outputs.last_hidden_state[:, 0, :].numpy()
+
+
+class QuantizedEmbeddingBackend(TorchEmbeddingBackend):
+    """
+    Embeds text with a dynamically quantized (int8 Linear layers) copy of the model.
+    """
+    name = "int8"
+
+    def __init__(self, tokenizer, model):
+        quantized_model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        super().__init__(tokenizer, quantized_model)
+
+
+class OnnxEmbeddingBackend(EmbeddingBackend):
+    """
+    Embeds text with an exported ONNX graph executed by onnxruntime on CPU.
+    """
+    name = "onnx"
+    tensor_type = "np"
+
+    def __init__(self, tokenizer, model, model_path=ONNX_MODEL_PATH, num_threads=NUM_THREADS):
+        # onnxruntime is optional, only needed when this backend is selected
+        import onnxruntime
+
+        ensure_onnx_model(tokenizer, model, model_path)
+
+        options = onnxruntime.SessionOptions()
+        if num_threads and num_threads > 0:
+            options.intra_op_num_threads = num_threads
+
+        super().__init__(tokenizer)
+        self.session = onnxruntime.InferenceSession(
+            model_path, options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {graph_input.name for graph_input in self.session.get_inputs()}
+
+    def _forward(self, inputs):
+        feed = {name: value.astype(np.int64) for name, value in inputs.items()
+                if name in self.input_names}
+        last_hidden_state = self.session.run(["last_hidden_state"], feed)[0]
+        return last_hidden_state[:, 0, :]
+
+
+class _OnnxExportWrapper(torch.nn.Module):
+    """Exposes BERT with explicit positional inputs and a single output for export."""
+
+    def __init__(self, model):
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids, attention_mask, token_type_ids):
+        outputs = self.model(input_ids=input_ids, attention_mask=attention_mask,
+                             token_type_ids=token_type_ids)
+        return outputs.last_hidden_state
+
+
+def ensure_onnx_model(tokenizer, model, model_path=ONNX_MODEL_PATH):
+    """
+    Export the ONNX graph unless it exists. Processes that get here at the
+    same time (e.g. gunicorn workers right after fork) take turns on a lock
+    file, so the graph is exported once and the others load the finished file.
+
+    Args:
+        tokenizer: The Hugging Face tokenizer
+        model: The fp32 PyTorch model
+        model_path (str): Where the .onnx file belongs
+    """
+    if os.path.exists(model_path):
+        return
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    with open(model_path + ".lock", "w") as lock_file:
+        try:
+            # fcntl is Unix-only; elsewhere the atomic replace in export_onnx_model still applies
+            import fcntl
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        except ImportError:
+            pass
+        if not os.path.exists(model_path):
+            export_onnx_model(tokenizer, model, model_path)
+
+
+def export_onnx_model(tokenizer, model, model_path):
+    """
+    Export the BERT model to an ONNX graph with dynamic batch and sequence axes.
+
+    The graph is written to a temporary file next to model_path and moved
+    into place when complete, so no reader ever sees a half-written file.
+
+    Args:
+        tokenizer: The Hugging Face tokenizer
+        model: The fp32 PyTorch model
+        model_path (str): Where to write the .onnx file
+    """
+    os.makedirs(os.path.dirname(model_path), exist_ok=True)
+    temp_path = f"{model_path}.{os.getpid()}.tmp"
+    # Export with a padded batch so the attention mask stays in the traced graph
+    sample = tokenizer(["sample text", "a longer sample text with padding"],
+                       return_tensors="pt", padding=True)
+    input_names = ["input_ids", "attention_mask", "token_type_ids"]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["last_hidden_state"] = {0: "batch", 1: "sequence"}
+
+    export_kwargs = {}
+    # Newer torch versions default to the dynamo exporter, keep the TorchScript one
+    if "dynamo" in inspect.signature(torch.onnx.export).parameters:
+        export_kwargs["dynamo"] = False
+
+    # The exporter restores the wrapper's training flag afterwards, so it must be in eval mode
+    wrapper = _OnnxExportWrapper(model).eval()
+    with torch.no_grad():
+        try:
+            torch.onnx.export(
+                wrapper,
+                tuple(sample[name] for name in input_names),
+                temp_path,
+                input_names=input_names,
+                output_names=["last_hidden_state"],
+                dynamic_axes=dynamic_axes,
+                opset_version=17,
+                **export_kwargs
+            )
+            os.replace(temp_path, model_path)
+        finally:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+
+
+def pool_embeddings(window_embeddings, pooling=LONG_TEXT_POOLING):
+    """
+    Pool per-window embeddings into a single document embedding.
+
+    Args:
+        window_embeddings (numpy.ndarray): Array of shape (num_windows, hidden_size)
+        pooling (str): mean or max
+
+    Returns:
+        numpy.ndarray: The pooled embedding vector
+    """
+    if pooling == "max":
+        return window_embeddings.max(axis=0)
+    return window_embeddings.mean(axis=0)
+
+
+def _cosine(a, b):
+    """Row-wise cosine similarity between two arrays of equal shape."""
+    denominator = np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1)
+    denominator[denominator == 0] = 1.0
+    return np.sum(a * b, axis=1) / denominator
+
+
+def check_parity(backend, reference, pairs=PARITY_PAIRS):
+    """
+    Compare the similarity scores of a backend against a reference backend.
+
+    Args:
+        backend: The backend under test
+        reference: The fp32 reference backend
+        pairs (list): (text1, text2) tuples to score
+
+    Returns:
+        float: The largest absolute difference in cosine similarity
+    """
+    left = [pair[0] for pair in pairs]
+    right = [pair[1] for pair in pairs]
+
+    expected = _cosine(reference.embed(left), reference.embed(right))
+    actual = _cosine(backend.embed(left), backend.embed(right))
+
+    return float(np.max(np.abs(expected - actual)))
+
+
+def measure_throughput(backend, texts, batch_size=16, rounds=3):
+    """
+    Measure how many embeddings per second a backend produces.
+
+    Args:
+        backend: The backend to measure
+        texts (list): Texts to embed
+        batch_size (int): Number of texts per forward pass
+        rounds (int): Number of passes over the texts
+
+    Returns:
+        float: Embeddings per second
+    """
+    # Warm up once so lazy initialisation is not counted
+    backend.embed(texts[:batch_size])
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for i in range(0, len(texts), batch_size):
+            backend.embed(texts[i:i + batch_size])
+    elapsed = time.perf_counter() - start
+
+    return (len(texts) * rounds) / elapsed if elapsed > 0 else 0.0
+
+
+def create_backend(name, tokenizer, model):
+    """
+    Build an embedding backend by name.
+
+    Args:
+        name (str): fp32, int8 or onnx
+        tokenizer: The Hugging Face tokenizer
+        model: The fp32 PyTorch model
+
+    Returns:
+        The embedding backend
+    """
+    if name == "int8":
+        return QuantizedEmbeddingBackend(tokenizer, model)
+    if name == "onnx":
+        return OnnxEmbeddingBackend(tokenizer, model)
+    return TorchEmbeddingBackend(tokenizer, model)
+
+
+def load_backend(name=BACKEND_NAME, tolerance=PARITY_TOLERANCE, defer_parity=PRELOADING):
+    """
+    Load the embedding model and build the configured backend.
+
+    A quantized or ONNX backend is only used if its similarity scores stay
+    within the parity tolerance of the fp32 model, otherwise fp32 is used.
+
+    Args:
+        name (str): fp32, int8, onnx or remote
+        tolerance (float): Maximum allowed similarity deviation from fp32
+        defer_parity (bool): Return fp32 for now and leave checking the faster
+            backend to verify_backend, e.g. after fork. The int8 copy is still
+            quantized here, so forked workers share it; the ONNX session is
+            created after fork (export the graph beforehand with export_onnx_model).
+
+    Returns:
+        The embedding backend, or None if the model could not be loaded
+    """
+    global _deferred
+    if name == "remote":
+        # The model lives in the embedding sidecar (manage.py run_embedding_server)
+        from .embedding_server import RemoteEmbeddingBackend
+        return RemoteEmbeddingBackend(SOCKET_PATH)
+
+    set_num_threads(NUM_THREADS)
+
+    try:
+        tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+        model = AutoModel.from_pretrained(MODEL_NAME)
+    except Exception as e:
+        print(f"Error loading BERT model: {str(e)}")
+        return None
+
+    reference = TorchEmbeddingBackend(tokenizer, model)
+    if name == "fp32":
+        return reference
+    if defer_parity:
+        # The parity check and the ONNX export run the model, which must wait until after fork.
+        # Quantizing runs nothing, so the int8 copy is built once here and shared by the workers.
+        candidate = None
+        if name == "int8":
+            try:
+                candidate = QuantizedEmbeddingBackend(tokenizer, model)
+            except Exception as e:
+                print(f"Error creating {name} embedding backend, using fp32: {str(e)}")
+                return reference
+        _deferred = (name, candidate, tolerance)
+        return reference
+    return _checked_backend(name, reference, tolerance)
+
+
+def _checked_backend(name, reference, tolerance, candidate=None):
+    """Build a faster backend, unless given, falling back to the fp32 reference if it fails or deviates."""
+    tokenizer, model = reference.tokenizer, reference.model
+    try:
+        if candidate is None:
+            candidate = create_backend(name, tokenizer, model)
+        deviation = check_parity(candidate, reference)
+    except Exception as e:
+        print(f"Error creating {name} embedding backend, using fp32: {str(e)}")
+        return reference
+
+    if deviation > tolerance:
+        print(f"{name} embedding backend deviates by {deviation:.4f} (> {tolerance}), using fp32")
+        return reference
+
+    return candidate
+
+
+def verify_backend():
+    """
+    Build and check the backend whose parity check load_backend deferred,
+    switching to it if it passes. Called after fork, or on first use.
+
+    Returns:
+        The embedding backend in use
+    """
+    global backend, _deferred
+    with _deferred_lock:
+        if _deferred is not None:
+            name, candidate, tolerance = _deferred
+            _deferred = None
+            backend = _checked_backend(name, backend, tolerance, candidate)
+            if worker is not None:
+                worker.backend = backend
+    return backend
+
+
+def embed_texts(texts):
+    """
+    Embed texts with the loaded backend, going through the shared batching
+    worker when it is enabled so concurrent requests share forward passes.
+
+    Args:
+        texts (list): Texts to embed
+
+    Returns:
+        numpy.ndarray: Array of shape (len(texts), hidden_size)
+    """
+    if _deferred is not None:
+        verify_backend()
+    if worker is not None:
+        return worker.embed(texts)
+    return backend.embed(texts)
+
+
+def embed_windows(text):
+    """
+    Embed a long text window by window (see EmbeddingBackend.embed_windows)
+    on the same batching worker as embed_texts, so whole-document inference
+    does not run alongside the worker's batches on the same model.
+
+    Args:
+        text (str): Text to embed
+
+    Returns:
+        numpy.ndarray: Array of shape (num_windows, hidden_size)
+    """
+    if _deferred is not None:
+        verify_backend()
+    if worker is not None:
+        return worker.embed_windows(text)
+    return backend.embed_windows(text)
+
+
+_deferred = None
+_deferred_lock = threading.Lock()
+# Load the configured embedding backend
+backend = load_backend()
+# The sidecar batches requests itself, so remote backends skip the local worker
+worker = (InferenceWorker(backend, MAX_BATCH_SIZE, MAX_WAIT_MS)
+          if backend and BATCHING_ENABLED and backend.name != "remote" else None)
@@ -0,0 +1,167 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict, namedtuple
+
+from . import embeddings
+from .lexicon import get_lexicon
+
+# Documents whose derived features are kept, e.g. popular job descriptions
+FEATURE_CACHE_SIZE = int(os.getenv("FEATURE_CACHE_SIZE", "512"))
+# Extracted texts kept by the hash of the uploaded file, so a repeated upload skips extraction
+TEXT_CACHE_SIZE = int(os.getenv("TEXT_CACHE_SIZE", "1024"))
+# Embedding vectors kept, e.g. skill terms and document texts (about 3 KB each for BERT base)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "10000"))
+# Bump when a change to extraction or skill detection makes stored features stale
+FEATURE_VERSION = "2026.10.1"
+
+# Everything derived from one side of an analysis, independent of the other side.
+# document is the ParsedDocument, whose sections are computed once and kept with it.
+# Entries are shared by concurrent requests, so the phrase and skill lists are tuples.
+DocumentFeatures = namedtuple("DocumentFeatures", [
+    "text", "document", "key_phrases", "technical_skills", "soft_skills", "canonical_skills"
+])
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache whose entries carry a version.
+
+    An entry stored under another version than the one asked for is stale:
+    it is dropped and reported as a miss, so bumping a version invalidates
+    old entries lazily without a flush.
+    """
+
+    def __init__(self, name, max_entries):
+        self.name = name
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key, version):
+        """
+        Args:
+            key (str): The entry key
+            version (str): The current version
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] != version:
+                del self._entries[key]
+                self.invalidations += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, version, value):
+        """Store a value, evicting the least recently used entries beyond max_entries."""
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (version, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "maxEntries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+_features = LRUCache("features", FEATURE_CACHE_SIZE)
+_texts = LRUCache("texts", TEXT_CACHE_SIZE)
+_embeddings = LRUCache("embeddings", EMBEDDING_CACHE_SIZE)
+
+
+def content_key(content):
+    """
+    Key of a document text, which features are cached and stored under, or
+    of the bytes of an uploaded file, which its extracted text is cached under.
+
+    Args:
+        content (bytes or str): The uploaded file or the text
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+def features_version():
+    # A lexicon reload changes which skills are found, so it invalidates features too
+    return f"{FEATURE_VERSION}/lexicon {get_lexicon().version}"
+
+
+def embeddings_version():
+    backend = embeddings.backend.name if embeddings.backend else "none"
+    return f"{embeddings.MODEL_NAME}:{backend}"
+
+
+def get_features(key):
+    """Get the cached features of a document, or None."""
+    return _features.get(key, features_version())
+
+
+def put_features(key, features):
+    _features.put(key, features_version(), features)
+
+
+def get_text(upload_key):
+    """Get the text extracted earlier from an uploaded file, by the content_key of its bytes, or None."""
+    # Extraction changes bump FEATURE_VERSION as well
+    return _texts.get(upload_key, FEATURE_VERSION)
+
+
+def put_text(upload_key, text):
+    _texts.put(upload_key, FEATURE_VERSION, text)
+
+
+def get_embedding(text, kind):
+    """
+    Get a cached embedding.
+
+    Args:
+        text (str): The embedded text
+        kind (str): Which embedding, e.g. 'term' or 'long', since one text has several
+
+    Returns:
+        numpy.ndarray: The vector, or None on a miss
+    """
+    return _embeddings.get(f"{kind}:{content_key(text)}", embeddings_version())
+
+
+def put_embedding(text, kind, vector):
+    # A copy, so a row does not keep its whole batch alive, and read-only since it is shared
+    vector = vector.copy()
+    vector.setflags(write=False)
+    _embeddings.put(f"{kind}:{content_key(text)}", embeddings_version(), vector)
+
+
+def stats():
+    """Hit, miss and eviction counts of the caches."""
+    return {"features": _features.stats(), "texts": _texts.stats(), "embeddings": _embeddings.stats()}
@@ -0,0 +1,221 @@
+import os
+import time
+import threading
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.db import OperationalError, connection, transaction
+
+from . import embeddings
+from . import feature_cache
+from .document import ParsedDocument
+
+# Compute the features of resumes and job descriptions in the background when they are saved
+PRECOMPUTE_ON_SAVE = os.getenv("FEATURE_PRECOMPUTE_ON_SAVE", "1") == "1"
+# Background threads computing the features of saved documents
+PRECOMPUTE_WORKERS = int(os.getenv("FEATURE_PRECOMPUTE_WORKERS", "2"))
+# Attempts at a write that SQLite rejects with "database is locked"
+SQLITE_WRITE_ATTEMPTS = int(os.getenv("FEATURE_SQLITE_WRITE_ATTEMPTS", "5"))
+
+_executor = None
+_executor_lock = threading.Lock()
+_analyzer = None
+# SQLite has a single writer, so this process's feature writes take turns
+_sqlite_write_lock = threading.Lock()
+
+
+def get_precompute_executor():
+    """Get the process-wide pool computing features of saved documents, created on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PRECOMPUTE_WORKERS, thread_name_prefix="feature-precompute")
+    return _executor
+
+
+def _get_analyzer():
+    # Imported here since the analyzer itself loads stored features through this module
+    global _analyzer
+    if _analyzer is None:
+        from .resume_analyzer import ResumeAnalyzer
+        _analyzer = ResumeAnalyzer()
+    return _analyzer
+
+
+def _embedding_kind():
+    return f"long-{embeddings.LONG_TEXT_POOLING}"
+
+
+def document_embedding(document):
+    """
+    Get the whole-document embedding the semantic content checks use.
+
+    Args:
+        document (ParsedDocument): The document
+
+    Returns:
+        numpy.ndarray: The pooled embedding, or None without an embedding backend
+    """
+    if embeddings.backend is None:
+        return None
+    vector = feature_cache.get_embedding(document.text, _embedding_kind())
+    if vector is None:
+        # Not get_long_text_embedding, whose fallback vector on errors must not be stored
+        vector = embeddings.pool_embeddings(embeddings.embed_windows(document.text))
+        feature_cache.put_embedding(document.text, _embedding_kind(), vector)
+    return vector
+
+
+def load_features(texts):
+    """
+    Load the stored features of documents, if they are current for this version.
+
+    A stored document embedding of the current model goes into the embedding
+    cache as well, so the semantic checks of the analysis do not recompute it.
+
+    Args:
+        texts (dict): Content key (as from feature_cache.content_key) -> document text
+
+    Returns:
+        dict: Content key -> DocumentFeatures, for the documents found
+    """
+    from .models import DocumentFeatureSet
+
+    if not texts:
+        return {}
+    try:
+        rows = list(DocumentFeatureSet.objects.filter(
+            content_hash__in=list(texts), version=feature_cache.features_version()))
+    except Exception as e:
+        print(f"Error loading stored document features: {str(e)}")
+        return {}
+
+    embeddings_version = feature_cache.embeddings_version()
+    found = {}
+    for row in rows:
+        text = texts[row.content_hash]
+        document = ParsedDocument(text, sections={name: tuple(span) for name, span in row.sections.items()})
+        if row.embedding and row.embedding_version == embeddings_version:
+            feature_cache.put_embedding(document.text, _embedding_kind(),
+                                        np.frombuffer(bytes(row.embedding), dtype=np.float32))
+        found[row.content_hash] = feature_cache.DocumentFeatures(
+            text=text,
+            document=document,
+            key_phrases=tuple(row.key_phrases),
+            technical_skills=tuple(row.technical_skills),
+            soft_skills=tuple(row.soft_skills),
+            canonical_skills=frozenset(row.canonical_skills)
+        )
+    return found
+
+
+def stale_texts(texts):
+    """
+    Pick the texts whose stored features are missing or were derived by an
+    older analyzer, lexicon or embedding model.
+
+    Args:
+        texts (list): Document texts
+
+    Returns:
+        list: The stale texts, each once
+    """
+    from .models import DocumentFeatureSet
+
+    by_hash = {feature_cache.content_key(text): text for text in texts}
+    current = DocumentFeatureSet.objects.filter(
+        content_hash__in=list(by_hash), version=feature_cache.features_version())
+    if embeddings.backend is not None:
+        current = current.filter(embedding_version=feature_cache.embeddings_version())
+    for content_hash in current.values_list('content_hash', flat=True):
+        del by_hash[content_hash]
+    return list(by_hash.values())
+
+
+def precompute_features(texts):
+    """
+    Derive and store the features of documents: key phrases (in batched
+    requests), technical, soft and canonical skills, section offsets and the
+    document embedding. Documents whose key phrases could not be extracted
+    are left stale, to be retried by a later backfill.
+
+    Args:
+        texts (list): Document texts
+
+    Returns:
+        int: Number of documents stored
+    """
+    from .models import DocumentFeatureSet
+
+    stored = 0
+    version = feature_cache.features_version()
+    for features in _get_analyzer().extract_document_features(list(texts)):
+        if not features.key_phrases:
+            continue
+        embedding, embedding_version = None, ""
+        try:
+            vector = document_embedding(features.document)
+            if vector is not None:
+                embedding = np.asarray(vector, dtype=np.float32).tobytes()
+                embedding_version = feature_cache.embeddings_version()
+        except Exception as e:
+            print(f"Error embedding document for stored features: {str(e)}")
+        _write_features(feature_cache.content_key(features.text), {
+            "version": version,
+            "key_phrases": list(features.key_phrases),
+            "technical_skills": list(features.technical_skills),
+            "soft_skills": list(features.soft_skills),
+            "canonical_skills": sorted(features.canonical_skills),
+            "sections": {name: list(span) for name, span in features.document.sections.items()},
+            "embedding": embedding,
+            "embedding_version": embedding_version,
+        })
+        stored += 1
+    return stored
+
+
+def _write_features(content_hash, defaults):
+    """
+    Store the features of one document. On SQLite the writes of this process
+    are serialised, and a write refused because another connection holds the
+    database (a request, or another worker) is retried with backoff.
+    """
+    from .models import DocumentFeatureSet
+
+    sqlite = connection.vendor == "sqlite"
+    for attempt in range(SQLITE_WRITE_ATTEMPTS if sqlite else 1):
+        try:
+            with _sqlite_write_lock if sqlite else nullcontext():
+                DocumentFeatureSet.objects.update_or_create(content_hash=content_hash, defaults=defaults)
+            return
+        except OperationalError as e:
+            if not sqlite or "locked" not in str(e) or attempt == SQLITE_WRITE_ATTEMPTS - 1:
+                raise
+            time.sleep(0.05 * 2 ** attempt)
+
+
+def _precompute_in_background(text):
+    try:
+        if stale_texts([text]):
+            precompute_features([text])
+    except Exception as e:
+        print(f"Error precomputing document features: {str(e)}")
+    finally:
+        # Worker threads outlive requests, so nothing else closes their connection
+        connection.close()
+
+
+def schedule_precompute(text):
+    """
+    Compute the features of a saved document in the background, once the
+    transaction saving it commits. Unchanged or already current documents are
+    skipped, and a document just analyzed reuses the features the analysis
+    cached, so storing them costs no second round of Azure calls.
+
+    Args:
+        text (str): The document content
+    """
+    if PRECOMPUTE_ON_SAVE and text:
+        transaction.on_commit(lambda: get_precompute_executor().submit(_precompute_in_background, text))
@@ -0,0 +1,80 @@
+from difflib import SequenceMatcher
+
+import numpy as np
+
+try:
+    from rapidfuzz.process import cdist
+    from rapidfuzz.distance import Levenshtein
+except ImportError:
+    # Pure-Python fallback; results are the same up to the edit-distance definition
+    cdist = None
+    Levenshtein = None
+
+# Score given when one string contains the other
+SUBSTRING_SCORE = 0.85
+
+
+def _edit_similarity(s1, s2):
+    """1 - edit distance / length of the longer string, for lower-cased strings."""
+    if Levenshtein is not None:
+        return Levenshtein.normalized_similarity(s1, s2)
+    return SequenceMatcher(None, s1, s2).ratio()
+
+
+def partial_match_score(text1, text2):
+    """
+    Calculate a score based on partial string matching, useful for technical terms.
+
+    Args:
+        text1 (str): First text
+        text2 (str): Second text
+
+    Returns:
+        float: 0.85 if one text contains the other, otherwise the normalized edit similarity
+    """
+    s1 = text1.lower()
+    s2 = text2.lower()
+    if s1 in s2 or s2 in s1:
+        return SUBSTRING_SCORE
+    return _edit_similarity(s1, s2)
+
+
+def partial_match_matrix(texts1, texts2, score_cutoff=None, workers=1, detect_substrings=True):
+    """
+    Calculate partial match scores for every pair of texts in one call.
+
+    The edit similarities of the whole matrix are computed natively by
+    rapidfuzz; pairs where one text contains the other are then set to the
+    substring score, as in partial_match_score.
+
+    Args:
+        texts1 (list): Row texts, e.g. job skills
+        texts2 (list): Column texts, e.g. resume skills
+        score_cutoff (float, optional): Edit similarities below this are returned
+            as 0, which lets rapidfuzz stop scoring a pair early
+        workers (int): Threads used by rapidfuzz; -1 uses all cores
+        detect_substrings (bool): Apply the substring score; without it cells are pure edit similarities
+
+    Returns:
+        numpy.ndarray: Scores of shape (len(texts1), len(texts2))
+    """
+    rows = [text.lower() for text in texts1]
+    columns = [text.lower() for text in texts2]
+    if not rows or not columns:
+        return np.zeros((len(rows), len(columns)), dtype=np.float32)
+
+    if cdist is not None:
+        scores = cdist(rows, columns, scorer=Levenshtein.normalized_similarity,
+                       score_cutoff=score_cutoff, dtype=np.float32, workers=workers)
+    else:
+        scores = np.array([[_edit_similarity(s1, s2) for s2 in columns] for s1 in rows], dtype=np.float32)
+        if score_cutoff is not None:
+            scores[scores < score_cutoff] = 0.0
+
+    if not detect_substrings:
+        return scores
+    for i, s1 in enumerate(rows):
+        for j, s2 in enumerate(columns):
+            if s1 in s2 or s2 in s1:
+                scores[i, j] = SUBSTRING_SCORE
+    return scores
@@ -0,0 +1,186 @@
+import os
+import time
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class InferenceWorker:
+    """
+    Coalesces embedding requests from many threads into dynamic batches.
+
+    Callers submit a list of texts and get back a Future. A single background
+    thread drains the queue, taking everything that arrived while the previous
+    batch was running and then waiting at most max_wait_ms for more, and runs
+    one forward pass for up to max_batch_size texts.
+
+    Whole-document requests (submit_windows) go through the same thread, each
+    as its own forward pass over the document's windows, so the model never
+    runs on two threads at once.
+    """
+
+    def __init__(self, backend, max_batch_size=32, max_wait_ms=5):
+        self.backend = backend
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._carried = None        # A window request that ended the previous batch
+
+        # Metrics
+        self.batch_size_histogram = Counter()
+        self.batches_run = 0
+        self.texts_embedded = 0
+        self.max_queue_depth = 0
+        self.window_requests = 0
+
+    def _ensure_started(self):
+        """Start the batching thread, restarting it in a forked child process."""
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                # Threads do not survive fork, so anything queued in the parent is lost
+                self._queue = queue.Queue()
+                self._carried = None
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="inference-worker", daemon=True)
+            self._thread.start()
+
+    def submit(self, texts):
+        """
+        Queue texts for embedding.
+
+        Args:
+            texts (list): Texts to embed
+
+        Returns:
+            Future: Resolves to a numpy.ndarray of shape (len(texts), hidden_size)
+        """
+        return self._submit(list(texts), False)
+
+    def submit_windows(self, text):
+        """
+        Queue a long text to be embedded window by window; see EmbeddingBackend.embed_windows.
+
+        Args:
+            text (str): Text to embed
+
+        Returns:
+            Future: Resolves to a numpy.ndarray of shape (num_windows, hidden_size)
+        """
+        return self._submit([text], True)
+
+    def _submit(self, texts, windows):
+        self._ensure_started()
+        future = Future()
+        self._queue.put((texts, future, windows))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+        return future
+
+    def embed(self, texts, timeout=None):
+        """
+        Embed texts through the batching queue and wait for the result.
+
+        Args:
+            texts (list): Texts to embed
+            timeout (float, optional): Seconds to wait for the result
+
+        Returns:
+            numpy.ndarray: Array of shape (len(texts), hidden_size)
+        """
+        return self.submit(texts).result(timeout=timeout)
+
+    def embed_windows(self, text, timeout=None):
+        """Embed a long text through the queue and wait for its window embeddings."""
+        return self.submit_windows(text).result(timeout=timeout)
+
+    def _collect_batch(self):
+        """
+        Block for the first request, then gather more until the batch is full or
+        the wait expires. A window request runs alone: one that arrives while a
+        batch is gathered ends it and is kept for the next round.
+        """
+        first, self._carried = self._carried or self._queue.get(), None
+        requests = [first]
+        if first[2]:
+            return requests
+        size = len(first[0])
+        deadline = time.monotonic() + self.max_wait
+
+        while size < self.max_batch_size:
+            try:
+                # Take everything that queued up while the previous batch was running
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    request = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+            if request[2]:
+                self._carried = request
+                break
+            requests.append(request)
+            size += len(request[0])
+
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect_batch()
+            if requests[0][2]:
+                self._run_windows(*requests[0])
+                continue
+            all_texts = [text for texts, _, _ in requests for text in texts]
+
+            try:
+                vectors = self.backend.embed(all_texts) if all_texts else np.zeros((0, 0))
+            except Exception as e:
+                for _, future, _ in requests:
+                    future.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.texts_embedded += len(all_texts)
+            self.batch_size_histogram[len(all_texts)] += 1
+
+            offset = 0
+            for texts, future, _ in requests:
+                future.set_result(vectors[offset:offset + len(texts)])
+                offset += len(texts)
+
+    def _run_windows(self, texts, future, windows):
+        try:
+            future.set_result(self.backend.embed_windows(texts[0]))
+        except Exception as e:
+            future.set_exception(e)
+        self.window_requests += 1
+
+    def stats(self):
+        """
+        Get queue and batching metrics.
+
+        Returns:
+            dict: Queue depth, batch counts and the batch-size histogram
+        """
+        return {
+            "queueDepth": self._queue.qsize(),
+            "maxQueueDepth": self.max_queue_depth,
+            "batchesRun": self.batches_run,
+            "windowRequests": self.window_requests,
+            "textsEmbedded": self.texts_embedded,
+            "averageBatchSize": (self.texts_embedded / self.batches_run) if self.batches_run else 0,
+            "batchSizeHistogram": {str(size): count for size, count in sorted(self.batch_size_histogram.items())},
+            "maxBatchSize": self.max_batch_size,
+            "maxWaitMs": self.max_wait * 1000.0,
+        }
@@ -0,0 +1,310 @@
+import os
+import math
+import time
+import threading
+
+import numpy as np
+
+from .document import ParsedDocument
+from .lexicon import get_lexicon
+from . import tfidf
+
+# BM25 term frequency saturation and length normalisation
+K1 = float(os.getenv("JOB_INDEX_BM25_K1", "1.2"))
+B = float(os.getenv("JOB_INDEX_BM25_B", "0.75"))
+# Query weight of a canonical skill relative to a plain word
+SKILL_WEIGHT = float(os.getenv("JOB_INDEX_SKILL_WEIGHT", "3.0"))
+# Seconds between checks for job descriptions added, edited or deleted by other processes
+REFRESH_INTERVAL = float(os.getenv("JOB_INDEX_REFRESH_INTERVAL", "300"))
+# Share of unused slots (left by removed or replaced documents) past which the index is compacted
+COMPACT_FRACTION = float(os.getenv("JOB_INDEX_COMPACT_FRACTION", "0.25"))
+# Prefix of skill terms, which cannot collide with word tokens
+SKILL_PREFIX = "skill:"
+
+
+def index_terms(document):
+    """
+    Get the indexed terms of a document: its words, plus one term per
+    canonical skill so that every spelling of a skill meets in one posting list.
+
+    Args:
+        document (ParsedDocument or str): The document
+
+    Returns:
+        dict: Term -> frequency in the document
+    """
+    document = ParsedDocument.of(document)
+    terms = tfidf.term_counts(document)
+    lexicon = get_lexicon()
+    skill_index = lexicon.canonical_skills
+    for skill in lexicon.skill_scanner.find_skills(document.lower, is_lower=True):
+        terms[SKILL_PREFIX + (skill_index.canonical_id(skill) or skill)] = 1
+    return terms
+
+
+def query_weights(document):
+    """Weights of the distinct terms of a query document, with skills weighted above words."""
+    return {term: SKILL_WEIGHT if term.startswith(SKILL_PREFIX) else 1.0 for term in index_terms(document)}
+
+
+class JobIndex:
+    """
+    Inverted index from terms and canonical skills to job descriptions, scored with BM25.
+
+    Documents are added, replaced and removed one at a time. Each posting
+    list is turned into numpy arrays when a query first needs it after a
+    change, so a query costs one vectorised update per query term rather
+    than a loop over postings. Removed documents leave an unused slot behind,
+    until the unused share passes COMPACT_FRACTION and the slots are renumbered.
+    The BM25 statistics (document count, average length and document
+    frequencies) are those of the documents searched, i.e. of one owner's
+    job descriptions when the search is limited to them.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._slots = {}            # job id -> slot
+        self._job_ids = []          # slot -> job id, None once removed
+        self._owners = []           # slot -> user id
+        self._lengths = []          # slot -> number of term occurrences
+        self._terms = []            # slot -> indexed terms, to undo them on removal
+        self._versions = {}         # job id -> version it was indexed at, e.g. its updated_at
+        self._postings = {}         # term -> {slot: frequency}
+        self._term_arrays = {}      # term -> (slots, frequencies) as arrays
+        self._document_arrays = None
+        self.document_count = 0
+        self.total_length = 0
+        self.loaded_at = None
+
+    def __len__(self):
+        return self.document_count
+
+    def add(self, job_id, owner_id, document, version=None):
+        """
+        Index a job description, replacing its previous version if there is one.
+
+        Args:
+            job_id (int): The JobDescription ID
+            owner_id (int): ID of the user who owns it
+            document (ParsedDocument or str): Its content
+            version (optional): Identifies this content, e.g. the updated_at it was saved at
+        """
+        terms = index_terms(document)
+        with self._lock:
+            self.remove(job_id)
+            slot = len(self._job_ids)
+            self._slots[job_id] = slot
+            self._job_ids.append(job_id)
+            self._owners.append(owner_id)
+            length = sum(terms.values())
+            self._lengths.append(length)
+            self._terms.append(terms)
+            self._versions[job_id] = version
+            for term, frequency in terms.items():
+                self._postings.setdefault(term, {})[slot] = frequency
+                self._term_arrays.pop(term, None)
+            self._document_arrays = None
+            self.document_count += 1
+            self.total_length += length
+
+    def remove(self, job_id):
+        """Remove a job description from the index; unknown IDs are ignored."""
+        with self._lock:
+            slot = self._slots.pop(job_id, None)
+            if slot is None:
+                return
+            del self._versions[job_id]
+            for term in self._terms[slot]:
+                postings = self._postings[term]
+                del postings[slot]
+                if not postings:
+                    del self._postings[term]
+                self._term_arrays.pop(term, None)
+            self._terms[slot] = {}
+            self._job_ids[slot] = None
+            self._document_arrays = None
+            self.document_count -= 1
+            self.total_length -= self._lengths[slot]
+            if len(self._job_ids) - self.document_count > COMPACT_FRACTION * len(self._job_ids):
+                self._compact()
+
+    def _compact(self):
+        # Renumber the live slots in order, dropping the unused ones
+        live = [slot for slot, job_id in enumerate(self._job_ids) if job_id is not None]
+        renumbered = {old: new for new, old in enumerate(live)}
+        self._job_ids = [self._job_ids[slot] for slot in live]
+        self._owners = [self._owners[slot] for slot in live]
+        self._lengths = [self._lengths[slot] for slot in live]
+        self._terms = [self._terms[slot] for slot in live]
+        self._slots = {job_id: slot for slot, job_id in enumerate(self._job_ids)}
+        self._postings = {term: {renumbered[slot]: frequency for slot, frequency in postings.items()}
+                          for term, postings in self._postings.items()}
+        self._term_arrays = {}
+        self._document_arrays = None
+
+    def job_ids(self):
+        with self._lock:
+            return set(self._slots)
+
+    def versions(self):
+        """Job id -> the version each job description was indexed at."""
+        with self._lock:
+            return dict(self._versions)
+
+    def slot_count(self):
+        """Number of slots, used and unused."""
+        with self._lock:
+            return len(self._job_ids)
+
+    def _arrays_for(self, term):
+        arrays = self._term_arrays.get(term)
+        if arrays is None:
+            postings = self._postings.get(term)
+            if not postings:
+                return None
+            arrays = (np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                      np.fromiter(postings.values(), dtype=np.float64, count=len(postings)))
+            self._term_arrays[term] = arrays
+        return arrays
+
+    def _documents(self):
+        if self._document_arrays is None:
+            self._document_arrays = (
+                np.array(self._lengths, dtype=np.float64),
+                np.array(self._owners, dtype=np.int64),
+                np.array([job_id is not None for job_id in self._job_ids], dtype=bool),
+            )
+        return self._document_arrays
+
+    def search(self, query, k=10, owner_id=None):
+        """
+        Find the job descriptions that best match a query.
+
+        Args:
+            query (dict): Term -> weight, e.g. from query_weights
+            k (int): Number of results
+            owner_id (int, optional): Only rank the job descriptions of this user
+
+        Returns:
+            list: (job id, BM25 score) pairs, best first
+        """
+        with self._lock:
+            if not self.document_count or k <= 0:
+                return []
+            lengths, owners, alive = self._documents()
+            if owner_id is None:
+                searched = alive
+                document_count, total_length = self.document_count, self.total_length
+            else:
+                searched = alive & (owners == owner_id)
+                document_count = int(searched.sum())
+                if not document_count:
+                    return []
+                total_length = lengths[searched].sum()
+            average_length = total_length / document_count
+            length_norm = K1 * (1 - B + B * lengths / max(average_length, 1e-9))
+            scores = np.zeros(len(lengths))
+
+            for term, weight in query.items():
+                arrays = self._arrays_for(term)
+                if arrays is None:
+                    continue
+                slots, frequencies = arrays
+                if owner_id is not None:
+                    # Posting lists only hold live slots, so the owner alone decides what is searched
+                    owned = owners[slots] == owner_id
+                    slots, frequencies = slots[owned], frequencies[owned]
+                    if not len(slots):
+                        continue
+                idf = math.log(1 + (document_count - len(slots) + 0.5) / (len(slots) + 0.5))
+                # Each document appears once per posting list, so plain fancy indexing is safe
+                scores[slots] += weight * idf * frequencies * (K1 + 1) / (frequencies + length_norm[slots])
+
+            slots = np.flatnonzero(searched & (scores > 0))
+            if len(slots) > k:
+                slots = slots[np.argpartition(-scores[slots], k - 1)[:k]]
+            slots = slots[np.argsort(-scores[slots], kind="stable")]
+            return [(self._job_ids[slot], float(scores[slot])) for slot in slots]
+
+
+_index = None
+_index_lock = threading.Lock()
+_refreshing = False
+
+
+def _load_jobs(index, job_ids=None):
+    from .models import JobDescription
+
+    jobs = JobDescription.objects.all()
+    if job_ids is not None:
+        jobs = jobs.filter(id__in=job_ids)
+    for job_id, owner_id, content, updated_at in jobs.values_list('id', 'user_id', 'content', 'updated_at').iterator():
+        index.add(job_id, owner_id, content or "", version=updated_at)
+
+
+def get_job_index():
+    """
+    Get the process-wide job index, building it from the database on first
+    use. Changes made in this process are applied shortly after they are
+    committed. Job descriptions added, edited (by their updated_at) or
+    deleted by other processes are picked up every REFRESH_INTERVAL seconds.
+    Both happen in background threads, while requests keep searching the
+    index as it is.
+
+    Returns:
+        JobIndex: The index
+    """
+    global _index, _refreshing
+    with _index_lock:
+        if _index is None:
+            index = JobIndex()
+            try:
+                _load_jobs(index)
+            except Exception as e:
+                print(f"Error building job index: {str(e)}")
+            index.loaded_at = time.monotonic()
+            _index = index
+        elif not _refreshing and time.monotonic() - _index.loaded_at >= REFRESH_INTERVAL:
+            _refreshing = True
+            threading.Thread(target=_refresh_in_background, args=(_index,), name="job-index-refresh",
+                             daemon=True).start()
+    return _index
+
+
+def _refresh_in_background(index):
+    global _refreshing
+    from django.db import connection
+
+    try:
+        _refresh(index)
+    finally:
+        _refreshing = False
+        # The thread's own database connection would otherwise stay open
+        connection.close()
+
+
+def _refresh(index):
+    from .models import JobDescription
+
+    try:
+        stored = dict(JobDescription.objects.values_list('id', 'updated_at'))
+        indexed = index.versions()
+        for job_id in indexed.keys() - stored.keys():
+            index.remove(job_id)
+        _load_jobs(index, [job_id for job_id, updated_at in stored.items()
+                           if job_id not in indexed or indexed[job_id] != updated_at])
+    except Exception as e:
+        print(f"Error refreshing job index: {str(e)}")
+    index.loaded_at = time.monotonic()
+
+
+def record_job_change(job_id, owner_id, content, version=None):
+    """Index a saved job description, if the index has been built in this process."""
+    if _index is not None:
+        _index.add(job_id, owner_id, content, version=version)
+
+
+def record_job_removal(job_id):
+    """Drop a deleted job description from the index, if it has been built in this process."""
+    if _index is not None:
+        _index.remove(job_id)
@@ -0,0 +1,185 @@
+import os
+import time
+import socket
+import threading
+from datetime import timedelta
+
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import AnalysisJob
+from .budget import Deadline
+
+# A running job whose worker has not renewed its lease for this long is retried
+LEASE_SECONDS = int(os.getenv("ANALYSIS_JOB_LEASE_SECONDS", "60"))
+# Attempts per job, counting retries after failures and lost workers
+MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+# Seconds an idle worker waits before polling the queue again
+POLL_INTERVAL = float(os.getenv("ANALYSIS_JOB_POLL_INTERVAL", "1"))
+
+
+def default_worker_id():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def enqueue_job(resume_file_name, resume_content, job_desc_file_name, job_desc_content,
+                user=None, profile="", budget_ms=None):
+    """
+    Store an analysis for the background workers.
+
+    Args:
+        resume_file_name (str): Name of the resume file
+        resume_content (bytes): The resume file
+        job_desc_file_name (str): Name of the job description file
+        job_desc_content (bytes): The job description file
+        user (User, optional): Owner of the job
+        profile (str): Matching profile, empty for the default
+        budget_ms (int, optional): Time budget of the analysis once it starts
+
+    Returns:
+        AnalysisJob: The pending job
+    """
+    return AnalysisJob.objects.create(
+        user=user,
+        resume_file_name=resume_file_name,
+        resume_content=resume_content,
+        job_desc_file_name=job_desc_file_name,
+        job_desc_content=job_desc_content,
+        profile=profile or "",
+        budget_ms=budget_ms,
+        max_attempts=MAX_ATTEMPTS,
+    )
+
+
+def claim_job(worker_id):
+    """
+    Take the oldest pending job, or a running job whose lease has expired.
+
+    The claim is a conditional update on the status and attempt count seen,
+    so two workers can never claim the same attempt, without row locks or a broker.
+
+    Args:
+        worker_id (str): Identifies the claiming worker
+
+    Returns:
+        AnalysisJob: The claimed job, or None if the queue is empty
+    """
+    now = timezone.now()
+    claimable = AnalysisJob.objects.filter(
+        Q(status=AnalysisJob.STATUS_PENDING) |
+        Q(status=AnalysisJob.STATUS_RUNNING, lease_expires_at__lt=now)
+    ).only('id', 'status', 'attempts', 'max_attempts')
+
+    for job in claimable[:10]:
+        seen = AnalysisJob.objects.filter(pk=job.pk, status=job.status, attempts=job.attempts)
+        if job.attempts >= job.max_attempts:
+            # The worker running the last attempt stopped responding
+            seen.update(status=AnalysisJob.STATUS_FAILED, error="Worker stopped responding",
+                        lease_expires_at=None, finished_at=now)
+            continue
+        claimed = seen.update(
+            status=AnalysisJob.STATUS_RUNNING,
+            attempts=job.attempts + 1,
+            worker_id=worker_id,
+            lease_expires_at=now + timedelta(seconds=LEASE_SECONDS),
+            started_at=now,
+        )
+        if claimed:
+            return AnalysisJob.objects.get(pk=job.pk)
+    return None
+
+
+def _owned(job):
+    return AnalysisJob.objects.filter(
+        pk=job.pk, status=AnalysisJob.STATUS_RUNNING, worker_id=job.worker_id, attempts=job.attempts)
+
+
+def renew_lease(job):
+    """
+    Extend the lease of a running job.
+
+    Returns:
+        bool: False if the job was taken over by another worker
+    """
+    return bool(_owned(job).update(lease_expires_at=timezone.now() + timedelta(seconds=LEASE_SECONDS)))
+
+
+def complete_job(job, result):
+    """Store the result of a job; ignored if the lease was lost meanwhile."""
+    return bool(_owned(job).update(
+        status=AnalysisJob.STATUS_SUCCEEDED, result=result, error="",
+        lease_expires_at=None, finished_at=timezone.now()))
+
+
+def fail_job(job, error):
+    """Put a failed job back in the queue, or mark it failed after its last attempt."""
+    if job.attempts < job.max_attempts:
+        return bool(_owned(job).update(status=AnalysisJob.STATUS_PENDING, error=error, lease_expires_at=None))
+    return bool(_owned(job).update(
+        status=AnalysisJob.STATUS_FAILED, error=error, lease_expires_at=None, finished_at=timezone.now()))
+
+
+def run_job(job, analyzer):
+    """
+    Run a claimed job, renewing its lease from a heartbeat thread while the analysis runs.
+
+    Args:
+        job (AnalysisJob): A job returned by claim_job
+        analyzer (ResumeAnalyzer): The analyzer to use
+    """
+    stop = threading.Event()
+
+    def heartbeat():
+        try:
+            while not stop.wait(LEASE_SECONDS / 3):
+                if not renew_lease(job):
+                    break
+        finally:
+            connection.close()
+
+    heartbeat_thread = threading.Thread(target=heartbeat, name=f"lease-{job.pk}", daemon=True)
+    heartbeat_thread.start()
+    try:
+        result = analyzer.analyze_files(
+            bytes(job.resume_content), job.resume_file_name,
+            bytes(job.job_desc_content), job.job_desc_file_name,
+            profile=job.profile or None,
+            deadline=Deadline(job.budget_ms)
+        )
+    except Exception as e:
+        print(f"Error running analysis job {job.pk}: {str(e)}")
+        fail_job(job, str(e))
+    else:
+        complete_job(job, result)
+    finally:
+        stop.set()
+        heartbeat_thread.join()
+
+
+def work(analyzer, worker_id=None, burst=False, poll_interval=POLL_INTERVAL, stop_event=None):
+    """
+    Process jobs until stopped.
+
+    Args:
+        analyzer (ResumeAnalyzer): The analyzer to use
+        worker_id (str, optional): Identifies this worker. Defaults to host:pid.
+        burst (bool): Return as soon as the queue is empty
+        poll_interval (float): Seconds to wait when the queue is empty
+        stop_event (threading.Event, optional): Set to stop after the current job
+
+    Returns:
+        int: Number of jobs processed
+    """
+    worker_id = worker_id or default_worker_id()
+    processed = 0
+    while stop_event is None or not stop_event.is_set():
+        job = claim_job(worker_id)
+        if job is None:
+            if burst:
+                break
+            time.sleep(poll_interval)
+            continue
+        run_job(job, analyzer)
+        processed += 1
+    return processed
@@ -0,0 +1,133 @@
+import os
+import re
+import json
+import time
+import threading
+from types import MappingProxyType
+
+from .skill_scanner import SkillScanner
+from .canonical_skills import CanonicalSkillIndex
+
+# Vocabulary file used by the analyzer; edits are picked up without a restart
+LEXICON_PATH = os.getenv(
+    "LEXICON_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "lexicon.json")
+)
+# Minimum number of seconds between checks of the file's modification time
+RELOAD_INTERVAL = float(os.getenv("LEXICON_RELOAD_INTERVAL", "5"))
+
+
+class Lexicon:
+    """
+    Immutable, compiled view of a lexicon file.
+
+    Every lookup structure is built once when the file is loaded and is
+    read-only afterwards, so one instance can be shared by all requests and
+    threads. A reload builds a new instance and swaps it in.
+    """
+
+    def __init__(self, data, path=None, mtime=None):
+        self.version = str(data["version"])
+        self.path = path
+        self.mtime = mtime
+
+        self.tech_skills = MappingProxyType({
+            category: tuple(skill.lower() for skill in skills)
+            for category, skills in data["tech_skills"].items()
+        })
+        self.tech_keywords = frozenset(data["tech_keywords"])
+        self.tech_patterns = tuple(data["tech_patterns"])
+        self.tech_pattern = re.compile('|'.join(f'(?:{pattern})' for pattern in self.tech_patterns))
+        self.soft_skills = tuple(data["soft_skills"])
+        # Each soft skill with its hyphen-free spelling, e.g. ('problem-solving', 'problem solving')
+        self.soft_skill_forms = tuple((skill, skill.replace('-', ' ')) for skill in self.soft_skills)
+        self.outdated_technologies = frozenset(data["outdated_technologies"])
+        self.vendor_prefixes = tuple(data["vendor_prefixes"])
+        # Lower-cased heading -> section name, including each name itself
+        self.section_aliases = MappingProxyType({
+            alias.lower(): section
+            for section, aliases in data["section_headers"].items()
+            for alias in [section] + list(aliases)
+        })
+
+        self.skill_scanner = SkillScanner(self.tech_skills)
+        # Aliases, acronyms and variant spellings -> canonical skill ID
+        self.canonical_skills = CanonicalSkillIndex(self.tech_skills, data["tech_variants"], self.vendor_prefixes)
+
+
+def load_lexicon(path=LEXICON_PATH):
+    """
+    Read and compile a lexicon file.
+
+    Args:
+        path (str): Path to the JSON lexicon
+
+    Returns:
+        Lexicon: The compiled lexicon
+    """
+    mtime = os.path.getmtime(path)
+    with open(path, encoding="utf-8") as lexicon_file:
+        data = json.load(lexicon_file)
+    return Lexicon(data, path=path, mtime=mtime)
+
+
+_current = load_lexicon()
+_lock = threading.Lock()
+_last_check = time.monotonic()
+_failed_mtime = None
+
+
+def _reload_if_changed(force):
+    """Swap in a freshly compiled lexicon if the file changed. Caller holds _lock."""
+    global _current, _last_check, _failed_mtime
+    _last_check = time.monotonic()
+    mtime = None
+    try:
+        mtime = os.path.getmtime(_current.path)
+        if not force and mtime in (_current.mtime, _failed_mtime):
+            return _current
+        lexicon = load_lexicon(_current.path)
+    except Exception as e:
+        # Remember the broken file so it is not re-parsed on every check
+        _failed_mtime = mtime
+        print(f"Error reloading lexicon, keeping version {_current.version}: {str(e)}")
+        return _current
+
+    if lexicon.version != _current.version:
+        print(f"Lexicon reloaded: version {_current.version} -> {lexicon.version}")
+    # Readers holding the old instance keep a consistent snapshot
+    _current = lexicon
+    return _current
+
+
+def reload_lexicon(force=False):
+    """
+    Reload the lexicon if its file changed. A file that fails to load
+    leaves the current lexicon in place.
+
+    Args:
+        force (bool): Reload even if the modification time is unchanged
+
+    Returns:
+        Lexicon: The lexicon in use after the check
+    """
+    with _lock:
+        return _reload_if_changed(force)
+
+
+def get_lexicon():
+    """
+    Get the current lexicon, checking the file for changes at most every
+    LEXICON_RELOAD_INTERVAL seconds.
+
+    Returns:
+        Lexicon: The shared, immutable lexicon
+    """
+    if RELOAD_INTERVAL >= 0 and time.monotonic() - _last_check >= RELOAD_INTERVAL:
+        # Only one thread checks the file, the others keep using the current lexicon
+        if _lock.acquire(blocking=False):
+            try:
+                return _reload_if_changed(False)
+            finally:
+                _lock.release()
+    return _current
@@ -0,0 +1,49 @@
+import asyncio
+import weakref
+
+# Resources by event loop and name; a loop's entry goes away with the loop
+_resources = weakref.WeakKeyDictionary()
+
+
+async def get_loop_resource(name, factory):
+    """
+    Get a resource of the running event loop, e.g. an HTTP session, creating it
+    on first use so every call on that loop shares its connections.
+
+    The resource is closed when the loop shuts down its async generators, which
+    asyncio.run (and so async_to_sync under WSGI) does before closing the loop.
+    Resources of a long-lived loop, e.g. under ASGI, stay open for its lifetime.
+
+    Args:
+        name (str): Name of the resource within the loop
+        factory (callable): Creates the resource; it must have an async close()
+
+    Returns:
+        object: The resource, which callers must not close
+    """
+    loop = asyncio.get_running_loop()
+    resources = _resources.get(loop)
+    if resources is None:
+        resources = _resources[loop] = {}
+        # The loop only keeps a weak reference to its async generators
+        resources[None] = _close_on_shutdown(resources)
+        await resources[None].__anext__()
+
+    resource = resources.get(name)
+    if resource is None or getattr(resource, "closed", False):
+        resource = resources[name] = factory()
+    return resource
+
+
+async def _close_on_shutdown(resources):
+    try:
+        yield
+    finally:
+        for name, resource in list(resources.items()):
+            if name is None:
+                continue
+            try:
+                await resource.close()
+            except Exception as e:
+                print(f"Error closing {name}: {str(e)}")
+        resources.clear()
@@ -0,0 +1,80 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from resume_api import feature_cache
+from resume_api import feature_store
+from resume_api.models import Resume, JobDescription
+
+
+class Command(BaseCommand):
+    help = ("Derive the stored features of resumes and job descriptions that have none or that are stale "
+            "after a lexicon, analyzer or embedding model upgrade")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=50,
+                            help='Documents per chunk; key phrases are requested in batches within a chunk')
+        parser.add_argument('--workers', type=int, default=4, help='Chunks processed in parallel')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the stale documents')
+
+    def _chunks(self, chunk_size):
+        # Identical contents (e.g. one job description posted twice) are derived once
+        seen = set()
+        chunk = []
+        for model in (JobDescription, Resume):
+            last_pk = 0
+            while True:
+                # Pages by primary key, so no read stays open while the workers write
+                rows = list(model.objects.filter(pk__gt=last_pk).order_by('pk')
+                            .values_list('pk', 'content')[:chunk_size])
+                if not rows:
+                    break
+                last_pk = rows[-1][0]
+                for _, content in rows:
+                    content_hash = feature_cache.content_key(content or "")
+                    if not content or content_hash in seen:
+                        continue
+                    seen.add(content_hash)
+                    chunk.append(content)
+                    if len(chunk) == chunk_size:
+                        yield chunk
+                        chunk = []
+        if chunk:
+            yield chunk
+
+    def _process(self, chunk, dry_run):
+        try:
+            stale = feature_store.stale_texts(chunk)
+            stored = 0 if dry_run else feature_store.precompute_features(stale)
+            return len(chunk), len(stale), stored
+        finally:
+            connection.close()
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        self.stdout.write(f"Feature version {feature_cache.features_version()}, "
+                          f"embeddings {feature_cache.embeddings_version()}")
+
+        start = time.perf_counter()
+        finished = []
+        with ThreadPoolExecutor(max_workers=options['workers']) as executor:
+            pending = set()
+            for chunk in self._chunks(options['chunk_size']):
+                # Keep a bounded number of chunks in memory
+                if len(pending) >= 2 * options['workers']:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    finished.extend(future.result() for future in done)
+                pending.add(executor.submit(self._process, chunk, dry_run))
+            finished.extend(future.result() for future in pending)
+        checked, stale, stored = (sum(counts) for counts in zip((0, 0, 0), *finished))
+
+        elapsed = time.perf_counter() - start
+        if dry_run:
+            self.stdout.write(f"{stale} of {checked} documents have stale features")
+        else:
+            self.stdout.write(f"Derived features of {stored} of {stale} stale documents "
+                              f"({checked} checked) in {elapsed:.1f}s")
+            if stored < stale:
+                self.stdout.write("Documents without key phrases were left stale; run again to retry them")
@@ -0,0 +1,139 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from resume_api import azure_language_client
+from resume_api.resume_analyzer import ResumeAnalyzer
+
+SAMPLE_RESUME = """
+Senior Software Engineer
+Experience
+Built web applications in Python, Django and React; deployed on AWS with Docker and Kubernetes.
+Led a team of five engineers and increased release frequency by 40%.
+Skills
+Python, Django, React, SQL, Docker, Kubernetes, communication, leadership
+"""
+
+SAMPLE_JOB = """
+Backend Engineer. Requirements: Python, Django, PostgreSQL, AWS, Docker, Kubernetes, Terraform, CI/CD.
+Strong communication, teamwork and problem-solving skills.
+"""
+
+
+class SimulatedLanguageService:
+    """Replaces the Azure Language calls with fixed-latency fakes and counts calls in flight."""
+
+    def __init__(self, latency_ms):
+        self.latency = latency_ms / 1000
+        self.in_flight = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def _enter(self):
+        with self._lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+
+    def _exit(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def key_phrases(self, text, timeout=None):
+        self._enter()
+        time.sleep(self.latency)
+        self._exit()
+        return ["software engineer", "web applications"]
+
+    def sentiment(self, text, timeout=None):
+        self._enter()
+        time.sleep(self.latency)
+        self._exit()
+        return {"sentiment": "positive"}
+
+    async def key_phrases_async(self, text, timeout=None):
+        self._enter()
+        await asyncio.sleep(self.latency)
+        self._exit()
+        return ["software engineer", "web applications"]
+
+    async def sentiment_async(self, text, timeout=None):
+        self._enter()
+        await asyncio.sleep(self.latency)
+        self._exit()
+        return {"sentiment": "positive"}
+
+    def install(self):
+        azure_language_client.extract_key_phrases = self.key_phrases
+        azure_language_client.analyze_sentiment = self.sentiment
+        azure_language_client.extract_key_phrases_async = self.key_phrases_async
+        azure_language_client.analyze_sentiment_async = self.sentiment_async
+
+
+class Command(BaseCommand):
+    help = "Compare how many concurrent analyses the sync (WSGI) and async (ASGI) paths sustain"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Concurrent analyses to run')
+        parser.add_argument('--wsgi-threads', type=int, default=8,
+                            help='Request threads of the WSGI worker being compared')
+        parser.add_argument('--latency-ms', type=float, default=500,
+                            help='Simulated latency of each Azure Language call')
+        parser.add_argument('--profile', default='fast', help='Matching profile of the analyses')
+        parser.add_argument('--live', action='store_true',
+                            help='Call the configured Azure services instead of simulating them')
+
+    def _report(self, name, latencies, elapsed, peak):
+        self.stdout.write(
+            f"{name:<6} {len(latencies) / elapsed:>8.1f} req/s  p50 {np.percentile(latencies, 50):>8.0f} ms"
+            f"  p95 {np.percentile(latencies, 95):>8.0f} ms  peak upstream calls {peak}"
+        )
+
+    def handle(self, *args, **options):
+        analyzer = ResumeAnalyzer()
+        count = options['requests']
+        profile = options['profile']
+        service = None if options['live'] else SimulatedLanguageService(options['latency_ms'])
+        if service:
+            service.install()
+
+        # Warm up lexicons and indexes so neither path pays for loading them
+        analyzer.analyze_resume_and_job_description(SAMPLE_RESUME, SAMPLE_JOB, profile=profile)
+
+        self.stdout.write(f"{count} analyses, profile {profile}, "
+                          + ("live services" if options['live'] else f"{options['latency_ms']:.0f} ms simulated calls"))
+
+        # Distinct texts per request, so the feature cache does not absorb the upstream calls
+        def texts(i, path):
+            return f"{SAMPLE_RESUME}\nReference {path}-{i}", f"{SAMPLE_JOB}\nReference {path}-{i}"
+
+        def timed_sync(i):
+            start = time.perf_counter()
+            analyzer.analyze_resume_and_job_description(*texts(i, "wsgi"), profile=profile)
+            return (time.perf_counter() - start) * 1000
+
+        if service:
+            service.peak = 0
+        start = time.perf_counter()
+        # A threaded WSGI worker serves at most one request per thread
+        with ThreadPoolExecutor(max_workers=options['wsgi_threads']) as executor:
+            latencies = list(executor.map(timed_sync, range(count)))
+        self._report("wsgi", latencies, time.perf_counter() - start, service.peak if service else "n/a")
+
+        async def timed_async(i):
+            start = time.perf_counter()
+            await analyzer.analyze_resume_and_job_description_async(*texts(i, "asgi"), profile=profile)
+            return (time.perf_counter() - start) * 1000
+
+        async def run_async():
+            return await asyncio.gather(*(timed_async(i) for i in range(count)))
+
+        if service:
+            service.peak = 0
+        start = time.perf_counter()
+        # An ASGI worker runs every request on one event loop
+        latencies = asyncio.run(run_async())
+        self._report("asgi", latencies, time.perf_counter() - start, service.peak if service else "n/a")
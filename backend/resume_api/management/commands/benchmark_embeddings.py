@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from transformers import AutoTokenizer, AutoModel
+
+from resume_api import embeddings
+
+SAMPLE_TEXTS = [
+    "python", "javascript", "machine learning", "project management", "sql server",
+    "Developed REST APIs in Django and deployed them on AWS Lambda.",
+    "Led a team of five engineers to deliver a cloud migration ahead of schedule.",
+    "Increased test coverage from 40% to 85% by introducing pytest and CI pipelines.",
+    "Experience with React, Redux and TypeScript for building responsive web applications.",
+    "Strong communication, teamwork and problem-solving skills.",
+    "Designed data pipelines with Spark and Airflow processing 2TB of events per day.",
+    "Mentored junior developers and ran weekly code reviews.",
+]
+
+
+class Command(BaseCommand):
+    help = "Measure embedding throughput and similarity parity for each embedding backend"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backends', nargs='+', default=['fp32', 'int8', 'onnx'],
+                            help='Backends to benchmark (fp32, int8, onnx)')
+        parser.add_argument('--threads', type=int, default=embeddings.NUM_THREADS,
+                            help='Intra-op thread count, 0 keeps the default')
+        parser.add_argument('--batch-size', type=int, default=16)
+        parser.add_argument('--rounds', type=int, default=5)
+        parser.add_argument('--tolerance', type=float, default=embeddings.PARITY_TOLERANCE,
+                            help='Maximum allowed similarity deviation from fp32')
+
+    def handle(self, *args, **options):
+        embeddings.set_num_threads(options['threads'])
+
+        tokenizer = AutoTokenizer.from_pretrained(embeddings.MODEL_NAME)
+        model = AutoModel.from_pretrained(embeddings.MODEL_NAME)
+        reference = embeddings.TorchEmbeddingBackend(tokenizer, model)
+
+        texts = SAMPLE_TEXTS * 4
+        self.stdout.write(f"Model: {embeddings.MODEL_NAME}, threads: {options['threads'] or 'default'}")
+        self.stdout.write(f"{'backend':<8} {'emb/s':>10} {'max Δsim':>10}  parity")
+
+        for name in options['backends']:
+            try:
+                backend = embeddings.create_backend(name, tokenizer, model)
+            except Exception as e:
+                self.stderr.write(f"{name:<8} unavailable: {str(e)}")
+                continue
+
+            throughput = embeddings.measure_throughput(
+                backend, texts, batch_size=options['batch_size'], rounds=options['rounds']
+            )
+            deviation = embeddings.check_parity(backend, reference)
+            parity = 'ok' if deviation <= options['tolerance'] else 'FAIL'
+            self.stdout.write(f"{name:<8} {throughput:>10.1f} {deviation:>10.4f}  {parity}")
@@ -0,0 +1,46 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from resume_api.job_index import JobIndex, query_weights
+from resume_api.lexicon import get_lexicon
+
+FILLER = ("experience team work build design develop maintain support customer product service "
+          "business quality deliver project company role responsibilities requirements years strong "
+          "knowledge environment systems solutions growth office remote benefits salary").split()
+
+
+class Command(BaseCommand):
+    help = "Measure job index build time and top-k query latency over synthetic job descriptions"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=20000, help='Synthetic job descriptions to index')
+        parser.add_argument('--owners', type=int, default=1, help='Users the job descriptions are spread over')
+        parser.add_argument('--queries', type=int, default=100)
+        parser.add_argument('--k', type=int, default=10)
+
+    def _document(self, rng, skills, skill_count, word_count):
+        words = list(rng.choice(skills, size=skill_count)) + list(rng.choice(FILLER, size=word_count))
+        rng.shuffle(words)
+        return " ".join(words)
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        lexicon = get_lexicon()
+        skills = [skill for category in lexicon.tech_skills.values() for skill in category]
+
+        index = JobIndex()
+        start = time.perf_counter()
+        for job_id in range(options['jobs']):
+            index.add(job_id, job_id % options['owners'], self._document(rng, skills, 8, 150))
+        self.stdout.write(f"Indexed {len(index)} job descriptions in {time.perf_counter() - start:.1f}s")
+
+        queries = [query_weights(self._document(rng, skills, 20, 300)) for _ in range(options['queries'])]
+        latencies = []
+        for query in queries:
+            start = time.perf_counter()
+            index.search(query, k=options['k'], owner_id=0)
+            latencies.append((time.perf_counter() - start) * 1000)
+        self.stdout.write(f"top-{options['k']}: p50 {np.percentile(latencies, 50):.2f} ms, "
+                          f"p99 {np.percentile(latencies, 99):.2f} ms")
@@ -0,0 +1,66 @@
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from resume_api.ann_index import IVFIndex
+from resume_api.skill_vocabulary import SkillVocabularyIndex
+
+
+class Command(BaseCommand):
+    help = "Measure ANN skill index query latency and recall against an exact scan"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--index', default=None,
+                            help='Benchmark a persisted skill index instead of synthetic vectors')
+        parser.add_argument('--size', type=int, default=20000, help='Synthetic vocabulary size')
+        parser.add_argument('--dim', type=int, default=768)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--k', type=int, default=10)
+        parser.add_argument('--n-probe', type=int, nargs='+', default=[1, 4, 8, 16])
+
+    def _synthetic_index(self, size, dim, rng):
+        # Clustered vectors behave like skill embeddings far better than uniform noise
+        topics = rng.normal(size=(max(1, size // 50), dim))
+        vectors = topics[rng.integers(len(topics), size=size)] + 1.0 * rng.normal(size=(size, dim))
+        index = IVFIndex(min_train_size=size)
+        index.add([f"skill-{i}" for i in range(size)], vectors.astype(np.float32))
+        return index, vectors
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(0)
+        k = options['k']
+
+        if options['index']:
+            index = SkillVocabularyIndex.load(options['index']).index
+            base = np.vstack(index._vectors)
+        else:
+            start = time.perf_counter()
+            index, base = self._synthetic_index(options['size'], options['dim'], rng)
+            self.stdout.write(f"Built index over {len(index)} vectors in {time.perf_counter() - start:.1f}s")
+
+        queries = base[rng.integers(len(base), size=options['queries'])]
+        queries = queries + 0.5 * rng.normal(size=queries.shape)
+
+        exact = []
+        start = time.perf_counter()
+        for query in queries:
+            exact.append({label for label, _ in index.exact_search(query, k)})
+        exact_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+        self.stdout.write(f"{len(index)} vectors, {len(index.centroids) if index.is_trained else 0} lists, k={k}")
+        self.stdout.write(f"{'exact':<10} {exact_ms:>8.3f} ms/query  recall@{k} 1.000")
+
+        for n_probe in options['n_probe']:
+            latencies = []
+            hits = 0
+            for query, expected in zip(queries, exact):
+                start = time.perf_counter()
+                found = index.search(query, k, n_probe=n_probe)
+                latencies.append((time.perf_counter() - start) * 1000)
+                hits += len(expected & {label for label, _ in found})
+            recall = hits / (len(queries) * k)
+            self.stdout.write(
+                f"{'nprobe=' + str(n_probe):<10} {np.mean(latencies):>8.3f} ms/query  recall@{k} {recall:.3f}"
+                f"  p99 {np.percentile(latencies, 99):.3f} ms"
+            )
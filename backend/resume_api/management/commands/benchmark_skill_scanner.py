@@ -0,0 +1,81 @@
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from resume_api.lexicon import get_lexicon
+from resume_api.resume_analyzer import ResumeAnalyzer
+
+SAMPLE_RESUME = """
+Senior Software Engineer with 8 years of experience building web applications in Python, Django and React.
+Designed REST and GraphQL APIs, deployed on AWS Lambda and Kubernetes (k8s) with Terraform and GitHub Actions.
+Led migration from MySQL 5.7 to PostgreSQL; tuned Redis caching and Elasticsearch search.
+Built machine learning pipelines with pandas, scikit-learn and TensorFlow; experience with NLP and computer vision.
+Worked in Agile / Scrum teams using Jira and Confluence; practiced TDD with pytest and Jest.
+Skills: C++, C#, Java 17, TypeScript, Node.js, Docker Compose, Jenkins, Grafana, Prometheus, Figma.
+"""
+
+SAMPLE_KEY_PHRASES = [
+    "software engineer", "web applications", "REST APIs", "machine learning pipelines",
+    "Kubernetes cluster", "data platform", "Agile teams", "computer vision", "cloud infrastructure",
+]
+
+
+def legacy_extract(key_phrases, full_text):
+    """The per-skill regex loop the scanner replaced, kept for comparison."""
+    lexicon = get_lexicon()
+    common_tech_skills = []
+    for category, skills in lexicon.tech_skills.items():
+        common_tech_skills.extend(skills)
+
+    tech_skills = []
+    for skill in common_tech_skills:
+        pattern = r'\b' + re.escape(skill) + r'\b'
+        if (any(re.search(pattern, phrase, re.IGNORECASE) for phrase in key_phrases) or
+                re.search(pattern, full_text, re.IGNORECASE)):
+            if skill not in [s.lower() for s in tech_skills]:
+                tech_skills.append(skill)
+
+    for pattern in lexicon.tech_patterns:
+        for match in re.finditer(pattern, full_text.lower()):
+            skill = match.group(0).strip()
+            if skill and skill not in tech_skills:
+                tech_skills.append(skill)
+
+    return tech_skills
+
+
+class Command(BaseCommand):
+    help = "Compare the single-pass skill scanner with the per-skill regex loop"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, nargs='+', default=[1, 4, 16],
+                            help='How many copies of the sample resume to scan')
+        parser.add_argument('--rounds', type=int, default=20)
+
+    def _time(self, function, rounds):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            result = function()
+        return (time.perf_counter() - start) * 1000 / rounds, result
+
+    def handle(self, *args, **options):
+        analyzer = ResumeAnalyzer()
+        rounds = options['rounds']
+
+        self.stdout.write(f"{'chars':>7} {'legacy ms':>10} {'scanner ms':>11} {'speedup':>8}  only-legacy / only-scanner")
+        for repeat in options['repeat']:
+            text = SAMPLE_RESUME * repeat
+            legacy_ms, legacy = self._time(lambda: legacy_extract(SAMPLE_KEY_PHRASES, text), rounds)
+            scanner_ms, current = self._time(
+                lambda: analyzer._extract_technical_skills(SAMPLE_KEY_PHRASES, text), rounds
+            )
+            only_legacy = sorted(set(legacy) - set(current))
+            only_scanner = sorted(set(current) - set(legacy) - set(SAMPLE_KEY_PHRASES))
+            self.stdout.write(
+                f"{len(text):>7} {legacy_ms:>10.2f} {scanner_ms:>11.2f} {legacy_ms / scanner_ms:>7.1f}x"
+                f"  {only_legacy} / {only_scanner}"
+            )
+
+        matches = get_lexicon().skill_scanner.scan(SAMPLE_RESUME)
+        self.stdout.write(f"{len(matches)} skill occurrences, e.g. {matches[:3]}")
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_api.skill_vocabulary import SkillVocabularyIndex, SKILL_INDEX_PATH
+
+
+class Command(BaseCommand):
+    help = "Build or extend the persisted ANN index of canonical skills"
+
+    def add_arguments(self, parser):
+        parser.add_argument('vocabulary', nargs='+',
+                            help='Text files with one canonical skill or title per line')
+        parser.add_argument('--output', default=SKILL_INDEX_PATH)
+        parser.add_argument('--rebuild', action='store_true',
+                            help='Start from an empty index instead of extending the existing one')
+
+    def handle(self, *args, **options):
+        skills = []
+        for path in options['vocabulary']:
+            try:
+                with open(path, encoding='utf-8') as vocabulary_file:
+                    skills.extend(line.strip().lower() for line in vocabulary_file if line.strip())
+            except OSError as e:
+                raise CommandError(f"Could not read {path}: {str(e)}")
+
+        index = SkillVocabularyIndex()
+        if not options['rebuild']:
+            try:
+                index = SkillVocabularyIndex.load(options['output'])
+            except (OSError, ValueError):
+                pass
+            if len(index) and not index.is_current():
+                # Vectors of another model cannot be mixed with new ones
+                self.stdout.write(f"Re-embedding {len(index)} skills embedded with {index.embeddings_version}")
+                index = index.rebuilt()
+
+        added = index.add_skills(skills)
+        index.save(options['output'])
+        self.stdout.write(f"Added {added} skills, index now holds {len(index)} skills: {options['output']}")
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from transformers import AutoTokenizer, AutoModel
+
+from resume_api import embeddings
+
+
+class Command(BaseCommand):
+    help = ("Export the embedding model to the ONNX graph the onnx backend loads; "
+            "run before starting the workers so they do not export it themselves")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=embeddings.ONNX_MODEL_PATH)
+        parser.add_argument('--force', action='store_true', help='Replace an existing graph')
+
+    def handle(self, *args, **options):
+        tokenizer = AutoTokenizer.from_pretrained(embeddings.MODEL_NAME)
+        model = AutoModel.from_pretrained(embeddings.MODEL_NAME)
+        if options['force']:
+            embeddings.export_onnx_model(tokenizer, model, options['output'])
+        else:
+            embeddings.ensure_onnx_model(tokenizer, model, options['output'])
+        self.stdout.write(f"ONNX graph of {embeddings.MODEL_NAME} at {options['output']}")
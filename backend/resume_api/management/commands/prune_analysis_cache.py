@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from resume_api import result_cache
+
+
+class Command(BaseCommand):
+    help = ("Delete cached analysis results unused for ANALYSIS_RESULT_TTL_DAYS and "
+            "idempotency records older than IDEMPOTENCY_TTL_HOURS")
+
+    def handle(self, *args, **options):
+        results, records = result_cache.prune()
+        self.stdout.write(f"Deleted {results} cached results and {records} idempotency records")
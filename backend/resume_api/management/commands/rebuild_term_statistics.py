@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from resume_api.tfidf import rebuild_term_statistics
+
+
+class Command(BaseCommand):
+    help = "Recount the TF-IDF document frequencies from all stored resumes and job descriptions"
+
+    def handle(self, *args, **options):
+        document_count, term_count = rebuild_term_statistics()
+        self.stdout.write(f"Counted {term_count} terms across {document_count} documents")
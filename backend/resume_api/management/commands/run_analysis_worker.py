@@ -0,0 +1,61 @@
+import signal
+import threading
+import multiprocessing
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from resume_api import jobs
+
+
+def _work(worker_number, burst, poll_interval):
+    """Entry point of one worker process."""
+    # Imported here so forked workers share the model loaded by the parent
+    from resume_api.views import resume_analyzer
+
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+    worker_id = f"{jobs.default_worker_id()}#{worker_number}"
+    processed = jobs.work(resume_analyzer, worker_id, burst=burst, poll_interval=poll_interval, stop_event=stop_event)
+    print(f"Worker {worker_id} processed {processed} jobs")
+
+
+class Command(BaseCommand):
+    help = "Process queued analysis jobs with a pool of worker processes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1, help='Number of worker processes')
+        parser.add_argument('--burst', action='store_true', help='Exit once the queue is empty')
+        parser.add_argument('--poll-interval', type=float, default=jobs.POLL_INTERVAL,
+                            help='Seconds an idle worker waits before polling again')
+
+    def handle(self, *args, **options):
+        # Load the models once so forked workers share them
+        from resume_api.views import resume_analyzer  # noqa: F401
+
+        if options['workers'] <= 1:
+            try:
+                _work(0, options['burst'], options['poll_interval'])
+            except KeyboardInterrupt:
+                pass
+            return
+
+        # Each process must open its own database connection
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        processes = [
+            context.Process(target=_work, args=(number, options['burst'], options['poll_interval']))
+            for number in range(options['workers'])
+        ]
+        for process in processes:
+            process.start()
+        self.stdout.write(f"Started {len(processes)} analysis workers")
+
+        try:
+            for process in processes:
+                process.join()
+        except KeyboardInterrupt:
+            for process in processes:
+                process.terminate()
+            for process in processes:
+                process.join()
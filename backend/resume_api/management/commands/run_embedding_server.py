@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from resume_api import embeddings
+from resume_api.embedding_server import EmbeddingServer
+from resume_api.inference_worker import InferenceWorker
+
+
+class Command(BaseCommand):
+    help = "Serve embeddings over a Unix socket so web workers can share one copy of the model"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--socket', default=embeddings.SOCKET_PATH,
+                            help='Unix socket path to listen on')
+        parser.add_argument('--backend', default=None,
+                            help='Local backend to serve (fp32, int8, onnx), defaults to EMBEDDING_BACKEND')
+
+    def handle(self, *args, **options):
+        name = options['backend'] or embeddings.BACKEND_NAME
+        if name == 'remote':
+            name = 'fp32'
+
+        backend = embeddings.load_backend(name)
+        if backend is None:
+            raise CommandError("Could not load the embedding model")
+
+        worker = InferenceWorker(backend, embeddings.MAX_BATCH_SIZE, embeddings.MAX_WAIT_MS)
+        server = EmbeddingServer(options['socket'], backend, worker)
+
+        self.stdout.write(f"Serving {backend.name} embeddings on {options['socket']}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
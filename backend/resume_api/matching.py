@@ -0,0 +1,237 @@
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from . import azure_language_client
+from . import fuzzy_matching
+from . import skill_vocabulary
+from .lexicon import get_lexicon
+
+# A speed/quality trade-off for skill matching.
+#   fuzzy_threshold: edit similarity at which the fuzzy tier accepts a pair
+#   semantic: whether unresolved terms fall through to model inference
+#   use_ann: whether long term lists are narrowed through the persisted canonical skill
+#            index (manage.py build_skill_index) before semantic scoring
+MatchProfile = namedtuple("MatchProfile", ["name", "fuzzy_threshold", "semantic", "use_ann"])
+
+PROFILES = {
+    # No model inference: exact, alias and fuzzy tiers only
+    "fast": MatchProfile("fast", fuzzy_threshold=0.85, semantic=False, use_ann=True),
+    "balanced": MatchProfile("balanced", fuzzy_threshold=0.9, semantic=True, use_ann=True),
+    # Semantic scoring against every term, even for long lists
+    "accurate": MatchProfile("accurate", fuzzy_threshold=0.9, semantic=True, use_ann=False),
+}
+DEFAULT_PROFILE = os.getenv("MATCHING_PROFILE", "balanced")
+
+# Cascade tiers, cheapest first
+TIERS = ("exact", "alias", "fuzzy", "semantic")
+
+
+def get_profile(name=None):
+    """
+    Look up a matching profile by name.
+
+    Args:
+        name (str, optional): 'fast', 'balanced' or 'accurate'. Defaults to MATCHING_PROFILE.
+
+    Returns:
+        MatchProfile: The profile
+
+    Raises:
+        ValueError: If the name is not a known profile
+    """
+    name = (name or DEFAULT_PROFILE).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown matching profile '{name}'. Choose one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
+
+
+class SkillMatcher:
+    """
+    Matches terms against another term list as an explicit cascade:
+    exact spelling, then canonical alias, then fuzzy string similarity, then
+    semantic similarity. Each term stops at the first tier that resolves it,
+    and the matcher counts how many terms each tier resolved. One matcher
+    serves one analysis; repeated comparisons of the same lists are answered
+    from its results.
+    """
+
+    def __init__(self, profile=None, threshold=0.6, deadline=None):
+        """
+        Args:
+            profile (MatchProfile or str, optional): The profile to use. Defaults to MATCHING_PROFILE.
+            threshold (float): Semantic similarity above which two terms match
+            deadline (Deadline, optional): Time budget; the semantic tier is skipped when it runs short
+        """
+        self.profile = profile if isinstance(profile, MatchProfile) else get_profile(profile)
+        self.threshold = threshold
+        self.deadline = deadline
+        self.resolved = dict.fromkeys(TIERS, 0)
+        self.unmatched = 0
+        self.semantic_comparisons = 0
+        # The same lists are compared for the missing keywords and the match score
+        self._results = {}
+
+    def find_unmatched(self, terms, other_terms, is_tech_skill=True):
+        """
+        Find the terms that have no match in another list.
+
+        Args:
+            terms (list): The terms to check
+            other_terms (list): The terms to match against
+            is_tech_skill (bool): Whether this is a technical skill comparison
+
+        Returns:
+            list: Terms without a match, in their original order
+        """
+        key = (tuple(terms), tuple(other_terms), is_tech_skill)
+        if key not in self._results:
+            self._results[key] = self._run_cascade(terms, other_terms, is_tech_skill)
+        return list(self._results[key])
+
+    def match_matrix(self, terms, other_terms, is_tech_skill=True):
+        """
+        Decide for every pair of terms whether they match, applying the same
+        tiers as find_unmatched to whole matrices at once.
+
+        A term is unmatched against any sublist of other_terms exactly when
+        its row has no match in those columns, so one matrix against the
+        union of many lists answers all of their comparisons. The semantic
+        tier scores every pair, without ANN narrowing. The tier counts in
+        stats() grow by the pairs each tier matched first.
+
+        Args:
+            terms (list): Row terms
+            other_terms (list): Column terms
+            is_tech_skill (bool): Whether this is a technical skill comparison
+
+        Returns:
+            numpy.ndarray: Boolean matrix of shape (len(terms), len(other_terms))
+        """
+        if not terms or not other_terms:
+            return np.zeros((len(terms), len(other_terms)), dtype=bool)
+
+        skill_index = get_lexicon().canonical_skills
+        lower = np.array([term.lower() for term in terms], dtype=object)
+        other_lower = np.array([term.lower() for term in other_terms], dtype=object)
+        matched = lower[:, None] == other_lower[None, :]
+        self.resolved["exact"] += int(matched.sum())
+
+        # Unknown terms get codes of their own, so they only alias themselves
+        codes = {}
+        ids = np.array([codes.setdefault(skill_index.canonical_id(term) or ("", i), len(codes))
+                        for i, term in enumerate(terms)])
+        other_ids = np.array([codes.setdefault(skill_index.canonical_id(term) or ("", -1 - j), len(codes))
+                              for j, term in enumerate(other_terms)])
+        matched = self._add_tier(matched, ids[:, None] == other_ids[None, :], "alias")
+
+        scores = fuzzy_matching.partial_match_matrix(terms, other_terms, score_cutoff=self.profile.fuzzy_threshold,
+                                                     detect_substrings=False)
+        fuzzy = scores >= self.profile.fuzzy_threshold
+        for i, term in enumerate(terms):
+            for j, other_term in enumerate(other_terms):
+                if not matched[i, j] and not fuzzy[i, j] and self._is_contained(term, [other_term]):
+                    fuzzy[i, j] = True
+        matched = self._add_tier(matched, fuzzy, "fuzzy")
+
+        if self.profile.semantic and (self.deadline is None or self.deadline.allows("semanticMatching")):
+            similarity = azure_language_client.calculate_similarity_matrix(terms, other_terms, is_tech_skill=is_tech_skill)
+            self.semantic_comparisons += similarity.size
+            matched = self._add_tier(matched, similarity > self.threshold, "semantic")
+        return matched
+
+    def _add_tier(self, matched, tier_matched, tier):
+        self.resolved[tier] += int((tier_matched & ~matched).sum())
+        return matched | tier_matched
+
+    def _run_cascade(self, terms, other_terms, is_tech_skill):
+        skill_index = get_lexicon().canonical_skills
+        other_lower = {term.lower() for term in other_terms}
+        other_ids = skill_index.canonical_ids(other_terms)
+
+        pending = []
+        for term in terms:
+            if term.lower() in other_lower:
+                self.resolved["exact"] += 1
+            elif skill_index.canonical_id(term) in other_ids:
+                self.resolved["alias"] += 1
+            else:
+                pending.append(term)
+
+        pending = self._fuzzy_tier(pending, other_terms)
+        if self.profile.semantic and pending and (self.deadline is None or self.deadline.allows("semanticMatching")):
+            pending = self._semantic_tier(pending, other_terms, is_tech_skill)
+
+        self.unmatched += len(pending)
+        return pending
+
+    def _fuzzy_tier(self, terms, other_terms):
+        if not terms or not other_terms:
+            return terms
+        scores = fuzzy_matching.partial_match_matrix(terms, other_terms, score_cutoff=self.profile.fuzzy_threshold,
+                                                    detect_substrings=False)
+        pending = []
+        for term, row in zip(terms, scores):
+            if self._is_contained(term, other_terms) or row.max() >= self.profile.fuzzy_threshold:
+                self.resolved["fuzzy"] += 1
+            else:
+                pending.append(term)
+        return pending
+
+    def _is_contained(self, term, other_terms):
+        """One term contains the other and their lengths are close enough."""
+        term_lower = term.lower()
+        for other_term in other_terms:
+            other_lower = other_term.lower()
+            if term_lower in other_lower or other_lower in term_lower:
+                if len(min(term_lower, other_lower, key=len)) / len(max(term_lower, other_lower, key=len)) > self.threshold:
+                    return True
+        return False
+
+    def _semantic_tier(self, terms, other_terms, is_tech_skill):
+        if not terms or not other_terms:
+            return terms
+
+        # Long lists meet through the canonical skill index: each term is only scored
+        # against the other terms whose nearest canonical skill is among its own nearest
+        vocabulary = None
+        if self.profile.use_ann and len(other_terms) >= skill_vocabulary.ANN_MIN_TERMS:
+            vocabulary = skill_vocabulary.get_vocabulary_index()
+        if vocabulary is not None:
+            by_skill = {}
+            for other_term, skills in zip(other_terms, vocabulary.nearest_skills(other_terms, k=1)):
+                for skill in skills:
+                    by_skill.setdefault(skill, []).append(other_term)
+            pending = []
+            for term, skills in zip(terms, vocabulary.nearest_skills(terms, k=5)):
+                candidates = list(dict.fromkeys(other for skill in skills for other in by_skill.get(skill, [])))
+                if not self._any_similar([term], candidates, is_tech_skill)[0]:
+                    pending.append(term)
+            return pending
+
+        matched = self._any_similar(terms, other_terms, is_tech_skill)
+        return [term for term, is_matched in zip(terms, matched) if not is_matched]
+
+    def _any_similar(self, terms, candidates, is_tech_skill):
+        if not candidates:
+            return [False] * len(terms)
+        similarity = azure_language_client.calculate_similarity_matrix(terms, candidates, is_tech_skill=is_tech_skill)
+        self.semantic_comparisons += similarity.size
+        matched = (similarity > self.threshold).any(axis=1)
+        self.resolved["semantic"] += int(matched.sum())
+        return list(matched)
+
+    def stats(self):
+        """
+        Report how many terms each tier resolved.
+
+        Returns:
+            dict: Profile name, per-tier counts, unmatched count and semantic pair comparisons
+        """
+        return {
+            "profile": self.profile.name,
+            "resolved": dict(self.resolved),
+            "unmatched": self.unmatched,
+            "semanticComparisons": self.semantic_comparisons,
+        }
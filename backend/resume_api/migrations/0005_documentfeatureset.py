@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-19 03:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resume_api', '0004_analysisresult_idempotencyrecord'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DocumentFeatureSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True)),
+                ('version', models.CharField(db_index=True, max_length=255)),
+                ('key_phrases', models.JSONField(default=list)),
+                ('technical_skills', models.JSONField(default=list)),
+                ('soft_skills', models.JSONField(default=list)),
+                ('canonical_skills', models.JSONField(default=list)),
+                ('sections', models.JSONField(default=dict)),
+                ('embedding', models.BinaryField(blank=True, null=True)),
+                ('embedding_version', models.CharField(blank=True, max_length=255)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -1,7 +1,18 @@
+import uuid
 from django.db import models
 from django.contrib.auth.models import User
 
-class Resume(models.Model):
+class LoadedContentMixin:
+    """Remembers the content a document was loaded with, so saving an edit needs no query for it"""
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # None when the content was deferred
+        instance._loaded_content = instance.__dict__.get('content')
+        return instance
+
+class Resume(LoadedContentMixin, models.Model):
     """Model to store user's resume information"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="resumes")
     title = models.CharField(max_length=100)
@@ -14,7 +25,7 @@ class Resume(models.Model):
     def __str__(self):
         return f"{self.title} - {self.user.username}"
 
-class JobDescription(models.Model):
+class JobDescription(LoadedContentMixin, models.Model):
     """Model to store job descriptions for analysis"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="job_descriptions")
     title = models.CharField(max_length=100)
@@ -23,6 +34,7 @@ class JobDescription(models.Model):
     content = models.TextField()
     file_type = models.CharField(max_length=10, blank=True, null=True)  # pdf, docx, txt, etc.
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)  # lets other processes' job indexes pick up edits
     
     def __str__(self):
         return f"{self.title} - {self.company or 'Unknown'}"
@@ -44,3 +56,92 @@ class ResumeAnalysis(models.Model):
     
     def __str__(self):
         return f"Analysis for {self.resume.title} - {self.job_description.title}"
+
+class TermStatistic(models.Model):
+    """Number of stored resumes and job descriptions containing a term, used for IDF weights"""
+    term = models.CharField(max_length=100, unique=True)
+    document_frequency = models.PositiveIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.term} ({self.document_frequency})"
+
+class AnalysisJob(models.Model):
+    """An analysis queued for the background workers, with its uploads and result"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+    
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="analysis_jobs", blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING, db_index=True)
+    resume_file_name = models.CharField(max_length=255)
+    resume_content = models.BinaryField()
+    job_desc_file_name = models.CharField(max_length=255)
+    job_desc_content = models.BinaryField()
+    profile = models.CharField(max_length=20, blank=True)
+    budget_ms = models.PositiveIntegerField(blank=True, null=True)
+    result = models.JSONField(blank=True, null=True)
+    error = models.TextField(blank=True)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    worker_id = models.CharField(max_length=100, blank=True)
+    lease_expires_at = models.DateTimeField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(blank=True, null=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+    
+    class Meta:
+        ordering = ['created_at']
+    
+    def __str__(self):
+        return f"Analysis job {self.id} ({self.status})"
+
+class AnalysisResult(models.Model):
+    """Cached analysis of a pair of uploads, keyed by their content hashes and the analysis version"""
+    cache_key = models.CharField(max_length=64, unique=True)
+    resume_hash = models.CharField(max_length=64)
+    job_desc_hash = models.CharField(max_length=64)
+    version = models.CharField(max_length=255)
+    resume_text = models.TextField()
+    job_desc_text = models.TextField()
+    result = models.JSONField()
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Analysis result {self.cache_key[:12]} ({self.version})"
+
+class IdempotencyRecord(models.Model):
+    """Response of a request sent with an Idempotency-Key, replayed when the key is reused"""
+    scoped_key = models.CharField(max_length=320, unique=True)  # "<user id or ->:<key>"
+    request_hash = models.CharField(max_length=64)
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return self.scoped_key
+
+class DocumentFeatureSet(models.Model):
+    """Features derived from a stored resume or job description, keyed by its content hash"""
+    content_hash = models.CharField(max_length=64, unique=True)
+    version = models.CharField(max_length=255, db_index=True)  # feature and lexicon version
+    key_phrases = models.JSONField(default=list)
+    technical_skills = models.JSONField(default=list)
+    soft_skills = models.JSONField(default=list)
+    canonical_skills = models.JSONField(default=list)
+    sections = models.JSONField(default=dict)  # section name -> [start, end] offsets
+    embedding = models.BinaryField(blank=True, null=True)  # float32 whole-document embedding
+    embedding_version = models.CharField(max_length=255, blank=True)  # model and backend
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    
+    def __str__(self):
+        return f"Features {self.content_hash[:12]} ({self.version})"
@@ -0,0 +1,149 @@
+import os
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+# Threads shared by the stages of all requests in this process
+MAX_WORKERS = int(os.getenv("PIPELINE_WORKERS", "8"))
+# Threads shared by the extractions and key phrase requests of batch matches
+BATCH_WORKERS = int(os.getenv("PIPELINE_BATCH_WORKERS", "4"))
+
+Stage = namedtuple("Stage", ["name", "func", "dependencies"])
+
+_executor = None
+_batch_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """
+    Get the process-wide stage thread pool, created on first use so that
+    forked workers each start their own.
+
+    Returns:
+        ThreadPoolExecutor: The bounded pool
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="analysis-stage")
+    return _executor
+
+
+def get_batch_executor():
+    """
+    Get the process-wide pool for the per-document work of batch matches,
+    kept apart so that a batch of hundreds of documents does not queue
+    ahead of the stages of single analyses on the stage pool.
+
+    Returns:
+        ThreadPoolExecutor: The bounded pool
+    """
+    global _batch_executor
+    if _batch_executor is None:
+        with _executor_lock:
+            if _batch_executor is None:
+                _batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="analysis-batch")
+    return _batch_executor
+
+
+class Pipeline:
+    """
+    A small dependency graph of analysis stages.
+
+    Each stage is a function called with the results of its dependencies, in
+    order. A stage is submitted to the shared thread pool as soon as all of
+    its dependencies have finished, so independent stages (typically network
+    calls) overlap and the wall-clock time approaches the longest chain of
+    stages rather than their sum. The calling thread only schedules; stages
+    must not run pipelines of their own, which could exhaust the pool.
+
+    An input named like a stage replaces that stage, so callers that already
+    have a stage's result (e.g. from an async client) skip its work.
+    """
+
+    def __init__(self, executor=None):
+        """
+        Args:
+            executor (Executor, optional): Where stages run. Defaults to the shared pool.
+        """
+        self.executor = executor
+        self.stages = {}
+
+    def add(self, name, func, dependencies=()):
+        """
+        Add a stage.
+
+        Args:
+            name (str): Unique stage name, also the key of its result
+            func (callable): Called with the results of the dependencies
+            dependencies (list): Names of stages or inputs this stage needs
+
+        Returns:
+            Pipeline: self, so calls can be chained
+        """
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage '{name}'")
+        self.stages[name] = Stage(name, func, tuple(dependencies))
+        return self
+
+    def _check(self, inputs):
+        known = set(inputs) | set(self.stages)
+        for stage in self.stages.values():
+            missing = [dependency for dependency in stage.dependencies if dependency not in known]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown {', '.join(missing)}")
+
+    def run_iter(self, **inputs):
+        """
+        Run the stages, yielding each result as soon as its stage finishes.
+
+        Args:
+            **inputs: Named values stages can depend on, or results of stages to skip
+
+        Yields:
+            tuple: (stage name, result) in completion order
+
+        Raises:
+            ValueError: If a dependency is unknown or the graph has a cycle
+            Exception: The first exception raised by a stage
+        """
+        self._check(inputs)
+        executor = self.executor or get_executor()
+        results = dict(inputs)
+        waiting = {name: stage for name, stage in self.stages.items() if name not in inputs}
+        running = {}
+
+        try:
+            while waiting or running:
+                for name, stage in list(waiting.items()):
+                    if all(dependency in results for dependency in stage.dependencies):
+                        arguments = [results[dependency] for dependency in stage.dependencies]
+                        running[executor.submit(stage.func, *arguments)] = name
+                        del waiting[name]
+
+                if not running:
+                    raise ValueError(f"Stages {', '.join(waiting)} have circular dependencies")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    results[name] = future.result()
+                    yield name, results[name]
+        finally:
+            # Stages that have not started yet are dropped if the caller stops early
+            for future in running:
+                future.cancel()
+
+    def run(self, **inputs):
+        """
+        Run all stages and wait for them.
+
+        Args:
+            **inputs: Named values stages can depend on
+
+        Returns:
+            dict: Stage name -> result
+        """
+        return dict(self.run_iter(**inputs))
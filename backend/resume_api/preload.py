@@ -0,0 +1,55 @@
+import gc
+import os
+
+
+def preload_shared_state():
+    """
+    Load the embedding model and the analyzer's read-only structures in the
+    pre-fork master process so every forked worker shares them copy-on-write.
+
+    No inference is run here: using torch's thread pool before fork can leave
+    the children with a broken OpenMP runtime.
+    """
+    # Importing the views loads the embedding backend and the shared analyzer
+    from . import views  # noqa: F401
+
+    # Move everything allocated so far into the permanent generation, so the
+    # garbage collector never writes to those objects' headers in the workers
+    gc.collect()
+    gc.freeze()
+
+
+def process_memory():
+    """
+    Report the memory of the current process, splitting shared from private pages.
+
+    Returns:
+        dict: Memory figures in MB, plus the process id
+    """
+    fields = {
+        "Rss": "rssMb",
+        "Pss": "pssMb",
+        "Shared_Clean": "sharedCleanMb",
+        "Shared_Dirty": "sharedDirtyMb",
+        "Private_Clean": "privateCleanMb",
+        "Private_Dirty": "privateDirtyMb",
+    }
+    memory = {"pid": os.getpid()}
+
+    try:
+        # Proportional set size is only available from /proc on Linux
+        with open("/proc/self/smaps_rollup") as smaps:
+            for line in smaps:
+                name, _, value = line.partition(":")
+                if name in fields:
+                    memory[fields[name]] = round(int(value.split()[0]) / 1024, 1)
+    except OSError:
+        try:
+            # resource is Unix-only; ru_maxrss is in KB on Linux
+            import resource
+            memory["maxRssMb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        except ImportError:
+            pass
+
+    memory["gcFrozenObjects"] = gc.get_freeze_count()
+    return memory
@@ -0,0 +1,307 @@
+import os
+import asyncio
+import hashlib
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError
+from django.db.models import F
+from django.utils import timezone
+
+from . import embeddings
+from .lexicon import get_lexicon
+from .models import AnalysisResult, IdempotencyRecord
+
+# Bump when a change to the analysis makes earlier results stale
+ANALYZER_VERSION = "2026.10.1"
+
+# Stored results unused for this long are ignored and pruned
+RESULT_TTL_DAYS = int(os.getenv("ANALYSIS_RESULT_TTL_DAYS", "30"))
+# Idempotency keys are replayed for this long after the first request
+IDEMPOTENCY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_TTL_HOURS", "24"))
+
+# status: 'hit' (stored result), 'miss' (computed now), 'shared' (computed by a
+# concurrent identical request) or 'replayed' (earlier response to the same Idempotency-Key)
+CachedAnalysis = namedtuple("CachedAnalysis", ["result", "resume_text", "job_desc_text", "status"])
+
+
+class IdempotencyConflict(Exception):
+    """Raised when an Idempotency-Key is reused for a different request."""
+
+
+class SingleFlight:
+    """
+    Runs one computation per key at a time; callers arriving while it runs
+    wait for its result instead of repeating the work.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, func):
+        """
+        Args:
+            key (str): Identifies the computation
+            func (callable): Computes the value, called without arguments
+
+        Returns:
+            tuple: (value, True if it was computed by another caller)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = Future()
+        if not leader:
+            return call.result(), True
+
+        try:
+            value = func()
+        except BaseException as e:
+            call.set_exception(e)
+            raise
+        else:
+            call.set_result(value)
+            return value, False
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+_in_flight = SingleFlight()
+
+
+class AsyncSingleFlight:
+    """
+    SingleFlight for coroutines: callers on the same event loop arriving while
+    a computation runs await its result. The computation runs as a task of its
+    own, so it finishes even if the caller that started it is cancelled.
+    """
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(self, key, func):
+        """
+        Args:
+            key (str): Identifies the computation
+            func (callable): Coroutine function computing the value, called without arguments
+
+        Returns:
+            tuple: (value, True if it was computed by another caller)
+        """
+        # Tasks belong to one loop, e.g. one per request under async_to_sync
+        loop_key = (asyncio.get_running_loop(), key)
+        task = self._calls.get(loop_key)
+        if task is not None:
+            return await asyncio.shield(task), True
+
+        task = self._calls[loop_key] = asyncio.ensure_future(func())
+        task.add_done_callback(lambda _: self._calls.pop(loop_key, None))
+        return await asyncio.shield(task), False
+
+
+_in_flight_async = AsyncSingleFlight()
+
+
+def content_hash(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def analysis_version(profile):
+    """
+    Everything besides the uploads that decides an analysis result.
+
+    Args:
+        profile (MatchProfile): The matching profile
+
+    Returns:
+        str: e.g. "2026.10.1/lexicon 2026.10.3/bert-base-uncased:fp32/balanced"
+    """
+    backend = embeddings.backend.name if embeddings.backend else "none"
+    return f"{ANALYZER_VERSION}/lexicon {get_lexicon().version}/{embeddings.MODEL_NAME}:{backend}/{profile.name}"
+
+
+def _is_cacheable(result):
+    # Degraded results are worse than a full analysis would be; failed Azure
+    # calls are reported as degraded stages too. Error responses for
+    # unreadable files carry no degradedStages at all
+    return result.get("degradedStages") == []
+
+
+def _result_cutoff():
+    return timezone.now() - timedelta(days=RESULT_TTL_DAYS)
+
+
+def _idempotency_cutoff():
+    return timezone.now() - timedelta(hours=IDEMPOTENCY_TTL_HOURS)
+
+
+def prune():
+    """
+    Delete stored results unused for ANALYSIS_RESULT_TTL_DAYS and idempotency
+    records older than IDEMPOTENCY_TTL_HOURS.
+
+    Returns:
+        tuple: (results deleted, idempotency records deleted)
+    """
+    results, _ = AnalysisResult.objects.filter(last_used_at__lt=_result_cutoff()).delete()
+    records, _ = IdempotencyRecord.objects.filter(created_at__lt=_idempotency_cutoff()).delete()
+    return results, records
+
+
+def _request_keys(resume_content, job_desc_content, profile, idempotency_key, user):
+    """
+    Returns:
+        tuple: (resume hash, job description hash, version, cache key, idempotency key scoped to the user or None)
+    """
+    resume_hash = content_hash(resume_content)
+    job_desc_hash = content_hash(job_desc_content)
+    version = analysis_version(profile)
+    cache_key = hashlib.sha256(f"{resume_hash}:{job_desc_hash}:{version}".encode()).hexdigest()
+    scoped_key = f"{user.pk if user else '-'}:{idempotency_key}" if idempotency_key else None
+    return resume_hash, job_desc_hash, version, cache_key, scoped_key
+
+
+def _replayed(scoped_key, cache_key, idempotency_key):
+    """The earlier response to an Idempotency-Key, or None if it is new."""
+    record = IdempotencyRecord.objects.filter(scoped_key=scoped_key).first()
+    if record is not None and record.created_at < _idempotency_cutoff():
+        # Expired but not yet pruned; the key starts over
+        record.delete()
+        record = None
+    if record is None:
+        return None
+    if record.request_hash != cache_key:
+        raise IdempotencyConflict(f"Idempotency-Key '{idempotency_key}' was used for a different request")
+    return CachedAnalysis(record.result, None, None, "replayed")
+
+
+def _lookup(cache_key):
+    entry = AnalysisResult.objects.filter(cache_key=cache_key, last_used_at__gte=_result_cutoff()).first()
+    if entry is not None:
+        # update() skips auto_now, so last_used_at is set here
+        AnalysisResult.objects.filter(pk=entry.pk).update(hits=F("hits") + 1, last_used_at=timezone.now())
+        return CachedAnalysis(entry.result, entry.resume_text, entry.job_desc_text, "hit")
+    return None
+
+
+def _store(keys, computed):
+    """Store a computed (result, resume text, job description text) if it is cacheable."""
+    resume_hash, job_desc_hash, version, cache_key, _ = keys
+    result, resume_text, job_desc_text = computed
+    if _is_cacheable(result):
+        try:
+            # An expired entry under the same key is replaced
+            AnalysisResult.objects.update_or_create(
+                cache_key=cache_key,
+                defaults={'resume_hash': resume_hash, 'job_desc_hash': job_desc_hash, 'version': version,
+                          'resume_text': resume_text, 'job_desc_text': job_desc_text, 'result': result,
+                          'hits': 0})
+        except IntegrityError:
+            # Stored concurrently by another process; both results are equivalent
+            pass
+    return CachedAnalysis(result, resume_text, job_desc_text, "miss")
+
+
+def _remember_response(scoped_key, cache_key, result):
+    try:
+        IdempotencyRecord.objects.create(scoped_key=scoped_key, request_hash=cache_key, result=result)
+    except IntegrityError:
+        # A concurrent retry with the same key got here first
+        pass
+
+
+def get_or_compute(resume_content, job_desc_content, profile, compute, idempotency_key=None, user=None):
+    """
+    Get the analysis of a pair of uploads from the cache, or compute it once.
+
+    Results are stored under a hash of both file contents and the analysis
+    version, so a repeat returns with a single indexed lookup. Identical
+    requests that arrive while the analysis runs share it rather than start
+    their own (within this process). With an idempotency key, a retried
+    request gets the response of the first one even if it was not cacheable.
+
+    Args:
+        resume_content (bytes): The resume file
+        job_desc_content (bytes): The job description file
+        profile (MatchProfile): The matching profile
+        compute (callable): Returns (result, resume_text, job_desc_text) when there is no stored result
+        idempotency_key (str, optional): Client key identifying this submission
+        user (User, optional): The requesting user; keys are scoped per user
+
+    Returns:
+        CachedAnalysis: The result, the extracted texts and how it was obtained
+
+    Raises:
+        IdempotencyConflict: If the key was used for a different request
+    """
+    keys = _request_keys(resume_content, job_desc_content, profile, idempotency_key, user)
+    cache_key, scoped_key = keys[3], keys[4]
+    if scoped_key:
+        replayed = _replayed(scoped_key, cache_key, idempotency_key)
+        if replayed is not None:
+            return replayed
+
+    def compute_and_store():
+        # Another process may have stored it while this request waited
+        return _lookup(cache_key) or _store(keys, compute())
+
+    analysis = _lookup(cache_key)
+    if analysis is None:
+        analysis, shared = _in_flight.do(cache_key, compute_and_store)
+        if shared:
+            analysis = analysis._replace(status="shared")
+
+    if scoped_key:
+        _remember_response(scoped_key, cache_key, analysis.result)
+    return analysis
+
+
+async def get_or_compute_async(resume_content, job_desc_content, profile, compute, idempotency_key=None, user=None):
+    """
+    Get the analysis of a pair of uploads from the cache, or compute it once,
+    without blocking the event loop; see get_or_compute.
+
+    Identical requests share one analysis among the requests of the same
+    event loop, e.g. the worker process under ASGI.
+
+    Args:
+        resume_content (bytes): The resume file
+        job_desc_content (bytes): The job description file
+        profile (MatchProfile): The matching profile
+        compute (callable): Coroutine function returning (result, resume_text, job_desc_text)
+        idempotency_key (str, optional): Client key identifying this submission
+        user (User, optional): The requesting user; keys are scoped per user
+
+    Returns:
+        CachedAnalysis: The result, the extracted texts and how it was obtained
+
+    Raises:
+        IdempotencyConflict: If the key was used for a different request
+    """
+    # Hashed in a thread, as uploads can be large
+    keys = await asyncio.to_thread(_request_keys, resume_content, job_desc_content, profile, idempotency_key, user)
+    cache_key, scoped_key = keys[3], keys[4]
+    if scoped_key:
+        replayed = await sync_to_async(_replayed)(scoped_key, cache_key, idempotency_key)
+        if replayed is not None:
+            return replayed
+
+    async def compute_and_store():
+        # Another process may have stored it while this request waited
+        return await sync_to_async(_lookup)(cache_key) or await sync_to_async(_store)(keys, await compute())
+
+    analysis = await sync_to_async(_lookup)(cache_key)
+    if analysis is None:
+        analysis, shared = await _in_flight_async.do(cache_key, compute_and_store)
+        if shared:
+            analysis = analysis._replace(status="shared")
+
+    if scoped_key:
+        await sync_to_async(_remember_response)(scoped_key, cache_key, analysis.result)
+    return analysis
@@ -1,14 +1,67 @@
 import os
 import json
-import re
 from difflib import SequenceMatcher
 import PyPDF2
 import docx
 import tempfile
+import functools
+import asyncio
+import numpy as np
 
 # Import Azure services clients
 from . import azure_language_client
 from . import azure_vision_client
+from . import text_quality
+from . import matching
+from . import tfidf
+from . import feature_cache
+from . import feature_store
+from .lexicon import get_lexicon
+from .document import ParsedDocument
+from .budget import Deadline
+from .pipeline import Pipeline
+
+def _text_stats(document):
+    return {
+        "characters": len(document),
+        "words": len(document.tokens),
+        "sentences": len(document.sentence_spans),
+        "sections": list(document.sections)
+    }
+
+# Parts of a progressive analysis: (name, pipeline stages it needs, function of
+# their results building its fragment of the response), cheapest first
+PROGRESS_PARTS = [
+    ("textStats", ["resume_doc", "job_doc"], lambda resume_doc, job_doc: {
+        "textStats": {"resume": _text_stats(resume_doc), "jobDescription": _text_stats(job_doc)}
+    }),
+    ("skills", ["technical_skills_in_job", "technical_skills_in_resume", "soft_skills_in_job", "soft_skills_in_resume"],
+     lambda technical_in_job, technical_in_resume, soft_in_job, soft_in_resume: {
+        "technicalSkillsMatch": {"inJob": technical_in_job, "inResume": technical_in_resume},
+        "softSkillsMatch": {"inJob": soft_in_job, "inResume": soft_in_resume}
+    }),
+    ("missingKeywords", ["skill_matches"], lambda skill_matches: {
+        "keywordsToAdd": skill_matches["missing_technical_skills"] + skill_matches["missing_soft_skills"],
+        "keywordsToRemove": skill_matches["keywords_to_remove"],
+        "technicalSkillsMatch": {"missing": skill_matches["missing_technical_skills"]},
+        "softSkillsMatch": {"missing": skill_matches["missing_soft_skills"]}
+    }),
+    ("sentimentAnalysis", ["sentiment_analysis"], lambda sentiment_analysis: {
+        "sentimentAnalysis": sentiment_analysis
+    }),
+    ("matchScore", ["match_score"], lambda match_score: {"matchScore": match_score}),
+    ("contentSuggestions", ["content_suggestions"], lambda content_suggestions: {
+        "contentSuggestions": content_suggestions
+    }),
+    ("complete", ["result"], lambda result: result),
+]
+
+# Stages that depend on one side only, whose results the feature cache keeps:
+# the parsed document (with its sections), key phrases, technical skills and soft skills
+FEATURE_STAGES = {
+    "resume": ("resume_doc", "resume_key_phrases", "technical_skills_in_resume", "soft_skills_in_resume"),
+    "job": ("job_doc", "job_key_phrases", "technical_skills_in_job", "soft_skills_in_job"),
+}
 
 class ResumeAnalyzer:
     """
@@ -19,27 +72,35 @@ class ResumeAnalyzer:
     def __init__(self):
         self.similarity_threshold = 0.6  # Threshold for considering keywords similar
     
-    def extract_text_from_file(self, file_content, file_type):
+    def extract_text_from_file(self, file_content, file_type, deadline=None):
         """
         Extract text from uploaded files using appropriate methods based on file type.
         
         Args:
             file_content (bytes): The content of the file
             file_type (str): The type/extension of the file
+            deadline (Deadline, optional): Time budget of the request
             
         Returns:
             str: The extracted text
         """
         file_type = file_type.lower()
+        deadline = deadline or Deadline()
         
         # For PDF files, use Azure Computer Vision if we can, otherwise fall back to PyPDF2
         if file_type == 'pdf':
+            # Without time for a round of OCR, read the embedded text layer locally
+            if not deadline.allows("ocr"):
+                return self._extract_text_from_pdf_with_pypdf2(file_content)
             try:
                 # Try using Azure Computer Vision first
-                extracted_text = azure_vision_client.extract_text_from_pdf(file_content)
+                extracted_text = azure_vision_client.extract_text_from_pdf(
+                    file_content, timeout=deadline.remaining_seconds())
                 
                 # If we get an error message back (as a string), fall back to PyPDF2
                 if extracted_text.startswith("Error:"):
+                    if extracted_text == azure_vision_client.OCR_TIMEOUT_ERROR:
+                        deadline.degrade("ocr")
                     return self._extract_text_from_pdf_with_pypdf2(file_content)
                 return extracted_text
             except Exception as e:
@@ -60,7 +121,9 @@ class ResumeAnalyzer:
         # For image files, use Azure Computer Vision
         elif file_type in ['jpg', 'jpeg', 'png', 'bmp', 'gif']:
             try:
-                return azure_vision_client.extract_text_from_image(file_content)
+                # No local OCR to fall back on, so the remaining budget bounds the wait
+                return azure_vision_client.extract_text_from_image(
+                    file_content, timeout=deadline.remaining_seconds())
             except Exception as e:
                 print(f"Image extraction failed: {str(e)}")
                 return "Error: Could not extract text from the provided image file."
@@ -119,13 +182,275 @@ class ResumeAnalyzer:
             print(f"DOCX extraction error: {str(e)}")
             return "Error: Could not extract text from the provided DOCX file."
     
-    def analyze_resume_and_job_description(self, resume_text, job_desc_text):
+    def analyze_files(self, resume_content, resume_file_name, job_desc_content, job_desc_file_name,
+                      profile=None, deadline=None):
+        """
+        Extract the text of both uploaded files concurrently and analyze them.
+        
+        Args:
+            resume_content (bytes): The resume file
+            resume_file_name (str): Its file name, whose extension selects the extractor
+            job_desc_content (bytes): The job description file
+            job_desc_file_name (str): Its file name
+            profile (str, optional): Matching profile: 'fast', 'balanced' or 'accurate'
+            deadline (Deadline, optional): Time budget of the request
+            
+        Returns:
+            dict: The analysis results, as from analyze_resume_and_job_description
+        """
+        # A file seen before needs neither extraction nor its per-document stages
+        deadline = deadline or Deadline()
+        resume_text, job_desc_text = self.extract_files(
+            resume_content, resume_file_name, job_desc_content, job_desc_file_name, deadline)
+        return self.analyze_resume_and_job_description(resume_text, job_desc_text, profile=profile, deadline=deadline)
+    
+    def analyze_files_progressively(self, resume_content, resume_file_name, job_desc_content, job_desc_file_name,
+                                    profile=None, deadline=None):
+        """
+        Analyze two uploaded files, yielding parts of the result as soon as
+        the stages behind them finish.
+        
+        Each part is a fragment of the analyze_files dictionary with the same
+        keys, apart from the extra 'textStats'. Merging the fragments in order,
+        objects key by key, gives the full result, which the final 'complete'
+        part also carries.
+        
+        Args:
+            resume_content (bytes): The resume file
+            resume_file_name (str): Its file name, whose extension selects the extractor
+            job_desc_content (bytes): The job description file
+            job_desc_file_name (str): Its file name
+            profile (str, optional): Matching profile: 'fast', 'balanced' or 'accurate'
+            deadline (Deadline, optional): Time budget of the request
+            
+        Yields:
+            tuple: (part name, dict fragment) in the order the parts become ready
+        """
+        deadline = deadline or Deadline()
+        resume_text, job_desc_text = self.extract_files(
+            resume_content, resume_file_name, job_desc_content, job_desc_file_name, deadline)
+        yield from self.analyze_progressively(resume_text, job_desc_text, profile=profile, deadline=deadline)
+    
+    def analyze_progressively(self, resume_text, job_desc_text, profile=None, deadline=None):
+        """
+        Analyze extracted texts like analyze_files_progressively, yielding the
+        same parts as soon as the stages behind them finish.
+        
+        Args:
+            resume_text (str): The text content of the resume
+            job_desc_text (str): The text content of the job description
+            profile (str, optional): Matching profile: 'fast', 'balanced' or 'accurate'
+            deadline (Deadline, optional): Time budget of the request
+            
+        Yields:
+            tuple: (part name, dict fragment) in the order the parts become ready
+        """
+        deadline = deadline or Deadline()
+        if resume_text.startswith("Error:") or job_desc_text.startswith("Error:"):
+            yield "complete", self._generate_error_response(resume_text, job_desc_text)
+            return
+        keys, cached = self._lookup_features({"resume": resume_text, "job": job_desc_text})
+        
+        pending = list(PROGRESS_PARTS)
+        # Cached stages do not run, so their results count as ready from the start
+        inputs = self._feature_inputs(cached)
+        results = dict(inputs)
+        pipeline = self.build_analysis_pipeline(profile, deadline)
+        for name, result in pipeline.run_iter(resume_text=resume_text, job_desc_text=job_desc_text, **inputs):
+            results[name] = result
+            for part in list(pending):
+                part_name, stages, build = part
+                if all(stage in results for stage in stages):
+                    pending.remove(part)
+                    yield part_name, build(*[results[stage] for stage in stages])
+        self._store_features(keys, cached, results, deadline)
+    
+    def extract_files(self, resume_content, resume_file_name, job_desc_content, job_desc_file_name, deadline=None):
+        """
+        Extract the text of both uploaded files at once, since OCR calls dominate extraction.
+        
+        Returns:
+            tuple: (resume text, job description text)
+        """
+        extract = functools.partial(self.extract_upload, deadline=deadline or Deadline())
+        extraction = Pipeline()
+        extraction.add('resume_text', extract, ['resume_content', 'resume_file_name'])
+        extraction.add('job_desc_text', extract, ['job_desc_content', 'job_desc_file_name'])
+        extracted = extraction.run(
+            resume_content=resume_content, resume_file_name=resume_file_name,
+            job_desc_content=job_desc_content, job_desc_file_name=job_desc_file_name
+        )
+        return extracted['resume_text'], extracted['job_desc_text']
+    
+    def extract_upload(self, file_content, file_name, deadline=None):
+        """
+        Extract the text of an uploaded file, or take it from the text cache
+        when the same file was extracted before.
+        
+        Args:
+            file_content (bytes): The content of the file
+            file_name (str): Its file name, whose extension selects the extractor
+            deadline (Deadline, optional): Time budget of the request
+            
+        Returns:
+            str: The extracted text
+        """
+        deadline = deadline or Deadline()
+        upload_key = feature_cache.content_key(file_content)
+        text = feature_cache.get_text(upload_key)
+        if text is None:
+            text = self.extract_text_from_file(file_content, file_name.split('.')[-1], deadline=deadline)
+            self._remember_text(upload_key, text, deadline)
+        return text
+    
+    def _remember_text(self, upload_key, text, deadline):
+        # Neither a failure nor the local fallback of a timed-out OCR call may stand in for the text later
+        if not text.startswith("Error:") and "ocr" not in deadline.degraded_stages:
+            feature_cache.put_text(upload_key, text)
+    
+    async def extract_text_from_file_async(self, file_content, file_type, deadline=None):
+        """
+        Extract text like extract_text_from_file, awaiting OCR instead of blocking on it.
+        
+        Args:
+            file_content (bytes): The content of the file
+            file_type (str): The type/extension of the file
+            deadline (Deadline, optional): Time budget of the request
+            
+        Returns:
+            str: The extracted text
+        """
+        file_type = file_type.lower()
+        deadline = deadline or Deadline()
+        
+        if file_type == 'pdf' and deadline.allows("ocr"):
+            extracted_text = await azure_vision_client.extract_text_from_pdf_async(
+                file_content, timeout=deadline.remaining_seconds())
+            if not extracted_text.startswith("Error:"):
+                return extracted_text
+            if extracted_text == azure_vision_client.OCR_TIMEOUT_ERROR:
+                deadline.degrade("ocr")
+            return await asyncio.to_thread(self._extract_text_from_pdf_with_pypdf2, file_content)
+        
+        if file_type in ['jpg', 'jpeg', 'png', 'bmp', 'gif']:
+            return await azure_vision_client.extract_text_from_image_async(
+                file_content, timeout=deadline.remaining_seconds())
+        
+        # Everything else is parsed locally
+        return await asyncio.to_thread(self.extract_text_from_file, file_content, file_type, deadline)
+    
+    async def analyze_files_async(self, resume_content, resume_file_name, job_desc_content, job_desc_file_name,
+                                  profile=None, deadline=None):
+        """
+        Analyze two uploaded files without blocking the event loop; see analyze_files.
+        
+        Returns:
+            dict: The analysis results, as from analyze_resume_and_job_description
+        """
+        deadline = deadline or Deadline()
+        resume_text, job_desc_text = await self.extract_files_async(
+            resume_content, resume_file_name, job_desc_content, job_desc_file_name, deadline)
+        return await self.analyze_resume_and_job_description_async(
+            resume_text, job_desc_text, profile=profile, deadline=deadline)
+    
+    async def extract_files_async(self, resume_content, resume_file_name, job_desc_content, job_desc_file_name,
+                                  deadline=None):
+        """
+        Extract the text of both uploaded files at once without blocking the event loop; see extract_files.
+        
+        Returns:
+            tuple: (resume text, job description text)
+        """
+        deadline = deadline or Deadline()
+        
+        async def extract(content, file_name):
+            # Hashed in a thread, as uploads can be large
+            upload_key = await asyncio.to_thread(feature_cache.content_key, content)
+            text = feature_cache.get_text(upload_key)
+            if text is None:
+                text = await self.extract_text_from_file_async(content, file_name.split('.')[-1], deadline)
+                self._remember_text(upload_key, text, deadline)
+            return text
+        
+        return tuple(await asyncio.gather(
+            extract(resume_content, resume_file_name), extract(job_desc_content, job_desc_file_name)))
+    
+    async def analyze_resume_and_job_description_async(self, resume_text, job_desc_text, profile=None, deadline=None):
+        """
+        Analyze a resume against a job description without blocking the event loop.
+        
+        The Azure Language calls are awaited on the async client, so a single
+        event loop can keep many of them in flight. Their results are then
+        passed to the same pipeline as the sync path, which skips those stages
+        and runs the CPU-bound rest in worker threads.
+        
+        Args:
+            resume_text (str): The text content of the resume
+            job_desc_text (str): The text content of the job description
+            profile (str, optional): Matching profile: 'fast', 'balanced' or 'accurate'
+            deadline (Deadline, optional): Time budget of the request
+            
+        Returns:
+            dict: The same dictionary as analyze_resume_and_job_description
+        """
+        if resume_text.startswith("Error:") or job_desc_text.startswith("Error:"):
+            return self._generate_error_response(resume_text, job_desc_text)
+        
+        deadline = deadline or Deadline()
+        keys, cached = await asyncio.to_thread(self._lookup_features, {"resume": resume_text, "job": job_desc_text})
+        inputs = self._feature_inputs(cached)
+        resume_doc, job_doc = await asyncio.to_thread(lambda: (
+            inputs["resume_doc"] if "resume_doc" in inputs else ParsedDocument(resume_text),
+            inputs["job_doc"] if "job_doc" in inputs else ParsedDocument(job_desc_text)))
+        
+        async def extract_key_phrases(document, stage):
+            if stage in inputs:
+                return inputs[stage]
+            if not deadline.allows("keyPhrases"):
+                return []
+            key_phrases = await azure_language_client.extract_key_phrases_async(
+                document.text, timeout=deadline.remaining_seconds())
+            return self._checked_key_phrases(key_phrases, document, deadline)
+        
+        async def analyze_sentiment():
+            sentiment_analysis = None
+            if deadline.allows("sentiment"):
+                sentiment_analysis = await azure_language_client.analyze_sentiment_async(
+                    resume_doc.text, timeout=deadline.remaining_seconds())
+                self._check_sentiment(sentiment_analysis, deadline)
+            if not sentiment_analysis or not isinstance(sentiment_analysis, dict):
+                sentiment_analysis = {
+                    "sentiment": "neutral"
+                }
+            return sentiment_analysis
+        
+        resume_key_phrases, job_key_phrases, sentiment_analysis = await asyncio.gather(
+            extract_key_phrases(resume_doc, "resume_key_phrases"), extract_key_phrases(job_doc, "job_key_phrases"),
+            analyze_sentiment())
+        inputs.update(
+            resume_doc=resume_doc, job_doc=job_doc,
+            resume_key_phrases=resume_key_phrases, job_key_phrases=job_key_phrases,
+            sentiment_analysis=sentiment_analysis
+        )
+        
+        pipeline = self.build_analysis_pipeline(profile, deadline)
+        results = await asyncio.to_thread(
+            pipeline.run, resume_text=resume_text, job_desc_text=job_desc_text, **inputs)
+        results.update(inputs)
+        self._store_features(keys, cached, results, deadline)
+        return results["result"]
+    
+    def analyze_resume_and_job_description(self, resume_text, job_desc_text, profile=None, deadline=None):
         """
         Analyze a resume against a job description and provide tailoring suggestions.
         
         Args:
             resume_text (str): The text content of the resume
             job_desc_text (str): The text content of the job description
+            profile (str, optional): Matching profile: 'fast', 'balanced' or 'accurate'.
+                Defaults to MATCHING_PROFILE.
+            deadline (Deadline, optional): Time budget of the request; stages that
+                do not fit in the remaining time are degraded and reported
             
         Returns:
             dict: A dictionary containing analysis results and suggestions
@@ -134,75 +459,428 @@ class ResumeAnalyzer:
         if resume_text.startswith("Error:") or job_desc_text.startswith("Error:"):
             return self._generate_error_response(resume_text, job_desc_text)
         
-        # Extract key phrases from both documents using Azure Language Service
-        resume_key_phrases = azure_language_client.extract_key_phrases(resume_text)
-        job_key_phrases = azure_language_client.extract_key_phrases(job_desc_text)
+        deadline = deadline or Deadline()
+        keys, cached = self._lookup_features({"resume": resume_text, "job": job_desc_text})
+        pipeline = self.build_analysis_pipeline(profile, deadline)
+        results = pipeline.run(resume_text=resume_text, job_desc_text=job_desc_text, **self._feature_inputs(cached))
+        self._store_features(keys, cached, results, deadline)
+        return results["result"]
+    
+    def _lookup_features(self, texts):
+        """
+        Find the features of each side of an analysis that were derived before,
+        in the feature cache or among the features stored for saved documents.
+        
+        Args:
+            texts (dict): Side ('resume' or 'job') -> its text
+            
+        Returns:
+            tuple: (side -> content key of its text, side -> DocumentFeatures for the sides found)
+        """
+        keys = {side: feature_cache.content_key(text) for side, text in texts.items()}
+        cached = self._cached_features(keys)
+        cached.update(self._stored_features(keys, texts, cached))
+        return keys, cached
+    
+    def _cached_features(self, keys):
+        """
+        Look up the cached features of each side of an analysis.
+        
+        Args:
+            keys (dict): Side ('resume' or 'job') -> content key of its document
+            
+        Returns:
+            dict: Side -> DocumentFeatures, for the sides found
+        """
+        cached = {}
+        for side, key in keys.items():
+            features = feature_cache.get_features(key)
+            if features is not None:
+                cached[side] = features
+        return cached
+    
+    def _feature_inputs(self, cached):
+        """Pipeline inputs that replace the per-document stages of the cached sides."""
+        inputs = {}
+        for side, features in cached.items():
+            doc_stage, key_phrases_stage, technical_stage, soft_stage = FEATURE_STAGES[side]
+            inputs[doc_stage] = features.document
+            # Lists, as the stages build on them and the results are handed to callers
+            inputs[key_phrases_stage] = list(features.key_phrases)
+            inputs[technical_stage] = list(features.technical_skills)
+            inputs[soft_stage] = list(features.soft_skills)
+        return inputs
+    
+    def _store_features(self, keys, cached, results, deadline):
+        """
+        Cache the per-document features an analysis computed.
+        
+        Nothing is stored from a degraded analysis, and a side without key
+        phrases is left out as well, since that is also how a failed Azure call looks.
         
-        # Analyze the extracted key phrases for technical skills, qualifications, etc.
-        technical_skills_in_job = self._extract_technical_skills(job_key_phrases, job_desc_text)
-        technical_skills_in_resume = self._extract_technical_skills(resume_key_phrases, resume_text)
+        Args:
+            keys (dict): Side -> content key of its document
+            cached (dict): Side -> DocumentFeatures of the sides that were already cached
+            results (dict): Stage name -> result of the pipeline run
+            deadline (Deadline): Time budget of the analysis
+        """
+        if {"keyPhrases", "ocr"} & set(deadline.degraded_stages):
+            return
+        for side, key in keys.items():
+            if side in cached or not all(stage in results for stage in FEATURE_STAGES[side]):
+                continue
+            self._cache_features(key, self._document_features(*[results[stage] for stage in FEATURE_STAGES[side]]))
+    
+    def _stored_features(self, keys, texts, cached):
+        """
+        Load the features precomputed for stored documents, for the sides the
+        memory cache missed, and cache them under each side's key for next time.
+        
+        Args:
+            keys (dict): Side -> content key of its text
+            texts (dict): Side -> its text
+            cached (dict): Side -> DocumentFeatures of the sides already found
+            
+        Returns:
+            dict: Side -> DocumentFeatures, for the sides found
+        """
+        missing = [side for side in texts if side not in cached]
+        if not missing:
+            return {}
+        stored = feature_store.load_features({keys[side]: texts[side] for side in missing})
+        found = {}
+        for side in missing:
+            features = stored.get(keys[side])
+            if features is not None:
+                feature_cache.put_features(keys[side], features)
+                found[side] = features
+        return found
+    
+    def _document_features(self, document, key_phrases, technical_skills, soft_skills):
+        return feature_cache.DocumentFeatures(
+            text=document.raw_text,
+            document=document,
+            key_phrases=tuple(key_phrases),
+            technical_skills=tuple(technical_skills),
+            soft_skills=tuple(soft_skills),
+            canonical_skills=frozenset(get_lexicon().canonical_skills.canonical_ids(technical_skills))
+        )
+    
+    def _cache_features(self, key, features):
+        # No key phrases is also what a failed Azure call returns, so those are not kept
+        if features.key_phrases and not features.text.startswith("Error:"):
+            feature_cache.put_features(key, features)
+    
+    def extract_document_features(self, texts, deadline=None):
+        """
+        Get the per-document features of several texts, from the feature cache,
+        from the features precomputed for stored documents, or by computing the
+        rest with one batched round of key phrase requests.
         
-        # Identify soft skills in both documents
-        soft_skills_in_job = self._extract_soft_skills(job_desc_text)
-        soft_skills_in_resume = self._extract_soft_skills(resume_text)
+        Args:
+            texts (list): The document texts
+            deadline (Deadline, optional): Time budget of the request
+            
+        Returns:
+            list: DocumentFeatures per text, whose phrase and skill tuples are shared with the cache
+        """
+        deadline = deadline or Deadline()
+        keys = [feature_cache.content_key(text) for text in texts]
+        features = [feature_cache.get_features(key) for key in keys]
+        unknown = {key: text for key, text, found in zip(keys, texts, features) if found is None}
+        if unknown:
+            stored = feature_store.load_features(unknown)
+            for i, key in enumerate(keys):
+                if features[i] is None and key in stored:
+                    features[i] = stored[key]
+                    feature_cache.put_features(key, stored[key])
         
-        # Find keywords missing from the resume but present in the job description
-        missing_technical_skills = [skill for skill in technical_skills_in_job 
-                                    if not self._has_similar_term(skill, technical_skills_in_resume)]
+        missing = [i for i, found in enumerate(features) if found is None]
+        if not missing:
+            return features
+        docs = {i: ParsedDocument(texts[i]) for i in missing}
+        key_phrases = {i: [] for i in missing}
+        if deadline.allows("keyPhrases"):
+            fetched = azure_language_client.extract_key_phrases_batch(
+                [docs[i].text for i in missing], timeout=deadline.remaining_seconds())
+            key_phrases.update(zip(missing, fetched))
         
-        missing_soft_skills = [skill for skill in soft_skills_in_job 
-                               if not self._has_similar_term(skill, soft_skills_in_resume)]
+        for i in missing:
+            features[i] = self._document_features(
+                docs[i], key_phrases[i],
+                self._extract_technical_skills(key_phrases[i], docs[i]), self._extract_soft_skills(docs[i]))
+            if "keyPhrases" not in deadline.degraded_stages:
+                self._cache_features(keys[i], features[i])
+        return features
+    
+    def match_one_to_many(self, shared_text, counterpart_texts, shared_role="resume", profile=None,
+                          deadline=None, top_k=0):
+        """
+        Score one resume against many job descriptions, or one job description
+        against many resumes.
         
-        # Analyze resume sentiment using Azure Text Analytics
-        sentiment_analysis = azure_language_client.analyze_sentiment(resume_text)
-        print("Sentiment Analysis Result from Azure:", sentiment_analysis)
+        The shared document is parsed, sent for key phrases and skill-extracted
+        once, or not at all when its features are cached or stored. Skills are
+        then compared as one match matrix against the union of all counterpart
+        skills, and text similarity as one sparse product, so the cost of the
+        shared side does not grow with the number of counterparts.
         
-        # Ensure the sentiment analysis object has the expected structure
-        if not sentiment_analysis or not isinstance(sentiment_analysis, dict):
-            sentiment_analysis = {
-                "sentiment": "neutral"
+        Args:
+            shared_text (str): The text of the shared document
+            counterpart_texts (list): The texts to score it against
+            shared_role (str): 'resume' or 'jobDescription', the role of the shared document
+            profile (str, optional): Matching profile: 'fast', 'balanced' or 'accurate'
+            deadline (Deadline, optional): Time budget of the request
+            top_k (int): Number of best matches that also get the full analysis
+            
+        Returns:
+            dict: 'results' ranked by matchScore, each with the counterpart's
+                index, the score, its components and keywordsToAdd; the top_k
+                also carry 'analysis', the dictionary analyze_resume_and_job_description
+                returns. Both apply the same matching tiers, so their scores agree,
+                except where the single-pair path narrows semantic matching of long
+                skill lists with the ANN index, which the match matrix does not. Counterparts
+                whose text could not be extracted come last, with their
+                'error' and a null matchScore.
+        """
+        if shared_role not in ("resume", "jobDescription"):
+            raise ValueError(f"Unknown shared role '{shared_role}'. Choose 'resume' or 'jobDescription'")
+        deadline = deadline or Deadline()
+        matcher = matching.SkillMatcher(profile, self.similarity_threshold, deadline)
+        shared_is_resume = shared_role == "resume"
+        
+        # Failed extractions carry an error message rather than a document, so they are not scored
+        scored = [i for i, text in enumerate(counterpart_texts) if not text.startswith("Error:")]
+        failed = [{"index": i, "matchScore": None, "error": text}
+                  for i, text in enumerate(counterpart_texts) if text.startswith("Error:")]
+        if not scored:
+            return {
+                "sharedRole": shared_role,
+                "results": failed,
+                "matchingStats": matcher.stats(),
+                "degradedStages": deadline.degraded_stages
             }
         
-        # Combine all missing keywords
-        keywords_to_add = missing_technical_skills + missing_soft_skills
+        features = self.extract_document_features([shared_text] + [counterpart_texts[i] for i in scored], deadline)
+        shared_doc, counterpart_docs = features[0].document, [f.document for f in features[1:]]
+        shared_key_phrases, counterpart_key_phrases = features[0].key_phrases, [f.key_phrases for f in features[1:]]
+        shared_tech, counterpart_tech = features[0].technical_skills, [f.technical_skills for f in features[1:]]
+        shared_soft, counterpart_soft = features[0].soft_skills, [f.soft_skills for f in features[1:]]
         
-        # Find keywords in the resume that are not relevant to the job description
-        keywords_to_remove = [skill for skill in technical_skills_in_resume 
-                              if not self._has_similar_term(skill, technical_skills_in_job)]
+        # Soft skills too are compared as technical terms, as find_unmatched does in _calculate_match_score
+        tech = self._match_counts(matcher, shared_tech, counterpart_tech, shared_is_resume, True)
+        soft = self._match_counts(matcher, shared_soft, counterpart_soft, shared_is_resume, True)
+        text_similarity = tfidf.tfidf_similarities(shared_doc, counterpart_docs)
         
-        # Generate content suggestions based on analysis
-        content_suggestions = self._generate_content_suggestions(
-            resume_text, job_desc_text, 
-            technical_skills_in_resume, technical_skills_in_job,
-            keywords_to_add
-        )
+        # The same arithmetic as _calculate_match_score, for all counterparts at once
+        tech_scores = np.where(tech["jobSkills"] > 0,
+                               np.minimum(100, np.floor(tech["matched"] / np.maximum(tech["jobSkills"], 1) * 100)) * 0.5,
+                               50)
+        soft_scores = np.where(soft["jobSkills"] > 0,
+                               np.minimum(100, np.floor(soft["matched"] / np.maximum(soft["jobSkills"], 1) * 100)) * 0.2,
+                               20)
+        text_scores = np.minimum(100, np.floor(text_similarity * 100)) * 0.3
+        match_scores = np.clip(np.floor(tech_scores + soft_scores + text_scores), 0, 100).astype(int)
         
-        # Calculate match score
-        match_score = self._calculate_match_score(
-            resume_text, job_desc_text,
-            technical_skills_in_resume, technical_skills_in_job,
-            soft_skills_in_resume, soft_skills_in_job
-        )
+        # Stable ranking keeps counterparts with equal scores in their given order
+        ranking = np.argsort(-match_scores, kind="stable")
+        results = []
+        for rank, index in enumerate(ranking):
+            entry = {
+                "index": scored[index],
+                "matchScore": int(match_scores[index]),
+                "technicalSkillScore": float(tech_scores[index]),
+                "softSkillScore": float(soft_scores[index]),
+                "textSimilarity": round(float(text_similarity[index]), 4),
+                "keywordsToAdd": tech["missing"][index] + soft["missing"][index]
+            }
+            if rank < top_k:
+                entry["analysis"] = self._analyze_pair(
+                    shared_doc, shared_key_phrases, counterpart_docs[index], counterpart_key_phrases[index],
+                    shared_is_resume, profile, deadline)
+            results.append(entry)
         
-        # Return the analysis results
         return {
-            "keywordsToAdd": keywords_to_add,
-            "keywordsToRemove": keywords_to_remove,
-            "contentSuggestions": content_suggestions,
-            "matchScore": match_score,
-            "technicalSkillsMatch": {
-                "inJob": technical_skills_in_job,
-                "inResume": technical_skills_in_resume,
-                "missing": missing_technical_skills
-            },
-            "softSkillsMatch": {
-                "inJob": soft_skills_in_job,
-                "inResume": soft_skills_in_resume,
-                "missing": missing_soft_skills
-            },
-            "sentimentAnalysis": sentiment_analysis
+            "sharedRole": shared_role,
+            "results": results + failed,
+            "matchingStats": matcher.stats(),
+            "degradedStages": deadline.degraded_stages
         }
     
+    def _match_counts(self, matcher, shared_skills, counterpart_skills, shared_is_resume, is_tech_skill):
+        """
+        Count, for each counterpart, the job skills found in the resume, from
+        one match matrix between the shared skills and all counterpart skills.
+        """
+        vocabulary = list(dict.fromkeys(skill for skills in counterpart_skills for skill in skills))
+        columns = {skill: column for column, skill in enumerate(vocabulary)}
+        membership = np.zeros((len(counterpart_skills), len(vocabulary)), dtype=bool)
+        for row, skills in enumerate(counterpart_skills):
+            membership[row, [columns[skill] for skill in skills]] = True
+        matched = matcher.match_matrix(shared_skills, vocabulary, is_tech_skill=is_tech_skill)
+        
+        if shared_is_resume:
+            # Job skills are the counterpart's; one is found if any resume skill matches it
+            found = matched.any(axis=0)
+            counts = (membership & found).sum(axis=1)
+            job_skill_counts = membership.sum(axis=1)
+            missing = [[skill for skill in skills if not found[columns[skill]]] for skills in counterpart_skills]
+        else:
+            # Job skills are the shared ones; one is found if it matches any of the resume's skills
+            found = (matched.astype(np.int32) @ membership.T.astype(np.int32)) > 0
+            counts = found.sum(axis=0)
+            job_skill_counts = np.full(len(counterpart_skills), len(shared_skills))
+            missing = [[skill for skill, is_found in zip(shared_skills, found[:, row]) if not is_found]
+                       for row in range(len(counterpart_skills))]
+        return {"matched": counts, "jobSkills": job_skill_counts, "missing": missing}
+    
+    def _analyze_pair(self, shared_doc, shared_key_phrases, counterpart_doc, counterpart_key_phrases,
+                      shared_is_resume, profile, deadline):
+        """Full analysis of one pair, reusing the parsed documents and key phrases of the batch."""
+        if shared_is_resume:
+            resume_doc, resume_key_phrases, job_doc, job_key_phrases = (
+                shared_doc, shared_key_phrases, counterpart_doc, counterpart_key_phrases)
+        else:
+            resume_doc, resume_key_phrases, job_doc, job_key_phrases = (
+                counterpart_doc, counterpart_key_phrases, shared_doc, shared_key_phrases)
+        pipeline = self.build_analysis_pipeline(profile, deadline)
+        # Copies of the cached key phrases, which the analysis hands on to the caller
+        return pipeline.run(
+            resume_text=resume_doc.raw_text, job_desc_text=job_doc.raw_text,
+            resume_doc=resume_doc, job_doc=job_doc,
+            resume_key_phrases=list(resume_key_phrases), job_key_phrases=list(job_key_phrases)
+        )["result"]
+    
+    def _checked_key_phrases(self, key_phrases, document, deadline):
+        """
+        Record the key phrase stage as degraded when the service returned nothing
+        for a non-empty document, which is how a failed Azure call looks.
+        """
+        if not key_phrases and document.text.strip():
+            deadline.degrade("keyPhrases")
+        return key_phrases
+    
+    def _check_sentiment(self, sentiment_analysis, deadline):
+        """Record the sentiment stage as degraded when the Azure call failed."""
+        if sentiment_analysis is None:
+            deadline.degrade("sentiment")
+    
+    def build_analysis_pipeline(self, profile=None, deadline=None):
+        """
+        Build the analysis as a graph of stages. Independent stages, such as
+        the key phrase and sentiment calls for each document, run concurrently.
+        
+        Args:
+            profile (str, optional): Matching profile: 'fast', 'balanced' or 'accurate'
+            deadline (Deadline, optional): Time budget of the request
+            
+        Returns:
+            Pipeline: Stages taking the inputs resume_text and job_desc_text; the
+                'result' stage holds the same dictionary as analyze_resume_and_job_description
+        """
+        deadline = deadline or Deadline()
+        
+        # Skill matching runs as a cascade whose tiers depend on the profile
+        matcher = matching.SkillMatcher(profile, self.similarity_threshold, deadline)
+        
+        def extract_key_phrases(document):
+            # When short on time the local skill scan of the full text stands alone
+            if not deadline.allows("keyPhrases"):
+                return []
+            key_phrases = azure_language_client.extract_key_phrases(document.text, timeout=deadline.remaining_seconds())
+            return self._checked_key_phrases(key_phrases, document, deadline)
+        
+        def analyze_sentiment(resume_doc):
+            sentiment_analysis = None
+            if deadline.allows("sentiment"):
+                sentiment_analysis = azure_language_client.analyze_sentiment(
+                    resume_doc.text, timeout=deadline.remaining_seconds())
+                print("Sentiment Analysis Result from Azure:", sentiment_analysis)
+                self._check_sentiment(sentiment_analysis, deadline)
+            
+            # Ensure the sentiment analysis object has the expected structure
+            if not sentiment_analysis or not isinstance(sentiment_analysis, dict):
+                sentiment_analysis = {
+                    "sentiment": "neutral"
+                }
+            return sentiment_analysis
+        
+        def match_skills(technical_skills_in_job, technical_skills_in_resume, soft_skills_in_job, soft_skills_in_resume):
+            # Find keywords missing from the resume but present in the job description,
+            # and keywords in the resume that are not relevant to the job description
+            return {
+                "missing_technical_skills": matcher.find_unmatched(technical_skills_in_job, technical_skills_in_resume),
+                "missing_soft_skills": matcher.find_unmatched(soft_skills_in_job, soft_skills_in_resume),
+                "keywords_to_remove": matcher.find_unmatched(technical_skills_in_resume, technical_skills_in_job)
+            }
+        
+        def generate_content_suggestions(resume_doc, job_doc, technical_skills_in_resume, technical_skills_in_job,
+                                         skill_matches, soft_skills_in_resume, soft_skills_in_job, quality):
+            keywords_to_add = skill_matches["missing_technical_skills"] + skill_matches["missing_soft_skills"]
+            return self._generate_content_suggestions(
+                resume_doc, job_doc, 
+                technical_skills_in_resume, technical_skills_in_job,
+                keywords_to_add, soft_skills_in_resume, soft_skills_in_job,
+                use_semantic=matcher.profile.semantic, deadline=deadline, text_quality_result=quality
+            )
+        
+        def calculate_match_score(resume_doc, job_doc, technical_skills_in_resume, technical_skills_in_job,
+                                  soft_skills_in_resume, soft_skills_in_job, skill_matches):
+            # Runs after skill matching, whose comparisons the matcher has kept
+            return self._calculate_match_score(
+                resume_doc, job_doc,
+                technical_skills_in_resume, technical_skills_in_job,
+                soft_skills_in_resume, soft_skills_in_job, matcher
+            )
+        
+        def assemble_result(content_suggestions, match_score, skill_matches, sentiment_analysis,
+                            technical_skills_in_job, technical_skills_in_resume, soft_skills_in_job, soft_skills_in_resume):
+            return {
+                "keywordsToAdd": skill_matches["missing_technical_skills"] + skill_matches["missing_soft_skills"],
+                "keywordsToRemove": skill_matches["keywords_to_remove"],
+                "contentSuggestions": content_suggestions,
+                "matchScore": match_score,
+                "technicalSkillsMatch": {
+                    "inJob": technical_skills_in_job,
+                    "inResume": technical_skills_in_resume,
+                    "missing": skill_matches["missing_technical_skills"]
+                },
+                "softSkillsMatch": {
+                    "inJob": soft_skills_in_job,
+                    "inResume": soft_skills_in_resume,
+                    "missing": skill_matches["missing_soft_skills"]
+                },
+                "sentimentAnalysis": sentiment_analysis,
+                "matchingStats": matcher.stats(),
+                "degradedStages": deadline.degraded_stages
+            }
+        
+        skills = ["technical_skills_in_job", "technical_skills_in_resume", "soft_skills_in_job", "soft_skills_in_resume"]
+        pipeline = Pipeline()
+        # Parse each document once; every stage below works on these
+        pipeline.add("resume_doc", ParsedDocument, ["resume_text"])
+        pipeline.add("job_doc", ParsedDocument, ["job_desc_text"])
+        # Network calls to Azure Language Service overlap with each other and the local stages
+        pipeline.add("resume_key_phrases", extract_key_phrases, ["resume_doc"])
+        pipeline.add("job_key_phrases", extract_key_phrases, ["job_doc"])
+        pipeline.add("sentiment_analysis", analyze_sentiment, ["resume_doc"])
+        pipeline.add("text_quality", text_quality.analyze_text_quality, ["resume_doc"])
+        # Analyze the extracted key phrases for technical skills, and identify soft skills
+        pipeline.add("technical_skills_in_job", self._extract_technical_skills, ["job_key_phrases", "job_doc"])
+        pipeline.add("technical_skills_in_resume", self._extract_technical_skills, ["resume_key_phrases", "resume_doc"])
+        pipeline.add("soft_skills_in_job", self._extract_soft_skills, ["job_doc"])
+        pipeline.add("soft_skills_in_resume", self._extract_soft_skills, ["resume_doc"])
+        pipeline.add("skill_matches", match_skills, skills)
+        pipeline.add("content_suggestions", generate_content_suggestions, [
+            "resume_doc", "job_doc", "technical_skills_in_resume", "technical_skills_in_job",
+            "skill_matches", "soft_skills_in_resume", "soft_skills_in_job", "text_quality"])
+        pipeline.add("match_score", calculate_match_score, [
+            "resume_doc", "job_doc", "technical_skills_in_resume", "technical_skills_in_job",
+            "soft_skills_in_resume", "soft_skills_in_job", "skill_matches"])
+        pipeline.add("result", assemble_result, [
+            "content_suggestions", "match_score", "skill_matches", "sentiment_analysis"] + skills)
+        return pipeline
+    
     def _generate_error_response(self, resume_text, job_desc_text):
         """Generate an error response when text extraction fails"""
         error_messages = []
@@ -223,287 +901,98 @@ class ResumeAnalyzer:
             }
         }
     
-    def _extract_technical_skills(self, key_phrases, full_text):
+    def _extract_technical_skills(self, key_phrases, document):
         """
         Extract technical skills from key phrases and full text.
         
         Args:
             key_phrases (list): List of key phrases extracted from text
-            full_text (str): The full text content
+            document (ParsedDocument or str): The full document
             
         Returns:
             list: A list of identified technical skills
         """
-        # Expanded list of common technical skills by domain/category
-        tech_skills_database = {
-            "programming_languages": [
-                'python', 'java', 'javascript', 'js', 'typescript', 'ts', 'c#', 'c++', 'c', 'go', 'golang',
-                'ruby', 'scala', 'kotlin', 'swift', 'objective-c', 'php', 'perl', 'r', 'matlab', 'rust', 
-                'dart', 'haskell', 'groovy', 'bash', 'powershell', 'lua', 'cobol', 'fortran'
-            ],
-            
-            "web_tech": [
-                'html', 'css', 'sass', 'less', 'bootstrap', 'tailwind', 'material ui', 'responsive design',
-                'rest', 'restful', 'graphql', 'soap', 'ajax', 'json', 'xml', 'jwt', 'oauth', 'ssr', 'webpack',
-                'babel', 'styled-components', 'css modules', 'cors', 'grpc', 'http', 'https', 'sse', 'websocket'
-            ],
-            
-            "frontend_frameworks": [
-                'react', 'reactjs', 'angular', 'angularjs', 'vue', 'vuejs', 'redux', 'svelte', 'next.js',
-                'nuxt.js', 'gatsby', 'ember', 'jquery', 'backbone.js', 'lit', 'solid.js'
-            ],
-            
-            "backend_frameworks": [
-                'express', 'django', 'flask', 'spring', 'spring boot', 'rails', 'ruby on rails', 'asp.net',
-                'laravel', 'symfony', 'fastapi', 'nest.js', 'gin', 'phoenix', 'play', 'quarkus', 'sails.js',
-                'strapi', 'meteor'
-            ],
-            
-            "mobile": [
-                'android', 'ios', 'swift', 'flutter', 'react native', 'xamarin', 'ionic', 'kotlin', 'swiftui',
-                'uikit', 'jetpack compose', 'android studio', 'xcode', 'objective-c', 'mobile development'
-            ],
-            
-            "databases": [
-                'sql', 'mysql', 'postgresql', 'oracle', 'mongodb', 'cassandra', 'redis', 'sqlite',
-                'dynamodb', 'couchdb', 'firebase', 'neo4j', 'elasticsearch', 'mariadb', 'cosmosdb',
-                'nosql', 'rdbms', 'sql server', 'mssql', 'oledb', 'jdbc', 'odbc', 'erd'
-            ],
-            
-            "cloud_providers": [
-                'aws', 'amazon web services', 'azure', 'microsoft azure', 'gcp', 'google cloud', 'heroku',
-                'digital ocean', 'ibm cloud', 'openstack', 'alibaba cloud', 'tencent cloud', 'oracle cloud',
-                'linode', 'cloudflare'
-            ],
-            
-            "devops": [
-                'docker', 'kubernetes', 'k8s', 'terraform', 'jenkins', 'github actions', 'gitlab ci',
-                'circleci', 'travis ci', 'ansible', 'puppet', 'chef', 'ci/cd', 'github', 'gitlab',
-                'bitbucket', 'prometheus', 'grafana', 'elk', 'istio', 'helm', 'openshift'
-            ],
-            
-            "data_science": [
-                'pandas', 'numpy', 'scikit-learn', 'scipy', 'matplotlib', 'tensorflow', 'pytorch', 'keras',
-                'machine learning', 'ml', 'deep learning', 'dl', 'neural networks', 'cnn', 'rnn', 'lstm',
-                'computer vision', 'cv', 'nlp', 'natural language processing', 'ai', 'artificial intelligence',
-                'data mining', 'big data', 'spark', 'hadoop', 'mapreduce', 'tableau', 'power bi'
-            ],
-            
-            "version_control": [
-                'git', 'github', 'gitlab', 'bitbucket', 'svn', 'subversion', 'mercurial', 'git flow',
-                'version control'
-            ],
-            
-            "methodologies": [
-                'agile', 'scrum', 'kanban', 'waterfall', 'tdd', 'bdd', 'xp', 'lean', 'devops',
-                'ci/cd', 'sre', 'site reliability engineering', 'itil'
-            ],
-            
-            "tools": [
-                'vscode', 'visual studio', 'intellij', 'pycharm', 'eclipse', 'atom', 'sublime text',
-                'notepad++', 'postman', 'insomnia', 'jira', 'confluence', 'slack', 'trello', 'notion',
-                'figma', 'sketch', 'adobe xd', 'photoshop', 'illustrator'
-            ]
-        }
+        document = ParsedDocument.of(document)
+        lexicon = get_lexicon()
+        scanner = lexicon.skill_scanner
         
-        # Combine all categories for a flat list
-        common_tech_skills = []
-        for category, skills in tech_skills_database.items():
-            common_tech_skills.extend(skills)
-
-        # Extract potential technical skills from key phrases
-        tech_skills = []
-        
-        # Add common tech skills found in the key phrases or text
-        for skill in common_tech_skills:
-            # Look for the skill as a standalone word or part of a phrase
-            pattern = r'\b' + re.escape(skill) + r'\b'
-            if (any(re.search(pattern, phrase, re.IGNORECASE) for phrase in key_phrases) or
-                re.search(pattern, full_text, re.IGNORECASE)):
-                # Add the skill if it's not already in the list
-                if skill not in [s.lower() for s in tech_skills]:
-                    tech_skills.append(skill)
+        # Find every vocabulary skill in the key phrases and the full text in one pass.
+        # Newlines keep matches from spanning two key phrases.
+        found_skills = scanner.find_skills("\n".join([phrase.lower() for phrase in key_phrases] + [document.lower]),
+                                           is_lower=True)
+        tech_skills = [skill for skill in scanner.skills if skill in found_skills]
+        seen = set(tech_skills)
         
         # Extract multi-word technical skills from key phrases
         for phrase in key_phrases:
             words = phrase.lower().split()
             # If the phrase contains technical keywords, add it
-            tech_keywords = ['software', 'developer', 'engineer', 'programming', 'development',
-                            'system', 'database', 'web', 'mobile', 'cloud', 'data', 'network',
-                            'security', 'fullstack', 'frontend', 'backend', 'devops', 'architecture',
-                            'api', 'service', 'infrastructure', 'platform', 'framework', 'library',
-                            'stack', 'design', 'coding', 'script', 'app', 'application', 'server',
-                            'client', 'interface', 'orm', 'repository', 'module', 'package', 'dependency']
-            
-            if any(keyword in words for keyword in tech_keywords) and 2 <= len(words) <= 5:
-                if phrase not in tech_skills:
+            if 2 <= len(words) <= 5 and any(word in lexicon.tech_keywords for word in words):
+                if phrase not in seen:
                     tech_skills.append(phrase)
+                    seen.add(phrase)
         
         # Look for common technology patterns
-        tech_patterns = [
-            # Databases with specific versions or contexts
-            r'(my|postgre|ms)sql( server)?( \d+)?',
-            # Cloud services
-            r'(aws|azure|gcp)( lambda| ec2| s3| rds| redshift| ecs| eks| vm| functions)?',
-            # Languages with versions
-            r'(python|java|php|ruby)( \d+(\.\d+)*)?',
-            # Frameworks with versions
-            r'(react|angular|vue|django|spring|rails)( js)?( \d+(\.\d+)*)?',
-            # Containerization technologies
-            r'(docker|kubernetes|k8s|openshift)( swarm| compose| container)?',
-            # Methodologies and practices
-            r'(agile|scrum|kanban|waterfall)( methodology)?',
-            # Testing frameworks
-            r'(junit|pytest|jest|mocha|chai|jasmine|selenium|cypress|testng)',
-            # DevOps tools
-            r'(jenkins|github actions|gitlab ci|circleci|travis)'
-        ]
-        
-        for pattern in tech_patterns:
-            for match in re.finditer(pattern, full_text.lower()):
-                skill = match.group(0).strip()
-                if skill and skill not in tech_skills:
-                    tech_skills.append(skill)
+        for match in lexicon.tech_pattern.finditer(document.lower):
+            skill = match.group(0).strip()
+            if skill and skill not in seen:
+                tech_skills.append(skill)
+                seen.add(skill)
         
         return tech_skills
     
-    def _extract_soft_skills(self, text):
+    def _extract_soft_skills(self, document):
         """
         Extract soft skills from text.
         
         Args:
-            text (str): The text to analyze
+            document (ParsedDocument or str): The document to analyze
             
         Returns:
             list: A list of identified soft skills
         """
-        common_soft_skills = [
-            'leadership', 'teamwork', 'communication', 'problem solving', 'problem-solving',
-            'critical thinking', 'time management', 'creativity', 'adaptability', 'flexibility',
-            'organization', 'organizational', 'attention to detail', 'interpersonal',
-            'collaboration', 'team player', 'multitasking', 'decision making', 'decision-making',
-            'conflict resolution', 'emotional intelligence', 'negotiation', 'persuasion', 'presentation',
-            'customer service', 'work ethic', 'self-motivated', 'self motivated', 'proactive', 'initiative',
-            'analytical', 'research', 'resourceful', 'planning', 'mentoring', 'coaching', 'innovative',
-            'strategic thinking', 'project management', 'agile'
-        ]
-        
-        text_lower = text.lower()
+        text_lower = ParsedDocument.of(document).lower
         found_skills = []
         
-        for skill in common_soft_skills:
-            if skill in text_lower or skill.replace('-', ' ') in text_lower:
+        for skill, spaced_skill in get_lexicon().soft_skill_forms:
+            if skill in text_lower or spaced_skill in text_lower:
                 found_skills.append(skill)
         
         return found_skills
     
-    def _has_similar_term(self, term, term_list, threshold=None, is_tech_skill=True):
-        """
-        Check if a term has a similar match in the term list using contextual similarity.
-        
-        Args:
-            term (str): The term to check
-            term_list (list): The list of terms to check against
-            threshold (float, optional): The similarity threshold. Defaults to the class threshold.
-            is_tech_skill (bool): Whether this is a technical skill comparison
-            
-        Returns:
-            bool: True if a similar term is found, False otherwise
-        """
-        if threshold is None:
-            threshold = self.similarity_threshold
-        
-        term_lower = term.lower()
-        
-        # Check for exact matches first (fastest check)
-        if term_lower in [t.lower() for t in term_list]:
-            return True
-        
-        # Check if the term is a substring of any term in the list (still fast)
-        for list_term in term_list:
-            list_term_lower = list_term.lower()
-            if term_lower in list_term_lower or list_term_lower in term_lower:
-                # If one is a substring of the other, check if they're close enough in length
-                if len(min(term_lower, list_term_lower, key=len)) / len(max(term_lower, list_term_lower, key=len)) > threshold:
-                    return True
-        
-        # Use enhanced similarity check for technical skills
-        for list_term in term_list:
-            # Calculate contextual similarity using improved method
-            similarity = azure_language_client.calculate_text_similarity(term, list_term, is_tech_skill=is_tech_skill)
-            if similarity > threshold:
-                return True
-        
-        return False
-    
-    def _identify_irrelevant_keywords(self, resume_skills, job_skills, job_desc_text):
-        """
-        Identify potentially irrelevant or outdated keywords in the resume.
-        
-        Args:
-            resume_skills (list): Technical skills found in the resume
-            job_skills (list): Technical skills found in the job description
-            job_desc_text (str): The full text of the job description
-            
-        Returns:
-            list: List of potentially irrelevant keywords
-        """
-        irrelevant_keywords = []
-        
-        # List of potentially outdated technologies
-        outdated_technologies = [
-            'jquery', 'flash', 'actionscript', 'silverlight', 'cobol', 'fortran',
-            'pascal', 'vbscript', 'delphi', 'foxpro', 'coffeescript', 'svn', 'cvs'
-        ]
-        
-        for skill in resume_skills:
-            skill_lower = skill.lower()
-            
-            # Check if skill is outdated
-            if skill_lower in outdated_technologies:
-                irrelevant_keywords.append(skill)
-                continue
-            
-            # Check if skill is not mentioned in job description and not similar to any job skill
-            if not self._has_similar_term(skill, job_skills) and skill_lower not in job_desc_text.lower():
-                # For short skills (1-2 words), they might be less relevant if not in job description
-                if len(skill.split()) <= 2:
-                    irrelevant_keywords.append(skill)
-        
-        return irrelevant_keywords
-    
-    def _generate_content_suggestions(self, resume_text, job_desc_text, resume_skills, job_skills, keywords_to_add):
+    def _generate_content_suggestions(self, resume_doc, job_doc, resume_skills, job_skills, keywords_to_add,
+                                      resume_soft_skills=None, job_soft_skills=None, use_semantic=True,
+                                      deadline=None, text_quality_result=None):
         """
         Generate content suggestions for the resume using pretrained language models.
         
         Args:
-            resume_text (str): The text content of the resume
-            job_desc_text (str): The text content of the job description
+            resume_doc (ParsedDocument or str): The resume
+            job_doc (ParsedDocument or str): The job description
             resume_skills (list): The skills found in the resume
             job_skills (list): The skills found in the job description
             keywords_to_add (list): The keywords to add to the resume
+            resume_soft_skills (list, optional): Soft skills already found in the resume
+            job_soft_skills (list, optional): Soft skills already found in the job description
+            use_semantic (bool): Run the checks that need model inference
+            deadline (Deadline, optional): Time budget; model checks are skipped when it runs short
+            text_quality_result (dict, optional): Text quality of the resume, if already analyzed
             
         Returns:
             list: A list of content suggestions
         """
         suggestions = []
+        deadline = deadline or Deadline()
+        resume_doc = ParsedDocument.of(resume_doc)
+        job_doc = ParsedDocument.of(job_doc)
         
         try:
-            # Use Azure Language Service to generate more sophisticated content suggestions
-            # This now leverages the pre-trained models through Azure services
-            
-            # First, analyze the resume and job description for key information
-            resume_phrases = azure_language_client.extract_key_phrases(resume_text)
-            job_phrases = azure_language_client.extract_key_phrases(job_desc_text)
-            
             # Use text similarity to find missing important content
             relevant_achievements = []
             achievements_context = "achievements accomplishments results impact outcomes success metrics"
             
             # Check if resume seems achievement-oriented using semantic analysis
-            has_achievements = azure_language_client.calculate_text_similarity(resume_text, achievements_context) > 0.3
-            
-            if not has_achievements:
+            if use_semantic and deadline.allows("contentSemantics") and azure_language_client.calculate_text_similarity(resume_doc.text, achievements_context, long_text=True) <= 0.3:
                 suggestions.append("Your resume lacks achievement-oriented language. Add quantifiable results and outcomes for your experiences.")
             
             # Add specific suggestions based on missing keywords
@@ -513,18 +1002,18 @@ class ResumeAnalyzer:
                 
                 for keyword in top_keywords:
                     # Generate a context-aware suggestion using content from both resume and job description
-                    if keyword in job_desc_text.lower():
+                    if keyword in job_doc.lower:
                         # Find surrounding context for this keyword in job description
-                        keyword_index = job_desc_text.lower().find(keyword.lower())
+                        keyword_index = job_doc.lower.find(keyword.lower())
                         start_index = max(0, keyword_index - 100)
-                        end_index = min(len(job_desc_text), keyword_index + 100)
-                        keyword_context = job_desc_text[start_index:end_index]
+                        end_index = min(len(job_doc.text), keyword_index + 100)
+                        keyword_context = job_doc.text[start_index:end_index]
                         
                         # Use language model to generate personalized suggestion
                         suggestions.append(f"Add details about your experience with '{keyword}'. The job description specifically mentions this skill in the context of: '{keyword_context.strip()}'")
             
-            # Check for active vs. passive voice using language analysis
-            result = azure_language_client.analyze_text_quality(resume_text)
+            # Check for active vs. passive voice with the local text-quality engine
+            result = text_quality_result or text_quality.analyze_text_quality(resume_doc)
             
             # Suggest stronger action verbs if needed
             if result.get('passive_voice_ratio', 0) > 0.3:  # If more than 30% is passive voice
@@ -537,15 +1026,22 @@ class ResumeAnalyzer:
                         suggestions.append(f"Replace passive phrase '{example['original']}' with active alternative like '{example['suggestion']}'")
             
             # Suggest more impactful statements for experience sections
-            experience_section = self._extract_section(resume_text, ["experience", "work experience", "employment"])
-            if experience_section:
-                impact_score = azure_language_client.calculate_text_similarity(experience_section, "achieved improved increased decreased launched created managed led")
+            experience_section = self._extract_section(resume_doc, ["experience", "work experience", "employment"])
+            if experience_section and use_semantic and deadline.allows("contentSemantics"):
+                impact_score = azure_language_client.calculate_text_similarity(
+                    experience_section, "achieved improved increased decreased launched created managed led",
+                    long_text=True
+                )
                 if impact_score < 0.4:
                     suggestions.append("Enhance your experience descriptions with more impactful action verbs like 'achieved', 'improved', 'increased', 'launched' or 'led'.")
             
             # Check for specific qualities mentioned in the job but missing in the resume
-            job_qualities = set(self._extract_soft_skills(job_desc_text))
-            resume_qualities = set(self._extract_soft_skills(resume_text))
+            if job_soft_skills is None:
+                job_soft_skills = self._extract_soft_skills(job_doc)
+            if resume_soft_skills is None:
+                resume_soft_skills = self._extract_soft_skills(resume_doc)
+            job_qualities = set(job_soft_skills)
+            resume_qualities = set(resume_soft_skills)
             missing_qualities = job_qualities - resume_qualities
             
             if missing_qualities:
@@ -572,54 +1068,43 @@ class ResumeAnalyzer:
         
         return suggestions
     
-    def _extract_section(self, text, section_names):
+    def _extract_section(self, document, section_names):
         """
         Extract a specific section from resume text.
         
         Args:
-            text (str): The resume text
+            document (ParsedDocument or str): The resume
             section_names (list): Possible names of the section to extract
             
         Returns:
             str: The extracted section text, or empty string if not found
         """
-        for section_name in section_names:
-            # Various formatting patterns for section headers
-            patterns = [
-                fr'\b{section_name}\s*:?\s*\n(.*?)(?:\n\s*\n|\n\s*[A-Z]|\Z)',
-                fr'\b{section_name.upper()}\s*:?\s*\n(.*?)(?:\n\s*\n|\n\s*[A-Z]|\Z)',
-                fr'\b{section_name.title()}\s*:?\s*\n(.*?)(?:\n\s*\n|\n\s*[A-Z]|\Z)'
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, text, re.DOTALL | re.IGNORECASE)
-                if match:
-                    return match.group(1).strip()
-        
-        return ""
+        return ParsedDocument.of(document).section(section_names)
     
-    def _calculate_match_score(self, resume_text, job_desc_text, resume_tech_skills, job_tech_skills, 
-                             resume_soft_skills, job_soft_skills):
+    def _calculate_match_score(self, resume_doc, job_doc, resume_tech_skills, job_tech_skills, 
+                             resume_soft_skills, job_soft_skills, matcher=None):
         """
         Calculate a match score between resume and job description.
         
         Args:
-            resume_text (str): The text content of the resume
-            job_desc_text (str): The text content of the job description
+            resume_doc (ParsedDocument or str): The resume
+            job_doc (ParsedDocument or str): The job description
             resume_tech_skills (list): Technical skills from the resume
             job_tech_skills (list): Technical skills from the job description
             resume_soft_skills (list): Soft skills from the resume
             job_soft_skills (list): Soft skills from the job description
+            matcher (SkillMatcher, optional): The matching cascade. Defaults to the default profile.
             
         Returns:
             int: A match score from 0-100
         """
         score_components = []
+        if matcher is None:
+            matcher = matching.SkillMatcher(threshold=self.similarity_threshold)
         
         # 1. Technical skills match (50% of total score)
         if job_tech_skills:
-            tech_matches = sum(1 for skill in job_tech_skills 
-                             if self._has_similar_term(skill, resume_tech_skills))
+            tech_matches = len(job_tech_skills) - len(matcher.find_unmatched(job_tech_skills, resume_tech_skills))
             tech_score = min(100, int((tech_matches / len(job_tech_skills)) * 100))
             score_components.append(tech_score * 0.5)
         else:
@@ -627,26 +1112,16 @@ class ResumeAnalyzer:
         
         # 2. Soft skills match (20% of total score)
         if job_soft_skills:
-            soft_matches = sum(1 for skill in job_soft_skills 
-                             if self._has_similar_term(skill, resume_soft_skills))
+            soft_matches = len(job_soft_skills) - len(matcher.find_unmatched(job_soft_skills, resume_soft_skills))
             soft_score = min(100, int((soft_matches / len(job_soft_skills)) * 100))
             score_components.append(soft_score * 0.2)
         else:
             score_components.append(20)  # Default if no soft skills found
         
         # 3. Overall text similarity (30% of total score)
-        # Calculate Jaccard similarity between the job description and resume
-        job_words = set(re.findall(r'\b\w+\b', job_desc_text.lower()))
-        resume_words = set(re.findall(r'\b\w+\b', resume_text.lower()))
-        
-        intersection = len(job_words.intersection(resume_words))
-        union = len(job_words.union(resume_words))
-        
-        if union > 0:
-            jaccard_similarity = (intersection / union) * 100
-            score_components.append(min(100, int(jaccard_similarity)) * 0.3)
-        else:
-            score_components.append(0)
+        # TF-IDF cosine similarity, so rare terms such as skills outweigh common words
+        text_similarity = tfidf.tfidf_similarity(resume_doc, job_doc) * 100
+        score_components.append(min(100, int(text_similarity)) * 0.3)
         
         # Calculate the final score and ensure it's between 0 and 100
         final_score = min(100, max(0, int(sum(score_components))))
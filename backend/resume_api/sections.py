@@ -0,0 +1,59 @@
+import re
+
+# One line of text with its offsets, without the line break
+_LINE = re.compile(r'^.*$', re.MULTILINE)
+# Bullets, numbering and markdown decoration around a heading
+_DECORATION = ' \t#*-_=\u2022>|.0123456789'
+# Headings are short; longer lines are never checked against the aliases
+MAX_HEADING_LENGTH = 60
+
+
+def _heading(line, section_aliases):
+    """
+    Get the section a line introduces and where its inline content starts.
+
+    Returns:
+        tuple: (section name, offset of the body within the line), or None
+    """
+    title, colon, _ = line.partition(':')
+    if len(title) > MAX_HEADING_LENGTH:
+        return None
+    section = section_aliases.get(title.strip(_DECORATION).lower())
+    if section is None:
+        return None
+    # 'Skills: Python, Django' keeps the text after the colon as the start of the body
+    return section, len(title) + len(colon) if colon else len(line)
+
+
+def segment_sections(text, section_aliases):
+    """
+    Split a document into sections with one pass over its lines.
+
+    A line is a heading when its text, ignoring bullets, markdown decoration
+    and a trailing colon, is a known section alias. Each section runs from the
+    end of its heading to the next heading or the end of the document. When a
+    section appears twice, the first occurrence is kept.
+
+    Args:
+        text (str): The document text
+        section_aliases (Mapping): Lower-cased heading -> section name
+
+    Returns:
+        dict: Section name -> (start, end) offsets of the section body
+    """
+    sections = {}
+    current = None
+    body_start = 0
+
+    for match in _LINE.finditer(text):
+        heading = _heading(match.group(0), section_aliases)
+        if heading is None:
+            continue
+        if current is not None:
+            sections.setdefault(current, (body_start, match.start()))
+        current, offset = heading
+        body_start = match.start() + offset
+
+    if current is not None:
+        sections.setdefault(current, (body_start, len(text)))
+    return sections
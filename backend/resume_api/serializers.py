@@ -34,4 +34,6 @@ class ResumeAnalysisResultSerializer(serializers.Serializer):
     contentSuggestions = serializers.ListField(child=serializers.CharField())
     matchScore = serializers.IntegerField()
     technicalSkillsMatch = serializers.DictField(required=False)
-    softSkillsMatch = serializers.DictField(required=False) 
\ No newline at end of file
+    softSkillsMatch = serializers.DictField(required=False)
+    matchingStats = serializers.DictField(required=False)
+    degradedStages = serializers.ListField(child=serializers.CharField(), required=False) 
\ No newline at end of file
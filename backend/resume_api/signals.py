@@ -0,0 +1,108 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connection, transaction
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Resume, JobDescription
+from . import tfidf
+from . import job_index
+from . import feature_store
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_update_executor():
+    """
+    Get the process-wide thread applying saved and deleted documents to the
+    TF-IDF statistics and the job index, created on first use. A single thread
+    applies the changes in the order they were committed.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="document-updates")
+    return _executor
+
+
+def _apply_in_background(func, *args):
+    try:
+        func(*args)
+    except Exception as e:
+        print(f"Error applying document change: {str(e)}")
+    finally:
+        # The worker thread outlives requests, so nothing else closes its connection
+        connection.close()
+
+
+def _schedule(func, *args):
+    # After the commit, so nothing is applied for a rolled back save
+    transaction.on_commit(lambda: get_update_executor().submit(_apply_in_background, func, *args))
+
+
+def _record_term_change(previous_content, content, document_delta):
+    tfidf.record_document_change(
+        tfidf.document_terms(previous_content) if previous_content else set(),
+        tfidf.document_terms(content) if content else set(),
+        document_delta=document_delta
+    )
+
+
+@receiver(pre_save, sender=Resume)
+@receiver(pre_save, sender=JobDescription)
+def remember_previous_content(sender, instance, raw=False, update_fields=None, **kwargs):
+    """Keep the stored content so an edit only updates the difference."""
+    instance._previous_content = ""
+    if raw or instance.pk is None or (update_fields is not None and 'content' not in update_fields):
+        return
+    previous_content = getattr(instance, '_loaded_content', None)
+    if previous_content is None:
+        # Loaded without its content, or not loaded at all, e.g. given a primary key by hand
+        previous_content = sender.objects.filter(pk=instance.pk).values_list('content', flat=True).first()
+    instance._previous_content = previous_content or ""
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_save, sender=JobDescription)
+def update_term_statistics(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """Apply a new or edited document to the TF-IDF corpus statistics once it is committed."""
+    if raw or (update_fields is not None and 'content' not in update_fields):
+        return
+    previous_content = "" if created else getattr(instance, '_previous_content', "")
+    content = instance.content or ""
+    # The next save of this instance compares against what is stored now
+    instance._loaded_content = content
+    if created or previous_content != content:
+        _schedule(_record_term_change, previous_content, content, 1 if created else 0)
+
+
+@receiver(post_delete, sender=Resume)
+@receiver(post_delete, sender=JobDescription)
+def remove_term_statistics(sender, instance, **kwargs):
+    """Remove a deleted document from the TF-IDF corpus statistics once the deletion is committed."""
+    _schedule(_record_term_change, instance.content or "", "", -1)
+
+
+@receiver(post_save, sender=JobDescription)
+def index_job_description(sender, instance, raw=False, **kwargs):
+    """Keep the job ranking index in step with saved job descriptions."""
+    if raw:
+        return
+    _schedule(job_index.record_job_change, instance.pk, instance.user_id, instance.content or "", instance.updated_at)
+
+
+@receiver(post_delete, sender=JobDescription)
+def unindex_job_description(sender, instance, **kwargs):
+    _schedule(job_index.record_job_removal, instance.pk)
+
+
+@receiver(post_save, sender=Resume)
+@receiver(post_save, sender=JobDescription)
+def precompute_document_features(sender, instance, raw=False, **kwargs):
+    """Derive the features of a saved document in the background, ahead of its analyses."""
+    if raw:
+        return
+    feature_store.schedule_precompute(instance.content or "")
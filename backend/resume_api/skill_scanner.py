@@ -0,0 +1,113 @@
+from collections import deque, namedtuple
+
+# A skill occurrence; start/end are offsets into the lower-cased text
+SkillMatch = namedtuple("SkillMatch", ["skill", "start", "end", "categories"])
+
+
+def _is_word_char(char):
+    return char.isalnum() or char == "_"
+
+
+class SkillScanner:
+    """
+    Aho-Corasick automaton over a skill vocabulary.
+
+    Built once from the vocabulary, it finds every occurrence of every skill
+    (including overlapping ones such as "spring" inside "spring boot") in a
+    single linear pass over the text. A match must not continue a word: if a
+    skill starts or ends with a letter or digit, the neighbouring character
+    must not be one.
+    """
+
+    def __init__(self, vocabulary):
+        """
+        Args:
+            vocabulary (dict): Category name -> list of skills
+        """
+        self.categories = {}
+        for category, skills in vocabulary.items():
+            for skill in skills:
+                self.categories.setdefault(skill.lower(), []).append(category)
+        # Skills in vocabulary order, without duplicates
+        self.skills = list(self.categories)
+        self.categories = {skill: tuple(categories) for skill, categories in self.categories.items()}
+
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        self._build()
+
+    def _build(self):
+        for skill in self.skills:
+            state = 0
+            for char in skill:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                state = next_state
+            self._output[state].append(skill)
+
+        # Breadth-first pass to set failure links and merge outputs of suffix states
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def scan(self, text, is_lower=False):
+        """
+        Find every skill occurrence in the text in one pass.
+
+        Args:
+            text (str): The text to scan
+            is_lower (bool): The text is already lower-cased
+
+        Returns:
+            list: SkillMatch tuples in order of their end offset
+        """
+        if not is_lower:
+            text = text.lower()
+        goto, fail, output = self._goto, self._fail, self._output
+        length = len(text)
+        matches = []
+        state = 0
+
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            for skill in output[state]:
+                end = position + 1
+                start = end - len(skill)
+                if _is_word_char(skill[0]) and start > 0 and _is_word_char(text[start - 1]):
+                    continue
+                if _is_word_char(skill[-1]) and end < length and _is_word_char(text[end]):
+                    continue
+                matches.append(SkillMatch(skill, start, end, self.categories[skill]))
+
+        return matches
+
+    def find_skills(self, text, is_lower=False):
+        """
+        Get the distinct skills present in the text.
+
+        Args:
+            text (str): The text to scan
+            is_lower (bool): The text is already lower-cased
+
+        Returns:
+            set: Skills found at least once
+        """
+        return {match.skill for match in self.scan(text, is_lower)}
@@ -0,0 +1,159 @@
+import os
+import threading
+
+from .ann_index import IVFIndex
+from . import azure_language_client
+from . import feature_cache
+
+# Where the canonical skill vocabulary index is persisted (manage.py build_skill_index)
+SKILL_INDEX_PATH = os.getenv(
+    "SKILL_INDEX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "ml_models", "skill_index.npz")
+)
+# Term lists at least this long are narrowed through the canonical skill index instead of scanned in full
+ANN_MIN_TERMS = int(os.getenv("SKILL_ANN_MIN_TERMS", "200"))
+
+
+class SkillVocabularyIndex:
+    """
+    Maps arbitrary phrases to their nearest canonical skills using an ANN
+    index over skill embeddings.
+    """
+
+    def __init__(self, index=None):
+        self.index = index or IVFIndex()
+        self._known = set(self.index.labels)
+        if not len(self.index):
+            # A new index holds whatever the loaded model embeds into it
+            self.index.metadata["embeddingsVersion"] = feature_cache.embeddings_version()
+
+    def __len__(self):
+        return len(self.index)
+
+    def add_skills(self, skills, batch_size=64):
+        """
+        Embed and insert skills that are not in the index yet.
+
+        Args:
+            skills (list): Canonical skill names
+            batch_size (int): Number of skills embedded per forward pass
+
+        Returns:
+            int: Number of skills added
+        """
+        new_skills = [skill for skill in dict.fromkeys(skills) if skill not in self._known]
+        for i in range(0, len(new_skills), batch_size):
+            batch = new_skills[i:i + batch_size]
+            self.index.add(batch, azure_language_client.get_bert_embeddings(batch))
+        self._known.update(new_skills)
+        return len(new_skills)
+
+    def top_k(self, phrase, k=5):
+        """
+        Find the canonical skills closest to a phrase.
+
+        Args:
+            phrase (str): Any skill phrase, e.g. "building REST services"
+            k (int): Number of skills to return
+
+        Returns:
+            list: (skill, cosine similarity) tuples, best first
+        """
+        return self.index.search(azure_language_client.get_bert_embedding(phrase), k)
+
+    def nearest_skills(self, phrases, k=5):
+        """
+        Map several phrases to their nearest canonical skills, embedding them in one batch.
+
+        Args:
+            phrases (list): Skill phrases
+            k (int): Number of skills per phrase
+
+        Returns:
+            list: For each phrase, its k nearest canonical skills, best first
+        """
+        if not phrases:
+            return []
+        vectors = azure_language_client.get_bert_embeddings(phrases)
+        return [[skill for skill, _ in self.index.search(vector, k)] for vector in vectors]
+
+    @property
+    def embeddings_version(self):
+        """Model and backend the skills were embedded with, None for indexes saved without it."""
+        return self.index.metadata.get("embeddingsVersion")
+
+    def is_current(self):
+        """Whether the skill vectors are comparable with the embeddings of the loaded model."""
+        return self.embeddings_version == feature_cache.embeddings_version()
+
+    def rebuilt(self):
+        """
+        Embed the same skills again with the loaded model, e.g. after the model or backend changed.
+
+        Returns:
+            SkillVocabularyIndex: A new index with the same skills and index settings
+        """
+        fresh = SkillVocabularyIndex(IVFIndex(
+            n_lists=self.index.n_lists, n_probe=self.index.n_probe, min_train_size=self.index.min_train_size))
+        fresh.add_skills(self.index.labels)
+        return fresh
+
+    def save(self, path=SKILL_INDEX_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Written aside and moved into place, as several workers may rebuild the same file
+        temp_path = f"{path}.{os.getpid()}.tmp.npz"
+        self.index.save(temp_path)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path=SKILL_INDEX_PATH):
+        return cls(IVFIndex.load(path))
+
+
+_vocabulary_index = None
+_rebuilding = False
+_load_lock = threading.Lock()
+
+
+def get_vocabulary_index():
+    """
+    Get the persisted canonical skill index, loading it on first use.
+
+    An index embedded with another model or backend is discarded: its skills
+    are embedded again in the background and the index saved, and until that
+    finishes callers get None and scan exactly.
+
+    Returns:
+        SkillVocabularyIndex: The index, or None if it has not been built
+    """
+    global _vocabulary_index, _rebuilding
+    if _vocabulary_index is not None or _rebuilding or not os.path.exists(SKILL_INDEX_PATH):
+        return _vocabulary_index
+    with _load_lock:
+        if _vocabulary_index is None and not _rebuilding:
+            try:
+                index = SkillVocabularyIndex.load(SKILL_INDEX_PATH)
+            except Exception as e:
+                print(f"Error loading skill index: {str(e)}")
+                return None
+            if index.is_current():
+                _vocabulary_index = index
+            else:
+                print(f"Skill index was embedded with {index.embeddings_version}, "
+                      f"not {feature_cache.embeddings_version()}; rebuilding it")
+                _rebuilding = True
+                threading.Thread(target=_rebuild, args=(index,), name="skill-index-rebuild", daemon=True).start()
+    return _vocabulary_index
+
+
+def _rebuild(stale):
+    global _vocabulary_index, _rebuilding
+    try:
+        index = stale.rebuilt()
+        index.save(SKILL_INDEX_PATH)
+        _vocabulary_index = index
+        _rebuilding = False
+    except Exception as e:
+        # Left marked as rebuilding, so matching keeps scanning exactly instead of retrying on every call
+        print(f"Error rebuilding skill index: {str(e)}")
+
@@ -1,3 +1,905 @@
-from django.test import TestCase
+import os
+import json
+import asyncio
+import tempfile
+import threading
+import time
+import unittest
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from . import (
+    admission, embeddings, feature_cache, job_index, jobs, lexicon, result_cache, signals,
+    skill_vocabulary, text_quality, tfidf,
+)
+from .admission import AdmissionPool, Overloaded, ReleasingIterator
+from .budget import STAGE_COST_MS, Deadline, parse_budget
+from .inference_worker import InferenceWorker
+from .loop_resources import get_loop_resource
+from .matching import get_profile
+from .models import AnalysisJob, AnalysisResult, IdempotencyRecord, JobDescription, Resume, TermStatistic
+from .pipeline import Pipeline
+from .resume_analyzer import ResumeAnalyzer
+from .sections import segment_sections
+from .skill_scanner import SkillScanner
+from .views import _saved_document
+
+
+class AdmissionPoolTests(SimpleTestCase):
+    """Queueing, rejection and release paths of the admission pools."""
+
+    def test_rejects_when_queue_is_full(self):
+        pool = AdmissionPool("test", limit=1, queue_size=0, queue_timeout_ms=1000)
+        with pool.acquire():
+            with self.assertRaises(Overloaded) as raised:
+                pool.acquire()
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+        self.assertEqual(pool.metrics()["rejected"], 1)
+        self.assertEqual(pool.metrics()["active"], 0)
+
+    def test_queue_timeout(self):
+        pool = AdmissionPool("test", limit=1, queue_size=1, queue_timeout_ms=50)
+        with pool.acquire():
+            start = time.monotonic()
+            with self.assertRaises(Overloaded):
+                pool.acquire()
+            self.assertGreaterEqual(time.monotonic() - start, 0.04)
+        metrics = pool.metrics()
+        self.assertEqual((metrics["queued"], metrics["rejected"], metrics["active"]), (0, 1, 0))
+
+    def test_queued_request_gets_released_slot(self):
+        pool = AdmissionPool("test", limit=1, queue_size=1, queue_timeout_ms=5000)
+        holder = pool.acquire()
+        admitted = []
+        waiter = threading.Thread(target=lambda: admitted.append(pool.acquire()))
+        waiter.start()
+        while pool.metrics()["queued"] == 0:
+            time.sleep(0.001)
+        holder.release()
+        waiter.join(timeout=5)
+        self.assertEqual(len(admitted), 1)
+        self.assertEqual(pool.metrics()["active"], 1)
+        admitted[0].release()
+        self.assertEqual(pool.metrics()["active"], 0)
+
+    def test_release_is_idempotent(self):
+        pool = AdmissionPool("test", limit=2, queue_size=0, queue_timeout_ms=0)
+        slot = pool.acquire()
+        slot.release()
+        slot.release()
+        self.assertEqual(pool.metrics()["active"], 0)
+
+    def test_releasing_iterator_releases_on_close(self):
+        pool = AdmissionPool("test", limit=1, queue_size=0, queue_timeout_ms=0)
+        stream = ReleasingIterator(iter(["a", "b"]), pool.acquire())
+        self.assertEqual(next(stream), "a")
+        stream.close()
+        self.assertEqual(pool.metrics()["active"], 0)
+
+    def test_cancelled_async_wait_does_not_leak_slot(self):
+        pool = AdmissionPool("test", limit=1, queue_size=1, queue_timeout_ms=5000)
+
+        async def scenario():
+            holder = pool.acquire()
+            waiter = asyncio.ensure_future(pool.acquire_async())
+            while pool.metrics()["queued"] == 0:
+                await asyncio.sleep(0.001)
+            # The client disconnects while its request waits in the queue
+            waiter.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await waiter
+            holder.release()
+            for _ in range(1000):
+                if pool.metrics()["admitted"] == 2 and pool.metrics()["active"] == 0:
+                    break
+                await asyncio.sleep(0.005)
+
+        asyncio.run(scenario())
+        self.assertEqual(pool.metrics()["admitted"], 2)
+        self.assertEqual(pool.metrics()["active"], 0)
+
+    def test_batches_have_their_own_pool(self):
+        with admission.admit_batch() as slot:
+            self.assertIs(slot.pool, admission.get_pool("batch"))
+            self.assertEqual(admission.get_pool("cheap").metrics()["active"], 0)
+
+
+class ResultCacheTests(TestCase):
+    """Hits, expiry and pruning of stored analysis results."""
+
+    RESULT = {"matchScore": 80, "degradedStages": []}
+
+    def setUp(self):
+        self.profile = get_profile("balanced")
+        self.computed = 0
+
+    def _compute(self):
+        self.computed += 1
+        return dict(self.RESULT), "resume text", "job text"
+
+    def _analyze(self, **kwargs):
+        return result_cache.get_or_compute(b"resume", b"job", self.profile, self._compute, **kwargs)
+
+    def test_hit_touches_last_used_at(self):
+        self.assertEqual(self._analyze().status, "miss")
+        AnalysisResult.objects.update(last_used_at=timezone.now() - timedelta(days=1))
+        self.assertEqual(self._analyze().status, "hit")
+        entry = AnalysisResult.objects.get()
+        self.assertEqual(entry.hits, 1)
+        self.assertGreater(entry.last_used_at, timezone.now() - timedelta(minutes=1))
+
+    def test_expired_result_is_recomputed(self):
+        self._analyze()
+        AnalysisResult.objects.update(last_used_at=timezone.now() - timedelta(days=result_cache.RESULT_TTL_DAYS + 1))
+        self.assertEqual(self._analyze().status, "miss")
+        self.assertEqual(self.computed, 2)
+        self.assertEqual(AnalysisResult.objects.count(), 1)
+
+    def test_expired_idempotency_key_starts_over(self):
+        self._analyze(idempotency_key="k")
+        self.assertEqual(self._analyze(idempotency_key="k").status, "replayed")
+        IdempotencyRecord.objects.update(
+            created_at=timezone.now() - timedelta(hours=result_cache.IDEMPOTENCY_TTL_HOURS + 1))
+        self.assertEqual(self._analyze(idempotency_key="k").status, "hit")
+        self.assertEqual(IdempotencyRecord.objects.count(), 1)
+
+    async def test_async_requests_share_one_computation(self):
+        async def compute():
+            self.computed += 1
+            await asyncio.sleep(0.05)
+            return dict(self.RESULT), "resume text", "job text"
+
+        analyses = await asyncio.gather(*[
+            result_cache.get_or_compute_async(b"resume", b"job", self.profile, compute) for _ in range(3)])
+
+        self.assertEqual(sorted(analysis.status for analysis in analyses), ["miss", "shared", "shared"])
+        self.assertEqual(self.computed, 1)
+        analysis = await result_cache.get_or_compute_async(b"resume", b"job", self.profile, compute)
+        self.assertEqual(analysis.status, "hit")
+
+    @mock.patch("resume_api.azure_language_client.analyze_sentiment", return_value=None)
+    @mock.patch("resume_api.azure_language_client.extract_key_phrases", return_value=[])
+    def test_failed_azure_calls_are_not_stored(self, *mocks):
+        def compute():
+            result = ResumeAnalyzer().analyze_resume_and_job_description(
+                "Python developer with Django experience", "We need a Python and Django developer", "fast")
+            return result, "resume text", "job text"
+
+        analysis = result_cache.get_or_compute(b"resume", b"job", self.profile, compute)
+
+        self.assertCountEqual(analysis.result["degradedStages"], ["keyPhrases", "sentiment"])
+        self.assertEqual(analysis.result["sentimentAnalysis"], {"sentiment": "neutral"})
+        self.assertFalse(AnalysisResult.objects.exists())
+
+    def test_prune(self):
+        self._analyze(idempotency_key="k")
+        self.assertEqual(result_cache.prune(), (0, 0))
+        long_ago = timezone.now() - timedelta(days=result_cache.RESULT_TTL_DAYS + 1)
+        AnalysisResult.objects.update(last_used_at=long_ago)
+        IdempotencyRecord.objects.update(created_at=long_ago)
+        self.assertEqual(result_cache.prune(), (1, 1))
+
+
+class SavedDocumentTests(TestCase):
+
+    @mock.patch("resume_api.feature_store.PRECOMPUTE_ON_SAVE", False)
+    def test_duplicates_do_not_fail(self):
+        user = User.objects.create_user("reviewer")
+        for _ in range(2):
+            Resume.objects.create(user=user, title="cv", file_name="cv.txt", file_type="txt", content="same")
+        first = Resume.objects.filter(user=user).order_by("id").first()
+        self.assertEqual(_saved_document(Resume, user, "cv.txt", "same"), first)
+        self.assertEqual(_saved_document(Resume, user, "cv.txt", "other").content, "other")
+        self.assertEqual(Resume.objects.filter(user=user).count(), 3)
+
+
+class JobIndexTests(SimpleTestCase):
+
+    def test_compacts_unused_slots(self):
+        index = job_index.JobIndex()
+        for job_id in range(8):
+            index.add(job_id, 1, f"Python developer {job_id}")
+        for _ in range(20):
+            index.add(3, 1, "Kubernetes operator")
+        self.assertLess(index.slot_count(), 8 / (1 - job_index.COMPACT_FRACTION) + 1)
+        index.remove(0)
+        index.remove(1)
+        self.assertEqual(len(index), 6)
+        self.assertEqual(index.job_ids(), {2, 3, 4, 5, 6, 7})
+        query = job_index.query_weights("Kubernetes")
+        self.assertEqual([job_id for job_id, _ in index.search(query)], [3])
+        self.assertEqual(len(index.search(job_index.query_weights("Python developer"))), 5)
+
+    def test_owner_search_uses_the_owners_statistics(self):
+        shared, own = job_index.JobIndex(), job_index.JobIndex()
+        for job_id in range(10):
+            shared.add(job_id, 1, f"Python developer {job_id}")
+        for job_id, content in ((10, "Python and Kubernetes"), (11, "Kubernetes operator"), (12, "Go developer")):
+            shared.add(job_id, 2, content)
+            own.add(job_id, 2, content)
+
+        query = job_index.query_weights("Python Kubernetes developer")
+        self.assertEqual(shared.search(query, owner_id=2), own.search(query))
+        self.assertEqual(shared.search(query, owner_id=3), [])
+
+    def test_stale_index_is_refreshed_in_the_background(self):
+        index = job_index.JobIndex()
+        index.loaded_at = time.monotonic() - job_index.REFRESH_INTERVAL
+        refreshing = threading.Event()
+        release = threading.Event()
+
+        def slow_refresh(stale):
+            refreshing.set()
+            release.wait(1)
+            stale.loaded_at = time.monotonic()
+
+        with mock.patch.object(job_index, "_index", index), \
+                mock.patch.object(job_index, "_refresh", side_effect=slow_refresh) as refresh:
+            for _ in range(3):
+                self.assertIs(job_index.get_job_index(), index)
+            self.assertTrue(refreshing.wait(1))
+            release.set()
+            for _ in range(100):
+                if not job_index._refreshing:
+                    break
+                time.sleep(0.01)
+        self.assertFalse(job_index._refreshing)
+        self.assertEqual(refresh.call_count, 1)
+
+
+class JobIndexRefreshTests(TestCase):
+
+    @mock.patch("resume_api.feature_store.PRECOMPUTE_ON_SAVE", False)
+    def test_refresh_picks_up_edits_of_other_processes(self):
+        user = User.objects.create_user("recruiter")
+        job = JobDescription.objects.create(user=user, title="Backend", content="Python developer")
+        index = job_index.JobIndex()
+        job_index._load_jobs(index)
+        # As another process would: the signals of this one are not involved
+        JobDescription.objects.filter(pk=job.pk).update(content="Kubernetes operator", updated_at=timezone.now())
+        removed = JobDescription.objects.create(user=user, title="Gone", content="Python")
+        index.add(removed.pk, user.pk, "Python", version=removed.updated_at)
+        JobDescription.objects.filter(pk=removed.pk).delete()
+
+        job_index._refresh(index)
+        self.assertEqual(index.job_ids(), {job.pk})
+        self.assertEqual(index.search(job_index.query_weights("Python developer")), [])
+        self.assertEqual([job_id for job_id, _ in index.search(job_index.query_weights("Kubernetes"))], [job.pk])
+
+
+class EmbeddingBackendTests(SimpleTestCase):
+
+    def test_concurrent_onnx_exports_write_the_graph_once(self):
+        exports = []
+
+        def export(tokenizer, model, model_path):
+            exports.append(model_path)
+            time.sleep(0.05)
+            with open(model_path, "wb") as graph:
+                graph.write(b"graph")
+
+        with tempfile.TemporaryDirectory() as directory, \
+                mock.patch.object(embeddings, "export_onnx_model", side_effect=export):
+            model_path = os.path.join(directory, "embedding.onnx")
+            threads = [threading.Thread(target=embeddings.ensure_onnx_model, args=(None, None, model_path))
+                       for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertEqual(exports, [model_path])
+
+    @unittest.skipIf(embeddings.backend is None or embeddings.backend.name == "remote", "needs the local model")
+    def test_deferred_int8_backend_is_quantized_before_fork(self):
+        with mock.patch.object(embeddings, "_deferred", None), \
+                mock.patch.object(embeddings, "backend", embeddings.backend), \
+                mock.patch.object(embeddings, "worker", None):
+            reference = embeddings.load_backend("int8", tolerance=1.0, defer_parity=True)
+            name, candidate, _ = embeddings._deferred
+            self.assertEqual((reference.name, name), ("fp32", "int8"))
+            self.assertIsInstance(candidate, embeddings.QuantizedEmbeddingBackend)
+            embeddings.backend = reference
+            self.assertIs(embeddings.verify_backend(), candidate)
+
+
+class FakeBackend:
+    """Records the forward passes it runs and the threads it runs them on."""
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def embed(self, texts):
+        self.gate.wait(5)
+        self.calls.append(("embed", len(texts), threading.current_thread().name))
+        return np.array([[len(text), 0.0] for text in texts])
+
+    def embed_windows(self, text):
+        self.calls.append(("windows", 1, threading.current_thread().name))
+        return np.ones((3, 2))
+
+
+class InferenceWorkerTests(SimpleTestCase):
+
+    def test_concurrent_requests_share_a_batch(self):
+        backend = FakeBackend()
+        worker = InferenceWorker(backend, max_batch_size=32, max_wait_ms=1)
+        first = worker.submit(["a"])
+        # Requests queued while the first batch runs are coalesced into the next one
+        time.sleep(0.05)
+        futures = [worker.submit(["b" * n, "c"]) for n in range(1, 5)]
+        backend.gate.set()
+        self.assertEqual(first.result(5).tolist(), [[1, 0]])
+        self.assertEqual([future.result(5)[0][0] for future in futures], [1, 2, 3, 4])
+        self.assertEqual([size for _, size, _ in backend.calls], [1, 8])
+        self.assertEqual(worker.stats()["batchSizeHistogram"], {"1": 1, "8": 1})
+
+    def test_window_requests_run_alone_on_the_worker_thread(self):
+        backend = FakeBackend()
+        worker = InferenceWorker(backend, max_batch_size=32, max_wait_ms=1)
+        blocked = worker.submit(["a"])
+        time.sleep(0.05)
+        before = worker.submit(["b"])
+        windows = worker.submit_windows("long text")
+        after = worker.submit(["c"])
+        backend.gate.set()
+        for future in (blocked, before, after):
+            future.result(5)
+        self.assertEqual(windows.result(5).shape, (3, 2))
+        self.assertEqual([(kind, size) for kind, size, _ in backend.calls],
+                         [("embed", 1), ("embed", 1), ("windows", 1), ("embed", 1)])
+        self.assertEqual({thread for _, _, thread in backend.calls}, {"inference-worker"})
+        self.assertEqual(worker.stats()["windowRequests"], 1)
+
+    def test_errors_reach_every_caller_of_the_batch(self):
+        backend = FakeBackend()
+        backend.embed = mock.Mock(side_effect=RuntimeError("model failed"))
+        worker = InferenceWorker(backend, max_batch_size=4, max_wait_ms=1)
+        with self.assertRaises(RuntimeError):
+            worker.embed(["a"], timeout=5)
+
+
+def fake_bert_embeddings(texts):
+    # Deterministic vectors that keep equal texts equal
+    return np.array([np.random.default_rng(sum(map(ord, text))).normal(size=8) for text in texts])
+
+
+@mock.patch("resume_api.azure_language_client.get_bert_embeddings", side_effect=fake_bert_embeddings)
+@mock.patch("resume_api.azure_language_client.get_bert_embedding", side_effect=lambda text: fake_bert_embeddings([text])[0])
+class SkillVocabularyIndexTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "skill_index.npz")
+        for name, value in (("SKILL_INDEX_PATH", self.path), ("_vocabulary_index", None), ("_rebuilding", False)):
+            patcher = mock.patch.object(skill_vocabulary, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_saved_index_records_the_embedding_model(self, *mocks):
+        index = skill_vocabulary.SkillVocabularyIndex()
+        index.add_skills(["python", "docker", "kubernetes"])
+        index.save(self.path)
+        loaded = skill_vocabulary.SkillVocabularyIndex.load(self.path)
+        self.assertEqual(loaded.embeddings_version, feature_cache.embeddings_version())
+        self.assertTrue(loaded.is_current())
+        self.assertEqual(loaded.top_k("docker", 1)[0][0], "docker")
+
+    def test_index_of_another_model_is_rebuilt(self, *mocks):
+        with mock.patch.object(feature_cache, "embeddings_version", return_value="old-model:fp32"):
+            stale = skill_vocabulary.SkillVocabularyIndex()
+            stale.add_skills(["python", "docker"])
+            stale.save(self.path)
+
+        self.assertIsNone(skill_vocabulary.get_vocabulary_index())
+        for _ in range(500):
+            if not skill_vocabulary._rebuilding:
+                break
+            time.sleep(0.01)
+        index = skill_vocabulary.get_vocabulary_index()
+        self.assertTrue(index.is_current())
+        self.assertEqual(sorted(index.index.labels), ["docker", "python"])
+        self.assertTrue(skill_vocabulary.SkillVocabularyIndex.load(self.path).is_current())
+
+
+class FakeSession:
+    def __init__(self):
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class LoopResourceTests(SimpleTestCase):
+    """Per-loop resources are shared within a loop and closed with it."""
+
+    def test_resources_are_closed_when_the_loop_shuts_down(self):
+        async def use_twice():
+            first = await get_loop_resource("session", FakeSession)
+            second = await get_loop_resource("session", FakeSession)
+            self.assertIs(first, second)
+            return first
+
+        sessions = [asyncio.run(use_twice()) for _ in range(2)]
+
+        self.assertIsNot(sessions[0], sessions[1])
+        self.assertTrue(all(session.closed for session in sessions))
+
+
+class CorpusStatisticsTests(TestCase):
+    """Incremental document-frequency updates and reloads of the TF-IDF statistics."""
+
+    def setUp(self):
+        self.statistics = tfidf.CorpusStatistics()
+        self.statistics.load()
+        patcher = mock.patch.object(tfidf, "_statistics", self.statistics)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def stored_frequencies(self):
+        return dict(TermStatistic.objects.values_list("term", "document_frequency"))
+
+    def test_document_changes_update_stored_and_loaded_frequencies(self):
+        tfidf.record_document_change(set(), {"python", "django"}, 1)
+        tfidf.record_document_change(set(), {"python"}, 1)
+        tfidf.record_document_change({"python", "django"}, {"python", "flask"}, 0)
+
+        expected = {"python": 2, "flask": 1}
+        self.assertEqual(self.stored_frequencies(), expected)
+        self.assertEqual({term: count for term, count in self.statistics.frequencies.items() if count},
+                         expected)
+        self.assertEqual(self.statistics.document_count, 2)
+
+        tfidf.record_document_change({"python", "flask"}, set(), -1)
+        self.assertEqual(self.stored_frequencies(), {"python": 1})
+        self.assertEqual(self.statistics.document_count, 1)
+
+    def test_rare_terms_weigh_more(self):
+        tfidf.record_document_change(set(), {"python", "kubernetes"}, 1)
+        tfidf.record_document_change(set(), {"python"}, 1)
+
+        vector = tfidf.tfidf_vector("python kubernetes")
+        self.assertGreater(vector["kubernetes"], vector["python"])
+        self.assertAlmostEqual(sum(weight * weight for weight in vector.values()), 1.0)
+
+    def test_stale_statistics_are_reloaded_by_one_thread(self):
+        self.statistics.loaded_at -= tfidf.REFRESH_INTERVAL
+        loads = []
+        reloading = threading.Event()
+
+        def slow_load():
+            loads.append(1)
+            reloading.set()
+            time.sleep(0.2)
+            self.statistics.loaded_at = time.monotonic()
+
+        with mock.patch.object(self.statistics, "load", side_effect=slow_load):
+            reloader = threading.Thread(target=tfidf.get_corpus_statistics)
+            reloader.start()
+            reloading.wait(1)
+            start = time.monotonic()
+            for _ in range(5):
+                self.assertIs(tfidf.get_corpus_statistics(), self.statistics)
+            waited = time.monotonic() - start
+            reloader.join()
+
+        self.assertEqual(len(loads), 1)
+        self.assertLess(waited, 0.1)
+
+
+def fake_key_phrases(text, timeout=None):
+    return [phrase for phrase in ("Python", "Django", "REST APIs", "PostgreSQL", "team leadership")
+            if phrase.lower() in text.lower()]
+
+
+def equally_similar_embeddings(texts):
+    # Distinct texts have a cosine similarity of 0.7: above the matching threshold
+    # on its own, below it once blended with a low edit similarity for technical terms
+    dimensions = {}
+    vectors = np.zeros((len(texts), 64))
+    vectors[:, 0] = np.sqrt(0.7)
+    for row, text in enumerate(texts):
+        vectors[row, 1 + dimensions.setdefault(text, len(dimensions))] = np.sqrt(0.3)
+    return vectors
+
+
+@mock.patch("resume_api.azure_language_client.get_bert_embeddings", side_effect=equally_similar_embeddings)
+@mock.patch("resume_api.azure_language_client.analyze_sentiment", return_value={"sentiment": "positive"})
+@mock.patch("resume_api.azure_language_client.extract_key_phrases", side_effect=fake_key_phrases)
+@mock.patch("resume_api.azure_language_client.extract_key_phrases_batch",
+            side_effect=lambda texts, timeout=None: [fake_key_phrases(text) for text in texts])
+class MatchOneToManyTests(TestCase):
+    """The batch scores agree with analyzing each pair on its own."""
+
+    RESUME = ("Python developer building REST APIs with Django. Excellent communicator, "
+              "a team player who enjoys mentoring and problem solving.")
+    JOBS = [
+        "We need a Python and Django engineer with strong communication and leadership skills.",
+        "PostgreSQL administrator; teamwork, adaptability and attention to detail required.",
+        "Team leadership of a REST APIs group. Collaboration and critical thinking matter.",
+    ]
+
+    def test_batch_scores_match_single_pair_scores(self, *mocks):
+        analyzer = ResumeAnalyzer()
+        batch = analyzer.match_one_to_many(self.RESUME, self.JOBS, profile="balanced")
+
+        for entry in batch["results"]:
+            single = analyzer.analyze_resume_and_job_description(self.RESUME, self.JOBS[entry["index"]], "balanced")
+            self.assertEqual(entry["matchScore"], single["matchScore"])
+            self.assertEqual(entry["keywordsToAdd"], single["keywordsToAdd"])
+
+
+@mock.patch("resume_api.feature_store.PRECOMPUTE_ON_SAVE", False)
+class DocumentSignalTests(TestCase):
+    """Saved documents reach the term statistics after the commit, without extra queries."""
+
+    def setUp(self):
+        self.submitted = []
+        executor = mock.Mock()
+        executor.submit.side_effect = lambda apply, func, *args: self.submitted.append((func, args))
+        for patcher in (mock.patch.object(signals, "get_update_executor", return_value=executor),
+                        mock.patch.object(tfidf, "_statistics", tfidf.CorpusStatistics())):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.user = User.objects.create_user("writer")
+
+    def apply_submitted(self):
+        for func, args in self.submitted:
+            func(*args)
+        self.submitted = []
+
+    def test_edits_apply_the_difference_after_the_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            resume = Resume.objects.create(user=self.user, title="cv", content="python django")
+            self.assertEqual(self.submitted, [])
+        self.apply_submitted()
+
+        resume = Resume.objects.get(pk=resume.pk)
+        resume.content = "python flask"
+        # Only the UPDATE: the previous content is known from loading the resume
+        with self.assertNumQueries(1), self.captureOnCommitCallbacks(execute=True):
+            resume.save()
+        self.apply_submitted()
+        self.assertEqual(dict(TermStatistic.objects.values_list("term", "document_frequency")),
+                         {"python": 1, "flask": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.save(update_fields=["title"])
+            Resume.objects.get(pk=resume.pk).delete()
+        self.assertEqual(len(self.submitted), 1)
+        self.apply_submitted()
+        self.assertFalse(TermStatistic.objects.exists())
+
+
+class SkillScannerTests(SimpleTestCase):
+    """Spans and word boundaries of the Aho-Corasick skill scan."""
+
+    def setUp(self):
+        self.scanner = SkillScanner({"languages": ["Java", "JavaScript", "C++", "Go"],
+                                     "frameworks": ["Spring", "Spring Boot"]})
+
+    def test_spans_of_overlapping_skills(self):
+        text = "Java and JavaScript developer; Spring Boot, C++"
+        matches = self.scanner.scan(text)
+
+        self.assertEqual([(match.skill, match.start, match.end) for match in matches],
+                         [("java", 0, 4), ("javascript", 9, 19), ("spring", 31, 37),
+                          ("spring boot", 31, 42), ("c++", 44, 47)])
+        for match in matches:
+            self.assertEqual(text.lower()[match.start:match.end], match.skill)
+        self.assertEqual(matches[-1].categories, ("languages",))
+
+    def test_skills_do_not_match_inside_words(self):
+        self.assertEqual(self.scanner.find_skills("Going to Django meetups; javanese food"), set())
+        self.assertEqual(self.scanner.find_skills("go, Go-lang and (java)"), {"go", "java"})
+        # Non-word characters end a skill of their own, so "c++" matches before a letter
+        self.assertEqual(self.scanner.find_skills("c++11"), {"c++"})
+
+
+class LexiconReloadTests(SimpleTestCase):
+    """Hot reload of the lexicon file."""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "lexicon.json")
+        with open(lexicon.LEXICON_PATH, encoding="utf-8") as source:
+            self.data = json.load(source)
+        self.write(self.data, mtime=1000)
+        for patcher in (mock.patch.object(lexicon, "_current", lexicon.load_lexicon(self.path)),
+                        mock.patch.object(lexicon, "_failed_mtime", None)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def write(self, data, mtime):
+        with open(self.path, "w", encoding="utf-8") as lexicon_file:
+            lexicon_file.write(data if isinstance(data, str) else json.dumps(data))
+        os.utime(self.path, (mtime, mtime))
+
+    @mock.patch.object(lexicon, "RELOAD_INTERVAL", 0)
+    def test_changed_file_is_swapped_in(self):
+        old = lexicon.get_lexicon()
+        self.assertIs(lexicon.get_lexicon(), old)
+
+        data = dict(self.data, version="test-2",
+                    tech_skills=dict(self.data["tech_skills"], testing=["zorblang"]))
+        self.write(data, mtime=2000)
+        new = lexicon.get_lexicon()
+
+        self.assertEqual(new.version, "test-2")
+        self.assertEqual(new.skill_scanner.find_skills("zorblang developer"), {"zorblang"})
+        # Readers holding the old instance keep their snapshot
+        self.assertEqual(old.skill_scanner.find_skills("zorblang developer"), set())
+
+    def test_broken_file_keeps_the_current_lexicon(self):
+        current = lexicon._current
+        self.write("{not json", mtime=2000)
+        with mock.patch.object(lexicon, "load_lexicon", wraps=lexicon.load_lexicon) as load:
+            self.assertIs(lexicon.reload_lexicon(), current)
+            self.assertIs(lexicon.reload_lexicon(), current)
+        # The broken version is parsed once, not on every check
+        self.assertEqual(load.call_count, 1)
+
+
+class CanonicalSkillIndexTests(SimpleTestCase):
+    """Spellings of a skill reduce to one canonical ID."""
+
+    def setUp(self):
+        self.skills = lexicon.get_lexicon().canonical_skills
+
+    def test_vendor_prefixes_and_versions(self):
+        self.assertEqual(self.skills.canonical_id("ms sql server 2019"), self.skills.canonical_id("SQL Server"))
+        self.assertTrue(self.skills.same_skill("Microsoft SQL Server", "sql server"))
+
+    def test_variants_and_acronyms(self):
+        self.assertEqual(self.skills.canonical_id("k8s"), self.skills.canonical_id("Kubernetes"))
+        self.assertTrue(self.skills.same_skill("NLP", "natural language processing"))
+
+    def test_symbols_keep_languages_apart(self):
+        self.assertEqual(self.skills.canonical_id("C#"), self.skills.canonical_id("C Sharp"))
+        ids = {self.skills.canonical_id(term) for term in ("c#", "c++", "c")}
+        self.assertEqual(len(ids), 3)
+        self.assertNotIn(None, ids)
+
+    def test_unknown_terms(self):
+        self.assertIsNone(self.skills.canonical_id("banana bread"))
+        self.assertEqual(self.skills.canonical_ids(["k8s", "kubernetes", "banana bread"]),
+                         {self.skills.canonical_id("kubernetes")})
+
+
+class TextQualityTests(SimpleTestCase):
+    """Offsets of the passive constructions found in one scan."""
+
+    def test_offsets_point_into_the_text(self):
+        text = ("Reports were generated by the team every week. I led the migration to Django. "
+                "The service has been deployed to three regions.")
+        sentences = text_quality.find_passive_sentences(text)
+
+        self.assertEqual([sentence["is_passive"] for sentence in sentences], [True, False, True])
+        self.assertEqual([sentence["construction"] for sentence in sentences], ["be", None, "perfect"])
+        self.assertEqual(text[sentences[1]["start"]:sentences[1]["end"]], "I led the migration to Django.")
+        for sentence in sentences:
+            if sentence["is_passive"]:
+                self.assertEqual(text[sentence["phrase_start"]:sentence["phrase_end"]], sentence["phrase"])
+        self.assertEqual(sentences[2]["phrase"], "has been deployed")
+
+    def test_examples_rewrite_the_passive_phrase(self):
+        result = text_quality.analyze_text_quality("Reports were generated by the team every week.")
+
+        self.assertEqual(result["passive_voice_ratio"], 1)
+        self.assertEqual(result["passive_examples"][0]["suggestion"], "Reports actively did by the team every week.")
+
+
+class SegmentSectionsTests(SimpleTestCase):
+    """Section offsets from one pass over the lines."""
+
+    ALIASES = {"experience": "experience", "work history": "experience", "skills": "skills",
+               "education": "education"}
+
+    def body(self, text, sections, name):
+        start, end = sections[name]
+        return text[start:end]
+
+    def test_headings_with_decoration_and_inline_content(self):
+        text = ("Jane Doe\n"
+                "## Work History\n"
+                "Built APIs.\n"
+                "* Skills: Python, Django\n"
+                "EDUCATION\n"
+                "BSc Computer Science\n")
+        sections = segment_sections(text, self.ALIASES)
+
+        self.assertEqual(list(sections), ["experience", "skills", "education"])
+        self.assertEqual(self.body(text, sections, "experience"), "\nBuilt APIs.\n")
+        self.assertEqual(self.body(text, sections, "skills"), " Python, Django\n")
+        self.assertEqual(self.body(text, sections, "education"), "\nBSc Computer Science\n")
+
+    def test_first_occurrence_is_kept_and_long_lines_are_not_headings(self):
+        text = "Skills\nGo\nSkills\nRust\n" + "Experience " * 10 + "\n"
+        sections = segment_sections(text, self.ALIASES)
+
+        self.assertEqual(list(sections), ["skills"])
+        self.assertEqual(self.body(text, sections, "skills"), "\nGo\n")
+        self.assertEqual(segment_sections("No headings here", self.ALIASES), {})
+
+
+class DeadlineTests(TestCase):
+    """Stage budgets and the degraded stages reported with an analysis."""
+
+    def test_without_budget_everything_is_allowed(self):
+        deadline = Deadline()
+
+        self.assertTrue(all(deadline.allows(stage) for stage in STAGE_COST_MS))
+        self.assertIsNone(deadline.remaining_ms())
+        self.assertIsNone(deadline.remaining_seconds())
+        self.assertEqual(deadline.degraded_stages, [])
+
+    def test_stages_that_do_not_fit_are_degraded_once(self):
+        deadline = Deadline(budget_ms=max(STAGE_COST_MS.values()) - 1)
+
+        self.assertFalse(deadline.allows("ocr"))
+        self.assertTrue(deadline.allows("contentSemantics"))
+        deadline.degrade("sentiment")
+        deadline.degrade("ocr")
+
+        self.assertEqual(deadline.degraded_stages, ["ocr", "sentiment"])
+        self.assertLessEqual(deadline.remaining_seconds(), deadline.budget_ms / 1000)
+
+    def test_parse_budget(self):
+        self.assertEqual(parse_budget("250"), 250)
+        for value in ("0", "-5", "soon"):
+            with self.assertRaises(ValueError):
+                parse_budget(value)
+
+    @mock.patch("resume_api.azure_language_client.analyze_sentiment")
+    @mock.patch("resume_api.azure_language_client.extract_key_phrases")
+    def test_exhausted_budget_skips_azure_calls(self, extract_key_phrases, analyze_sentiment):
+        result = ResumeAnalyzer().analyze_resume_and_job_description(
+            "Python developer with Django experience", "We need a Python and Django developer", "fast",
+            deadline=Deadline(budget_ms=1))
+
+        extract_key_phrases.assert_not_called()
+        analyze_sentiment.assert_not_called()
+        self.assertIn("keyPhrases", result["degradedStages"])
+        self.assertIn("sentiment", result["degradedStages"])
+        self.assertEqual(result["sentimentAnalysis"], {"sentiment": "neutral"})
+        self.assertIn("python", [skill.lower() for skill in result["technicalSkillsMatch"]["inResume"]])
+
+
+class PipelineTests(SimpleTestCase):
+    """Stages run once their dependencies are done, independent ones concurrently."""
+
+    def test_stages_receive_their_dependencies_in_order(self):
+        pipeline = (Pipeline()
+                    .add("words", str.split, ["text"])
+                    .add("count", len, ["words"])
+                    .add("summary", lambda words, count: f"{words[0]}+{count}", ["words", "count"]))
+
+        results = pipeline.run(text="a b c")
+
+        self.assertEqual(results, {"words": ["a", "b", "c"], "count": 3, "summary": "a+3"})
+
+    def test_independent_stages_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+        pipeline = Pipeline().add("left", barrier.wait).add("right", barrier.wait)
+
+        # Each stage waits for the other, so this only finishes if both run at once
+        self.assertCountEqual(pipeline.run(), ["left", "right"])
+
+    def test_run_iter_yields_in_completion_order(self):
+        def slow():
+            time.sleep(0.1)
+            return "slow"
+
+        pipeline = Pipeline().add("slow", slow).add("fast", lambda: "fast")
+
+        self.assertEqual([name for name, _ in pipeline.run_iter()], ["fast", "slow"])
+
+    def test_input_named_like_a_stage_replaces_it(self):
+        stage = mock.Mock(return_value="computed")
+        pipeline = Pipeline().add("value", stage).add("upper", str.upper, ["value"])
+
+        self.assertEqual(pipeline.run(value="given")["upper"], "GIVEN")
+        stage.assert_not_called()
+
+    def test_invalid_graphs_and_failing_stages(self):
+        with self.assertRaises(ValueError):
+            Pipeline().add("a", len).add("a", len)
+        with self.assertRaises(ValueError):
+            Pipeline().add("a", len, ["missing"]).run()
+        with self.assertRaises(ValueError):
+            Pipeline().add("a", len, ["b"]).add("b", len, ["a"]).run()
+
+        def fail():
+            raise RuntimeError("stage failed")
+
+        with self.assertRaisesMessage(RuntimeError, "stage failed"):
+            Pipeline().add("ok", lambda: 1).add("fail", fail).run()
+
+
+class FakeAnalyzer:
+    """Stands in for ResumeAnalyzer in the job queue tests."""
+
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = []
+
+    def analyze_files(self, resume_content, resume_file_name, job_desc_content, job_desc_file_name,
+                      profile=None, deadline=None):
+        self.calls.append((resume_file_name, job_desc_file_name, profile, deadline.budget_ms))
+        if self.error:
+            raise RuntimeError(self.error)
+        return {"matchScore": 80}
+
+
+class AnalysisJobQueueTests(TestCase):
+    """Claims, leases and retries of queued analyses."""
+
+    def enqueue(self, **kwargs):
+        return jobs.enqueue_job("resume.txt", b"resume", "job.txt", b"job", **kwargs)
+
+    def test_jobs_are_claimed_once_in_order(self):
+        first = self.enqueue(profile="fast", budget_ms=5000)
+        second = self.enqueue()
+
+        claimed = jobs.claim_job("worker-1")
+        self.assertEqual(claimed.pk, first.pk)
+        self.assertEqual((claimed.status, claimed.attempts, claimed.worker_id),
+                         (AnalysisJob.STATUS_RUNNING, 1, "worker-1"))
+        self.assertEqual(jobs.claim_job("worker-2").pk, second.pk)
+        self.assertIsNone(jobs.claim_job("worker-3"))
+
+        analyzer = FakeAnalyzer()
+        jobs.run_job(claimed, analyzer)
+
+        claimed.refresh_from_db()
+        self.assertEqual(analyzer.calls, [("resume.txt", "job.txt", "fast", 5000)])
+        self.assertEqual(claimed.status, AnalysisJob.STATUS_SUCCEEDED)
+        self.assertEqual(claimed.result, {"matchScore": 80})
+        self.assertIsNone(claimed.lease_expires_at)
+
+    def test_expired_lease_is_taken_over(self):
+        self.enqueue()
+        lost = jobs.claim_job("worker-1")
+        AnalysisJob.objects.filter(pk=lost.pk).update(lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        taken = jobs.claim_job("worker-2")
+
+        self.assertEqual((taken.pk, taken.attempts, taken.worker_id), (lost.pk, 2, "worker-2"))
+        # The first worker can neither keep nor finish an attempt it no longer owns
+        self.assertFalse(jobs.renew_lease(lost))
+        self.assertFalse(jobs.complete_job(lost, {"matchScore": 1}))
+        self.assertTrue(jobs.renew_lease(taken))
+        self.assertTrue(jobs.complete_job(taken, {"matchScore": 2}))
+        taken.refresh_from_db()
+        self.assertEqual(taken.result, {"matchScore": 2})
+
+    def test_expired_last_attempt_fails_the_job(self):
+        job = self.enqueue()
+        AnalysisJob.objects.filter(pk=job.pk).update(
+            status=AnalysisJob.STATUS_RUNNING, attempts=job.max_attempts,
+            lease_expires_at=timezone.now() - timedelta(seconds=1))
+
+        self.assertIsNone(jobs.claim_job("worker-1"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), (AnalysisJob.STATUS_FAILED, "Worker stopped responding"))
+
+    def test_failures_are_retried_until_the_last_attempt(self):
+        job = self.enqueue()
+        analyzer = FakeAnalyzer(error="Azure unavailable")
+
+        processed = jobs.work(analyzer, worker_id="worker-1", burst=True)
+
+        job.refresh_from_db()
+        self.assertEqual(processed, job.max_attempts)
+        self.assertEqual(len(analyzer.calls), job.max_attempts)
+        self.assertEqual((job.status, job.attempts, job.error),
+                         (AnalysisJob.STATUS_FAILED, job.max_attempts, "Azure unavailable"))
+        self.assertIsNotNone(job.finished_at)
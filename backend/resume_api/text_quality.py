@@ -0,0 +1,102 @@
+import re
+from bisect import bisect_right
+
+from .document import ParsedDocument
+
+# Passive constructions, one alternative per auxiliary form. Leftmost matching
+# prefers the longest construction, e.g. 'has been completed' over 'been completed'.
+PASSIVE_VOICE = re.compile(
+    r'\b(?:'
+    r'(?P<perfect>(?:has|have|had)\s+been)'
+    r'|(?P<modal>(?:will|shall|should|would|could|might|must)\s+be)'
+    r'|(?P<be>am|is|are|was|were|be|being|been)'
+    r')\s+(?P<participle>\w+ed)\b',
+    re.IGNORECASE
+)
+# Sentences with fewer words are not counted
+MIN_SENTENCE_WORDS = 3
+# Maximum number of rewritten examples returned
+MAX_PASSIVE_EXAMPLES = 3
+
+
+def find_passive_sentences(document):
+    """
+    Find the passive construction in each sentence with one scan of the document.
+
+    Args:
+        document (ParsedDocument or str): The text to analyze
+
+    Returns:
+        list: One dict per sentence of at least MIN_SENTENCE_WORDS words, with the
+            sentence offsets and, for passive sentences, the first construction found
+    """
+    document = ParsedDocument.of(document)
+    spans = document.sentence_spans
+    sentence_starts = [start for start, _ in spans]
+
+    # First passive construction per sentence index
+    first_matches = {}
+    for match in PASSIVE_VOICE.finditer(document.text):
+        index = bisect_right(sentence_starts, match.start()) - 1
+        first_matches.setdefault(index, match)
+
+    results = []
+    for index, (start, end) in enumerate(spans):
+        sentence = document.text[start:end]
+        if len(sentence.split()) < MIN_SENTENCE_WORDS:
+            continue
+        match = first_matches.get(index)
+        results.append({
+            "start": start,
+            "end": end,
+            "is_passive": match is not None,
+            "construction": _construction(match),
+            "phrase": match.group(0) if match is not None else None,
+            "phrase_start": match.start() if match is not None else None,
+            "phrase_end": match.end() if match is not None else None,
+        })
+    return results
+
+
+def _construction(match):
+    """Name of the auxiliary group that matched: 'be', 'perfect' or 'modal'."""
+    if match is None:
+        return None
+    for name in ("perfect", "modal", "be"):
+        if match.group(name) is not None:
+            return name
+    return None
+
+
+def analyze_text_quality(document):
+    """
+    Analyze text quality aspects like passive vs active voice, locally and in
+    a single pass over the document.
+
+    Args:
+        document (ParsedDocument or str): The text to analyze
+
+    Returns:
+        dict: Passive voice ratio, rewritten examples and per-sentence results with offsets
+    """
+    document = ParsedDocument.of(document)
+    sentences = find_passive_sentences(document)
+    passive = [sentence for sentence in sentences if sentence["is_passive"]]
+
+    passive_examples = []
+    for sentence in passive[:MAX_PASSIVE_EXAMPLES]:
+        start, end = sentence["start"], sentence["end"]
+        original = document.text[start:end]
+        phrase_start = sentence["phrase_start"] - start
+        phrase_end = sentence["phrase_end"] - start
+        # Simple conversion of the passive phrase (very basic)
+        passive_examples.append({
+            "original": original,
+            "suggestion": original[:phrase_start] + "actively did" + original[phrase_end:]
+        })
+
+    return {
+        "passive_voice_ratio": len(passive) / len(sentences) if sentences else 0,
+        "passive_examples": passive_examples,
+        "sentences": sentences
+    }
@@ -0,0 +1,284 @@
+import os
+import math
+import time
+import threading
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+from .document import ParsedDocument
+
+# Seconds between reloads of the corpus statistics written by other processes
+REFRESH_INTERVAL = float(os.getenv("TFIDF_REFRESH_INTERVAL", "300"))
+# Longest term stored in TermStatistic
+MAX_TERM_LENGTH = 100
+# Terms per query when updating TermStatistic rows
+_CHUNK_SIZE = 500
+
+
+def document_terms(document):
+    """
+    Get the distinct terms of a document that carry TF-IDF weight.
+
+    Args:
+        document (ParsedDocument or str): The document
+
+    Returns:
+        set: Lower-cased terms without stopwords and bare numbers
+    """
+    return {term for term in ParsedDocument.of(document).token_set if _is_term(term)}
+
+
+def term_counts(document):
+    """
+    Count the occurrences of each term of a document that carries TF-IDF weight.
+
+    Args:
+        document (ParsedDocument or str): The document
+
+    Returns:
+        dict: Term -> number of occurrences
+    """
+    counts = {}
+    for token in ParsedDocument.of(document).tokens:
+        if _is_term(token):
+            counts[token] = counts.get(token, 0) + 1
+    return counts
+
+
+def _is_term(token):
+    return token not in ENGLISH_STOP_WORDS and not token.isdigit() and len(token) <= MAX_TERM_LENGTH
+
+
+def _chunks(terms):
+    terms = list(terms)
+    for i in range(0, len(terms), _CHUNK_SIZE):
+        yield terms[i:i + _CHUNK_SIZE]
+
+
+class CorpusStatistics:
+    """
+    In-memory copy of the document frequencies stored in TermStatistic.
+
+    Changes made by this process are applied in place; changes made by other
+    processes are picked up when the copy is reloaded every REFRESH_INTERVAL
+    seconds. If the table cannot be read, every term gets the same IDF and
+    scores reduce to a cosine over stopword-free term frequencies.
+    """
+
+    def __init__(self):
+        self.document_count = 0
+        self.frequencies = {}
+        self.loaded_at = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+
+    def load(self):
+        """Read the document count and all term frequencies from the database."""
+        from .models import Resume, JobDescription, TermStatistic
+
+        try:
+            frequencies = dict(TermStatistic.objects.values_list('term', 'document_frequency'))
+            document_count = Resume.objects.count() + JobDescription.objects.count()
+        except Exception as e:
+            print(f"Error loading term statistics: {str(e)}")
+            frequencies, document_count = {}, 0
+
+        with self._lock:
+            self.frequencies = frequencies
+            self.document_count = document_count
+            self.loaded_at = time.monotonic()
+
+    def is_stale(self):
+        return self.loaded_at is None or time.monotonic() - self.loaded_at >= REFRESH_INTERVAL
+
+    def refresh(self):
+        """
+        Reload the statistics if they are stale. Only one thread reloads; the
+        others keep using the current copy, or wait for it if none is loaded yet.
+        """
+        if not self.is_stale():
+            return
+        if not self._reload_lock.acquire(blocking=self.loaded_at is None):
+            return
+        try:
+            if self.is_stale():
+                self.load()
+        finally:
+            self._reload_lock.release()
+
+    def apply(self, added_terms, removed_terms, document_delta):
+        """Apply a document change made by this process to the loaded copy."""
+        if self.loaded_at is None:
+            return
+        with self._lock:
+            for term in added_terms:
+                self.frequencies[term] = self.frequencies.get(term, 0) + 1
+            for term in removed_terms:
+                if self.frequencies.get(term, 0) > 0:
+                    self.frequencies[term] -= 1
+            self.document_count = max(0, self.document_count + document_delta)
+
+    def idf(self, term):
+        """Smoothed inverse document frequency: log((1 + N) / (1 + df)) + 1."""
+        return math.log((1 + self.document_count) / (1 + self.frequencies.get(term, 0))) + 1
+
+    def vectorize(self, document):
+        """
+        Build the L2-normalised TF-IDF vector of a document.
+
+        Args:
+            document (ParsedDocument or str): The document
+
+        Returns:
+            dict: Term -> weight, holding only the terms present in the document
+        """
+        # Sublinear term frequency so repeated words do not dominate
+        vector = {term: (1 + math.log(count)) * self.idf(term)
+                  for term, count in term_counts(document).items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        if norm == 0:
+            return {}
+        return {term: weight / norm for term, weight in vector.items()}
+
+
+_statistics = CorpusStatistics()
+
+
+def get_corpus_statistics():
+    """
+    Get the shared corpus statistics, reloading them when they are stale.
+
+    Returns:
+        CorpusStatistics: The statistics used for IDF weights
+    """
+    _statistics.refresh()
+    return _statistics
+
+
+def sparse_dot(vector1, vector2):
+    """Dot product of two sparse vectors, iterating over the smaller one."""
+    if len(vector1) > len(vector2):
+        vector1, vector2 = vector2, vector1
+    return sum(weight * vector2.get(term, 0.0) for term, weight in vector1.items())
+
+
+def tfidf_vector(document):
+    """
+    Get the TF-IDF vector of a document with the current corpus statistics.
+
+    Args:
+        document (ParsedDocument or str): The document
+
+    Returns:
+        dict: Sparse, L2-normalised term -> weight vector
+    """
+    return get_corpus_statistics().vectorize(document)
+
+
+def tfidf_similarity(document1, document2):
+    """
+    Calculate the TF-IDF cosine similarity of two documents.
+
+    Args:
+        document1 (ParsedDocument or str): First document
+        document2 (ParsedDocument or str): Second document
+
+    Returns:
+        float: Similarity between 0 and 1
+    """
+    return sparse_dot(tfidf_vector(document1), tfidf_vector(document2))
+
+
+def tfidf_similarities(document, others):
+    """
+    Calculate the TF-IDF cosine similarity of one document to many, as a
+    single sparse matrix-vector product.
+
+    Args:
+        document (ParsedDocument or str): The shared document
+        others (list): The documents to compare it with
+
+    Returns:
+        numpy.ndarray: Similarities between 0 and 1, one per other document
+    """
+    statistics = get_corpus_statistics()
+    vector = statistics.vectorize(document)
+    if not vector or not others:
+        return np.zeros(len(others))
+
+    # Only the shared document's terms contribute to the dot products
+    columns = {term: column for column, term in enumerate(vector)}
+    rows, cols, weights = [], [], []
+    for row, other in enumerate(others):
+        for term, weight in statistics.vectorize(other).items():
+            column = columns.get(term)
+            if column is not None:
+                rows.append(row)
+                cols.append(column)
+                weights.append(weight)
+    matrix = csr_matrix((weights, (rows, cols)), shape=(len(others), len(columns)))
+    return np.clip(matrix @ np.fromiter(vector.values(), dtype=float, count=len(vector)), 0.0, 1.0)
+
+
+def record_document_change(old_terms, new_terms, document_delta=0):
+    """
+    Update the stored document frequencies after a document was added, edited or deleted.
+
+    Args:
+        old_terms (set): Terms of the previous version, empty for a new document
+        new_terms (set): Terms of the new version, empty for a deleted document
+        document_delta (int): 1 for a new document, -1 for a deleted one, 0 for an edit
+    """
+    from django.db import transaction
+    from django.db.models import F
+    from .models import TermStatistic
+
+    added = new_terms - old_terms
+    removed = old_terms - new_terms
+    try:
+        with transaction.atomic():
+            for chunk in _chunks(removed):
+                TermStatistic.objects.filter(term__in=chunk, document_frequency__gt=0).update(
+                    document_frequency=F('document_frequency') - 1)
+                TermStatistic.objects.filter(term__in=chunk, document_frequency=0).delete()
+            for chunk in _chunks(added):
+                TermStatistic.objects.bulk_create(
+                    [TermStatistic(term=term) for term in chunk], ignore_conflicts=True)
+                TermStatistic.objects.filter(term__in=chunk).update(
+                    document_frequency=F('document_frequency') + 1)
+    except Exception as e:
+        print(f"Error updating term statistics: {str(e)}")
+        return
+
+    _statistics.apply(added, removed, document_delta)
+
+
+def rebuild_term_statistics():
+    """
+    Recount the document frequency of every term from the stored resumes and
+    job descriptions, replacing the existing rows.
+
+    Returns:
+        tuple: (number of documents, number of terms)
+    """
+    from django.db import transaction
+    from .models import Resume, JobDescription, TermStatistic
+
+    frequencies = {}
+    document_count = 0
+    for model in (Resume, JobDescription):
+        for content in model.objects.values_list('content', flat=True).iterator():
+            document_count += 1
+            for term in document_terms(content or ""):
+                frequencies[term] = frequencies.get(term, 0) + 1
+
+    with transaction.atomic():
+        TermStatistic.objects.all().delete()
+        TermStatistic.objects.bulk_create(
+            [TermStatistic(term=term, document_frequency=count) for term, count in frequencies.items()],
+            batch_size=_CHUNK_SIZE)
+
+    _statistics.load()
+    return document_count, len(frequencies)
@@ -12,5 +12,12 @@ router.register(r'analyses', views.ResumeAnalysisViewSet, basename='resumeanalys
 urlpatterns = [
     path('', include(router.urls)),
     path('analyze/', views.analyze_resume, name='analyze-resume'),
+    path('analyze/batch/', views.analyze_batch, name='analyze-batch'),
+    path('analyze/stream/', views.analyze_resume_stream, name='analyze-resume-stream'),
+    path('analyze/async/', views.analyze_resume_async, name='analyze-resume-async'),
+    path('jobs/', views.create_analysis_job, name='analysis-job-create'),
+    path('jobs/<uuid:job_id>/', views.analysis_job_status, name='analysis-job-status'),
+    path('jobs/<uuid:job_id>/result/', views.analysis_job_result, name='analysis-job-result'),
     path('test-sentiment/', views.test_sentiment_analysis, name='test_sentiment_analysis'),
+    path('metrics/', views.metrics, name='metrics'),
 ] 
\ No newline at end of file
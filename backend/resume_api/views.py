@@ -1,12 +1,18 @@
 from django.shortcuts import render
 from rest_framework import status, viewsets
-from rest_framework.decorators import api_view, parser_classes
+from rest_framework.decorators import api_view, parser_classes, action
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.urls import reverse
+from django.http import JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from django.db import connection
+from asgiref.sync import sync_to_async
 
-from .models import Resume, JobDescription, ResumeAnalysis
+from .models import Resume, JobDescription, ResumeAnalysis, AnalysisJob
 from .serializers import (
     ResumeSerializer, 
     JobDescriptionSerializer, 
@@ -15,11 +21,58 @@ from .serializers import (
 )
 from .resume_analyzer import ResumeAnalyzer
 from . import azure_language_client
+from . import embeddings
+from . import matching
+from . import jobs
+from . import admission
+from . import result_cache
+from . import job_index
+from . import feature_cache
+from .preload import process_memory
+from .lexicon import get_lexicon
+from .budget import Deadline, parse_budget
+from .pipeline import get_batch_executor
+import os
+import time
 import json
+import queue
+import asyncio
+import threading
+import functools
 
-# Initialize the resume analyzer
+# Initialize the resume analyzer, shared by all requests
 resume_analyzer = ResumeAnalyzer()
 
+# Most counterparts one batch request may score
+BATCH_MAX_COUNTERPARTS = int(os.getenv("BATCH_MAX_COUNTERPARTS", "500"))
+
+def _analysis_options(headers, data, query_params):
+    """
+    Read the matching profile and time budget of an analysis request.
+    
+    Args:
+        headers: The request headers
+        data: The form fields
+        query_params: The query string parameters
+    
+    Returns:
+        tuple: (MatchProfile, budget in milliseconds or None)
+        
+    Raises:
+        ValueError: If either option is invalid
+    """
+    # Matching profile: 'fast' (no model inference), 'balanced' or 'accurate'
+    profile = matching.get_profile(data.get('profile'))
+    # Time budget from the X-Analysis-Budget-Ms header or the budget_ms parameter
+    budget_ms = parse_budget(
+        headers.get('X-Analysis-Budget-Ms') or data.get('budget_ms') or query_params.get('budget_ms'))
+    return profile, budget_ms
+
+def _overloaded_response(error):
+    """Fast rejection telling the client when to retry."""
+    return Response({'error': str(error)}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={'Retry-After': str(error.retry_after)})
+
 @api_view(['POST'])
 @parser_classes([MultiPartParser, FormParser])
 def analyze_resume(request):
@@ -34,24 +87,40 @@ def analyze_resume(request):
             'error': 'Both resume and job description files are required.'
         }, status=status.HTTP_400_BAD_REQUEST)
     
-    analyzer = ResumeAnalyzer()
+    try:
+        profile, budget_ms = _analysis_options(request.headers, request.data, request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
     
-    # Extract text from files
-    resume_text = analyzer.extract_text_from_file(
-        resume_file.read(), 
-        resume_file.name.split('.')[-1]
-    )
+    resume_content = resume_file.read()
+    job_desc_content = job_desc_file.read()
+    user = request.user if request.user.is_authenticated else None
     
-    job_desc_text = analyzer.extract_text_from_file(
-        job_desc_file.read(), 
-        job_desc_file.name.split('.')[-1]
-    )
+    def compute():
+        # Bounded concurrency per path; the budget starts once the request is admitted
+        with admission.admit([resume_file.name, job_desc_file.name], profile):
+            deadline = Deadline(budget_ms)
+            # Extract text from both files concurrently and analyze the resume against the job description
+            resume_text, job_desc_text = resume_analyzer.extract_files(
+                resume_content, resume_file.name, job_desc_content, job_desc_file.name, deadline)
+            result = resume_analyzer.analyze_resume_and_job_description(
+                resume_text, job_desc_text, profile=profile, deadline=deadline)
+        return result, resume_text, job_desc_text
     
-    # Analyze the resume against the job description
-    analysis_result = analyzer.analyze_resume_and_job_description(
-        resume_text, 
-        job_desc_text
-    )
+    # Repeats of the same uploads are served from the stored result, and
+    # identical requests in flight share one analysis
+    try:
+        analysis = result_cache.get_or_compute(
+            resume_content, job_desc_content, profile, compute,
+            idempotency_key=request.headers.get('Idempotency-Key'), user=user)
+    except admission.Overloaded as e:
+        return _overloaded_response(e)
+    except result_cache.IdempotencyConflict as e:
+        return Response({'error': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    analysis_result = analysis.result
+    
+    if user and analysis.status != 'replayed':
+        _save_analysis(user, resume_file.name, job_desc_file.name, analysis)
     
     # Log the complete results for debugging
     print("Complete analysis result:", json.dumps(analysis_result, default=str, indent=2))
@@ -60,7 +129,364 @@ def analyze_resume(request):
     sentiment_data = analysis_result.get('sentimentAnalysis', {})
     print("Sentiment Analysis data:", json.dumps(sentiment_data, default=str, indent=2))
     
-    return Response(analysis_result, status=status.HTTP_200_OK)
+    return Response(analysis_result, status=status.HTTP_200_OK, headers={'X-Analysis-Cache': analysis.status})
+
+def _saved_document(model, user, file_name, content):
+    """Get the user's saved document with this name and content, saving it if there is none."""
+    # Not get_or_create: documents saved earlier through the API may repeat, which it would reject
+    document = model.objects.filter(user=user, file_name=file_name, content=content).order_by('id').first()
+    if document is None:
+        document = model.objects.create(
+            user=user, file_name=file_name, content=content,
+            title=file_name[:100], file_type=file_name.split('.')[-1].lower()[:10])
+    return document
+
+def _save_analysis(user, resume_file_name, job_desc_file_name, analysis):
+    """Record an analysis, with the documents it compared, in the user's history."""
+    if analysis.resume_text.startswith("Error:") or analysis.job_desc_text.startswith("Error:"):
+        return
+    
+    resume = _saved_document(Resume, user, resume_file_name, analysis.resume_text)
+    job_description = _saved_document(JobDescription, user, job_desc_file_name, analysis.job_desc_text)
+    result = analysis.result
+    ResumeAnalysis.objects.create(
+        user=user,
+        resume=resume,
+        job_description=job_description,
+        keywords_to_add=result['keywordsToAdd'],
+        keywords_to_remove=result['keywordsToRemove'],
+        content_suggestions=result['contentSuggestions'],
+        match_score=result['matchScore']
+    )
+
+def _parse_batch_request(request):
+    """
+    Read the shared document and its counterparts from a batch request.
+    
+    Returns:
+        tuple: (shared role, shared file, counterpart uploads, saved counterparts)
+        
+    Raises:
+        ValueError: If the request does not describe exactly one shared document
+    """
+    resume_file = request.FILES.get('resume_file')
+    job_desc_file = request.FILES.get('job_desc_file')
+    if bool(resume_file) == bool(job_desc_file):
+        raise ValueError('Send either resume_file or job_desc_file as the shared document.')
+    
+    if resume_file:
+        shared_role, shared_file = 'resume', resume_file
+        uploads = request.FILES.getlist('job_desc_files')
+        ids = request.data.getlist('job_description_ids')
+        saved_model = JobDescription
+    else:
+        shared_role, shared_file = 'jobDescription', job_desc_file
+        uploads = request.FILES.getlist('resume_files')
+        ids = request.data.getlist('resume_ids')
+        saved_model = Resume
+    
+    saved = []
+    if ids:
+        if not request.user.is_authenticated:
+            raise ValueError('Log in to match against saved documents.')
+        try:
+            ids = [int(value) for value in ids]
+        except ValueError:
+            raise ValueError('Document IDs must be integers.')
+        by_id = saved_model.objects.filter(user=request.user, id__in=ids).in_bulk()
+        unknown = [value for value in ids if value not in by_id]
+        if unknown:
+            raise ValueError(f"Unknown document IDs: {', '.join(map(str, unknown))}")
+        saved = [by_id[value] for value in ids]
+    
+    if not uploads and not saved:
+        raise ValueError('Send at least one document to match against.')
+    if len(uploads) + len(saved) > BATCH_MAX_COUNTERPARTS:
+        raise ValueError(f'At most {BATCH_MAX_COUNTERPARTS} documents can be matched in one request.')
+    return shared_role, shared_file, uploads, saved
+
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def analyze_batch(request):
+    """
+    Score one resume against many job descriptions, or one job description against many resumes.
+    
+    Send resume_file with job_desc_files and/or job_description_ids, or
+    job_desc_file with resume_files and/or resume_ids. The counterparts are
+    returned ranked by matchScore; the best top_k also get the full analysis.
+    Uploads whose text could not be extracted come last, with an error instead of a score.
+    """
+    try:
+        shared_role, shared_file, uploads, saved = _parse_batch_request(request)
+        profile, budget_ms = _analysis_options(request.headers, request.data, request.query_params)
+        top_k = int(request.data.get('top_k') or 0)
+        if top_k < 0:
+            raise ValueError('top_k must not be negative.')
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        slot = admission.admit_batch()
+    except admission.Overloaded as e:
+        return _overloaded_response(e)
+    
+    with slot:
+        deadline = Deadline(budget_ms)
+        extract = functools.partial(resume_analyzer.extract_upload, deadline=deadline)
+        files = [shared_file] + uploads
+        texts = list(get_batch_executor().map(extract, [f.read() for f in files], [f.name for f in files]))
+        
+        if texts[0].startswith("Error:"):
+            return Response({'error': texts[0]}, status=status.HTTP_400_BAD_REQUEST)
+        
+        counterparts = [{'name': upload.name, 'id': None} for upload in uploads]
+        counterparts += [{'name': document.file_name or document.title, 'id': document.id} for document in saved]
+        counterpart_texts = texts[1:] + [document.content for document in saved]
+        
+        batch_result = resume_analyzer.match_one_to_many(
+            texts[0], counterpart_texts, shared_role,
+            profile=profile, deadline=deadline, top_k=top_k
+        )
+    
+    for entry in batch_result['results']:
+        entry.update(counterparts[entry['index']])
+    return Response(batch_result, status=status.HTTP_200_OK)
+
+def _sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+# Marks the end of a streamed analysis on its queue
+_END_OF_STREAM = object()
+
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def analyze_resume_stream(request):
+    """
+    Analyze a resume like analyze_resume, streaming partial results as Server-Sent Events.
+    
+    Each event carries a fragment of the analyze_resume response under the
+    same field names, sent as soon as the stages behind it finish:
+    textStats, skills, missingKeywords, sentimentAnalysis, matchScore and
+    contentSuggestions, then 'complete' with the full response. A stored
+    result, a replayed Idempotency-Key or an identical analysis already in
+    flight arrives as the 'complete' event alone.
+    """
+    resume_file = request.FILES.get('resume_file')
+    job_desc_file = request.FILES.get('job_desc_file')
+    
+    if not resume_file or not job_desc_file:
+        return Response({
+            'error': 'Both resume and job description files are required.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        profile, budget_ms = _analysis_options(request.headers, request.data, request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    resume_content = resume_file.read()
+    job_desc_content = job_desc_file.read()
+    user = request.user if request.user.is_authenticated else None
+    idempotency_key = request.headers.get('Idempotency-Key')
+    # (event, data) parts, (None, exception) on failure, then _END_OF_STREAM
+    parts = queue.Queue()
+    
+    def compute():
+        with admission.admit([resume_file.name, job_desc_file.name], profile):
+            deadline = Deadline(budget_ms)
+            resume_text, job_desc_text = resume_analyzer.extract_files(
+                resume_content, resume_file.name, job_desc_content, job_desc_file.name, deadline)
+            result = None
+            for event, data in resume_analyzer.analyze_progressively(
+                    resume_text, job_desc_text, profile=profile, deadline=deadline):
+                parts.put((event, data))
+                if event == 'complete':
+                    result = data
+        return result, resume_text, job_desc_text
+    
+    def analyze():
+        # Runs in its own thread, so the parts stream while the analysis goes
+        # through the same cache, single-flight and history as analyze_resume
+        try:
+            analysis = result_cache.get_or_compute(
+                resume_content, job_desc_content, profile, compute, idempotency_key=idempotency_key, user=user)
+            if analysis.status != 'miss':
+                parts.put(('complete', analysis.result))
+            if user and analysis.status != 'replayed':
+                _save_analysis(user, resume_file.name, job_desc_file.name, analysis)
+        except Exception as e:
+            parts.put((None, e))
+        finally:
+            parts.put(_END_OF_STREAM)
+            connection.close()
+    
+    threading.Thread(target=analyze, daemon=True).start()
+    
+    # Rejections are known before the first part, so they get their own status
+    first = parts.get()
+    if first is not _END_OF_STREAM and first[0] is None:
+        if isinstance(first[1], admission.Overloaded):
+            return _overloaded_response(first[1])
+        if isinstance(first[1], result_cache.IdempotencyConflict):
+            return Response({'error': str(first[1])}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    
+    def events():
+        part = first
+        while part is not _END_OF_STREAM:
+            event, data = part
+            if event is None:
+                print(f"Error streaming analysis: {str(data)}")
+                yield _sse_event('error', {'error': str(data)})
+            else:
+                yield _sse_event(event, data)
+            part = parts.get()
+    
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+def _read_uploads(request):
+    """
+    Parse the two uploads of a multipart analysis request.
+    
+    Returns:
+        tuple: (resume file name, resume bytes, job description file name,
+            job description bytes), or None if a file is missing
+    """
+    resume_file = request.FILES.get('resume_file')
+    job_desc_file = request.FILES.get('job_desc_file')
+    if not resume_file or not job_desc_file:
+        return None
+    return resume_file.name, resume_file.read(), job_desc_file.name, job_desc_file.read()
+
+@csrf_exempt
+@require_POST
+async def analyze_resume_async(request):
+    """
+    Analyze a resume against a job description without blocking the server.
+    
+    Same request and response as analyze_resume. Served by an ASGI server,
+    the Azure calls are awaited on non-blocking clients and CPU-bound stages
+    run in worker threads, so one worker process can hold many slow
+    analyses at once.
+    """
+    # Parsing the multipart body reads the whole upload, which blocks
+    uploads = await asyncio.to_thread(_read_uploads, request)
+    if uploads is None:
+        return JsonResponse({
+            'error': 'Both resume and job description files are required.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    resume_file_name, resume_content, job_desc_file_name, job_desc_content = uploads
+    
+    try:
+        profile, budget_ms = _analysis_options(request.headers, request.POST, request.GET)
+    except ValueError as e:
+        return JsonResponse({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    user = await request.auser()
+    user = user if user.is_authenticated else None
+    
+    async def compute():
+        # Bounded concurrency per path; the budget starts once the request is admitted
+        with await admission.admit_async([resume_file_name, job_desc_file_name], profile):
+            deadline = Deadline(budget_ms)
+            resume_text, job_desc_text = await resume_analyzer.extract_files_async(
+                resume_content, resume_file_name, job_desc_content, job_desc_file_name, deadline)
+            result = await resume_analyzer.analyze_resume_and_job_description_async(
+                resume_text, job_desc_text, profile=profile, deadline=deadline)
+        return result, resume_text, job_desc_text
+    
+    try:
+        analysis = await result_cache.get_or_compute_async(
+            resume_content, job_desc_content, profile, compute,
+            idempotency_key=request.headers.get('Idempotency-Key'), user=user)
+    except admission.Overloaded as e:
+        return JsonResponse({'error': str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            headers={'Retry-After': str(e.retry_after)})
+    except result_cache.IdempotencyConflict as e:
+        return JsonResponse({'error': str(e)}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    
+    if user and analysis.status != 'replayed':
+        await sync_to_async(_save_analysis)(user, resume_file_name, job_desc_file_name, analysis)
+    
+    return JsonResponse(analysis.result, status=status.HTTP_200_OK, headers={'X-Analysis-Cache': analysis.status})
+
+@api_view(['POST'])
+@parser_classes([MultiPartParser, FormParser])
+def create_analysis_job(request):
+    """
+    Queue an analysis for the background workers and return its job ID at once.
+    """
+    resume_file = request.FILES.get('resume_file')
+    job_desc_file = request.FILES.get('job_desc_file')
+    
+    if not resume_file or not job_desc_file:
+        return Response({
+            'error': 'Both resume and job description files are required.'
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        profile, budget_ms = _analysis_options(request.headers, request.data, request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    job = jobs.enqueue_job(
+        resume_file.name, resume_file.read(),
+        job_desc_file.name, job_desc_file.read(),
+        user=request.user if request.user.is_authenticated else None,
+        profile=profile.name,
+        budget_ms=budget_ms
+    )
+    
+    return Response(_job_status(request, job), status=status.HTTP_202_ACCEPTED)
+
+def _get_job(request, job_id):
+    """Get a job visible to the requesting user, or None."""
+    job = AnalysisJob.objects.defer('resume_content', 'job_desc_content').filter(pk=job_id).first()
+    if job is None or (job.user_id is not None and job.user_id != request.user.id):
+        return None
+    return job
+
+def _job_status(request, job):
+    return {
+        'jobId': str(job.id),
+        'status': job.status,
+        'attempts': job.attempts,
+        'error': job.error or None,
+        'createdAt': job.created_at,
+        'startedAt': job.started_at,
+        'finishedAt': job.finished_at,
+        'statusUrl': request.build_absolute_uri(reverse('analysis-job-status', args=[job.id])),
+        'resultUrl': request.build_absolute_uri(reverse('analysis-job-result', args=[job.id])),
+    }
+
+@api_view(['GET'])
+def analysis_job_status(request, job_id):
+    """
+    Get the status of a queued analysis.
+    """
+    job = _get_job(request, job_id)
+    if job is None:
+        return Response({'error': 'Analysis job not found.'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(_job_status(request, job), status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+def analysis_job_result(request, job_id):
+    """
+    Get the result of a queued analysis: 200 with the analysis once it has
+    succeeded, 202 while it is pending or running, 500 if it failed.
+    """
+    job = _get_job(request, job_id)
+    if job is None:
+        return Response({'error': 'Analysis job not found.'}, status=status.HTTP_404_NOT_FOUND)
+    if job.status == AnalysisJob.STATUS_SUCCEEDED:
+        return Response(job.result, status=status.HTTP_200_OK)
+    if job.status == AnalysisJob.STATUS_FAILED:
+        return Response(_job_status(request, job), status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+    return Response(_job_status(request, job), status=status.HTTP_202_ACCEPTED)
 
 @api_view(['POST'])
 def test_sentiment_analysis(request):
@@ -68,7 +494,7 @@ def test_sentiment_analysis(request):
     Debug endpoint to test sentiment analysis functionality.
     """
     text = request.data.get('text', 'This is a test text with a neutral sentiment.')
-    result = azure_language_client.analyze_sentiment(text)
+    result = azure_language_client.analyze_sentiment(text) or {'sentiment': 'neutral'}
     
     # Log the raw result
     print("Raw sentiment analysis result:", result)
@@ -76,6 +502,20 @@ def test_sentiment_analysis(request):
     # Return the full result
     return Response(result, status=status.HTTP_200_OK)
 
+@api_view(['GET'])
+def metrics(request):
+    """
+    Expose runtime metrics for the analysis pipeline.
+    """
+    return Response({
+        'lexiconVersion': get_lexicon().version,
+        'embeddingBackend': embeddings.backend.name if embeddings.backend else None,
+        'embeddingWorker': embeddings.worker.stats() if embeddings.worker else None,
+        'admission': admission.metrics(),
+        'featureCache': feature_cache.stats(),
+        'process': process_memory(),
+    }, status=status.HTTP_200_OK)
+
 class ResumeViewSet(viewsets.ModelViewSet):
     """ViewSet for viewing and editing Resume instances"""
     serializer_class = ResumeSerializer
@@ -105,6 +545,69 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Set the user when creating a new job description"""
         serializer.save(user=self.request.user)
+    
+    @action(detail=False, methods=['post'], parser_classes=[MultiPartParser, FormParser])
+    def rank(self, request):
+        """
+        Rank the user's job descriptions for a resume with the inverted index.
+        
+        Send resume_file or resume_id. Returns the best k (default 10) by BM25
+        score; with rerank=n the first n of them are re-scored with the full
+        analyzer and reordered by matchScore. Every entry has matchScore, null
+        outside the re-scored head.
+        """
+        if not request.user.is_authenticated:
+            return Response({'error': 'Log in to rank saved job descriptions.'}, status=status.HTTP_403_FORBIDDEN)
+        
+        try:
+            k = int(request.data.get('k') or 10)
+            rerank = int(request.data.get('rerank') or 0)
+            if k <= 0 or rerank < 0:
+                raise ValueError('k must be positive and rerank must not be negative.')
+            profile, budget_ms = _analysis_options(request.headers, request.data, request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        deadline = Deadline(budget_ms)
+        
+        resume_file = request.FILES.get('resume_file')
+        if resume_file:
+            resume_text = resume_analyzer.extract_upload(resume_file.read(), resume_file.name, deadline=deadline)
+            if resume_text.startswith("Error:"):
+                return Response({'error': resume_text}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            resume_id = request.data.get('resume_id')
+            resume = None
+            if resume_id and resume_id.isdigit():
+                resume = Resume.objects.filter(user=request.user, id=int(resume_id)).first()
+            if resume is None:
+                return Response({'error': 'Send resume_file or the resume_id of a saved resume.'},
+                                status=status.HTTP_400_BAD_REQUEST)
+            resume_text = resume.content
+        
+        start = time.perf_counter()
+        ranked = job_index.get_job_index().search(job_index.query_weights(resume_text), k=k, owner_id=request.user.id)
+        search_ms = (time.perf_counter() - start) * 1000
+        
+        jobs_by_id = JobDescription.objects.filter(id__in=[job_id for job_id, _ in ranked]).in_bulk()
+        results = [
+            {'id': job_id, 'title': jobs_by_id[job_id].title, 'company': jobs_by_id[job_id].company,
+             'score': round(score, 4), 'matchScore': None}
+            for job_id, score in ranked if job_id in jobs_by_id
+        ]
+        
+        if rerank and results:
+            # Re-score the head with the full analyzer in one batch
+            head = results[:rerank]
+            batch_result = resume_analyzer.match_one_to_many(
+                resume_text, [jobs_by_id[entry['id']].content for entry in head], 'resume',
+                profile=profile, deadline=deadline)
+            for entry in batch_result['results']:
+                head[entry['index']]['matchScore'] = entry['matchScore']
+            # Job descriptions that could not be scored stay null and go last in the head
+            head.sort(key=lambda entry: 1 if entry['matchScore'] is None else -entry['matchScore'])
+            results = head + results[rerank:]
+        
+        return Response({'results': results, 'searchMs': round(search_ms, 2)}, status=status.HTTP_200_OK)
 
 class ResumeAnalysisViewSet(viewsets.ReadOnlyModelViewSet):
     """ViewSet for viewing ResumeAnalysis instances"""